@@ -101,6 +101,13 @@ def iterate_through_ubiquitin_all(parent_dictionary):
 
     # Ensure that the parent dictionary has all the valid keys 
     validate_protein_keys(parent_dictionary)
+
+    # Fast path: relabel and build the context in a single traversal
+    if USE_COMPACT_FAST_PATH:
+        try:
+            return iterate_single_pass(parent_dictionary, all_linkages=True)
+        except CompactConversionError:
+            pass
     
     # Initialize context object to track global-like variables
     context = {
@@ -201,7 +208,16 @@ def ubiquitin_building_all(
 
     Returns:
         dict: The updated protein dictionary with changes applied.
+            If parent_dictionary is a UbiquitinNode the product is a UbiquitinNode that
+            only copies the nodes between the root and the modified lysine.
     """
+    # Structurally shared mode: UbiquitinNode in, UbiquitinNode out
+    if isinstance(parent_dictionary, UbiquitinNode):
+        output_node = persistent_building(
+            parent_dictionary, as_ubiquitin_molecule(ubi_molecule_to_add), ubiquitin_number, lysine_residue
+        )
+        return output_node, node_context(output_node, all_linkages=True)
+
     # Initialize context for chain numbering and length tracking
     context = {
         "chain_number_list": [1],
@@ -220,6 +236,13 @@ def ubiquitin_building_all(
     if ubi_molecule_to_add not in ('SMAC', 'ABOC'):
         if not isinstance(ubi_molecule_to_add, dict):
             raise TypeError("ubi_molecule_to_add must be a dictionary or 'SMAC'/'ABOC' string")
+
+    # Fast path: attach the molecule, relabel and build the context in a single traversal
+    if USE_COMPACT_FAST_PATH:
+        try:
+            return building_single_pass(parent_dictionary, ubi_molecule_to_add, ubiquitin_number, lysine_residue, all_linkages=True)
+        except CompactConversionError:
+            pass
         
     def inner_wrapper_ubiquitin_building_all(
         input_dictionary: dict | str,
@@ -294,9 +317,10 @@ def ubiquitin_building_all(
 
     return output_dictionary, output_context
 
-def initialize_multimer_dicts_all(initial_acceptor):
+def initialize_multimer_dicts_all(initial_acceptor, structural_sharing=False):
     """
     Set up the initial multimer and context dictionaries.
+    With structural_sharing the multimers are stored as UbiquitinNode trees.
     """
     multimer_dicts = {
         'multimers': [],
@@ -305,6 +329,8 @@ def initialize_multimer_dicts_all(initial_acceptor):
 
     # Initialize acceptor and context
     acceptor, context = iterate_through_ubiquitin_all(initial_acceptor)
+    if structural_sharing:
+        acceptor = as_ubiquitin_node(acceptor)
 
     # Add to the dictionary
     multimer_dicts['multimers'].append(acceptor)
@@ -313,40 +339,66 @@ def initialize_multimer_dicts_all(initial_acceptor):
     return multimer_dicts
 
 
-def defining_json_multimers_all(multimer_dicts, unprotected_ubi):
+def defining_json_multimers_all(multimer_dicts, unprotected_ubi, structural_sharing=False, deduplicate=False):
     """
     Expands a list of multimers by conjugating new ubiquitins
     at all free lysines.
+    See defining_json_multimers() for the structural_sharing and deduplicate modes.
     """
     multimers = multimer_dicts['multimers']
     contexts = multimer_dicts['contexts']
 
+    if structural_sharing:
+        multimers = [as_ubiquitin_node(multimer) for multimer in multimers]
+        unprotected_ubi = as_ubiquitin_node(unprotected_ubi)
+
     new_multimer_dicts = {
         'multimers': [],
         'contexts': []
         }
+    seen = set()
 
     # Iterate through each multimer and its context
     for multimer, context in zip(multimers, contexts):
         free_lysines = context['free_lysines']
 
         for free_lysine in free_lysines:
-            # Deep copy the multimer for safe modification
-            working_multimer = copy.deepcopy(multimer)
-
             # Build new ubiquitin at the given site
             working_multimer, working_context = ubiquitin_building_all(
-                working_multimer,
-                copy.deepcopy(unprotected_ubi),
+                multimer,
+                unprotected_ubi,
                 free_lysine[0],
                 free_lysine[1]
             )
 
+            # Discard duplicates as they are generated
+            if deduplicate:
+                marker = duplicate_marker(working_multimer)
+                if marker in seen:
+                    continue
+                seen.add(marker)
+
             new_multimer_dicts['multimers'].append(working_multimer)
             new_multimer_dicts['contexts'].append(working_context)
 
     return new_multimer_dicts
 
+def materialize_edge_trees_all(edge_trees):
+    """
+    Converts edge trees from enumerate_multimer_levels() into multimer and context dictionaries.
+    """
+    multimer_dicts = {
+        'multimers': [],
+        'contexts': []
+    }
+
+    for edge_tree in edge_trees:
+        multimer, context = materialize_edge_tree(edge_tree, all_linkages=True)
+        multimer_dicts['multimers'].append(multimer)
+        multimer_dicts['contexts'].append(context)
+
+    return multimer_dicts
+
 # ===========================================
 # Functions for checking isomorphism in graphs
 # For example, counting n-level topologies in higher-level graphs
@@ -354,6 +406,10 @@ def defining_json_multimers_all(multimer_dicts, unprotected_ubi):
 import networkx as nx
 from networkx.algorithms import isomorphism
 from itertools import combinations
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.simulation import process_pool_context
+from src.subtree_counting import NotAnOutTreeError, PatternIndex, count_subtree_occurrences
 
 def load_multimer_contexts(project_root: Path, multimer_size: int) -> dict:
     """
@@ -379,6 +435,20 @@ def n_in_higher_level(higher_level_edges, n_level_edges):
     """
     Counts the number of subgraph isomorphisms where a n-level topology
     (4-node graph) appears in a larger graphs.
+    Each matching node set is counted once.
+
+    Uses the rooted-tree dynamic programming of subtree_counting.py; edge lists that
+    are not rooted out-trees fall back to n_in_higher_level_isomorphism().
+    """
+    try:
+        return count_subtree_occurrences(higher_level_edges, n_level_edges)
+    except NotAnOutTreeError:
+        return n_in_higher_level_isomorphism(higher_level_edges, n_level_edges)
+
+def n_in_higher_level_isomorphism(higher_level_edges, n_level_edges):
+    """
+    Reference implementation of n_in_higher_level(): tests every node subset of the
+    higher-level graph for isomorphism with the n-level topology.
     Avoids counting duplicate isomorphic matches by using frozenset node identifiers.
     """
 
@@ -463,7 +533,43 @@ def get_multimer_edges_by_lysines(context_data: dict,
 
     return filter_edges_by_labels(reveal_all_edges)
 
-def analyze_subgraph_containment(higher_level_dict, n_level_dict, progress_callback=None):
+def _containment_rows_chunk(pattern_index, high_edges_chunk):
+    return [pattern_index.count_row(high_edges, fallback=n_in_higher_level_isomorphism) for high_edges in high_edges_chunk]
+
+
+def _iter_containment_rows(high_edges_list, pattern_index, sharded, max_workers, chunk_size):
+    """
+    Yield (start position, rows of counts) as the higher-level graphs are counted:
+    one graph at a time in input order when serial, per finished shard of
+    chunk_size graphs when sharded.
+    """
+    if not sharded:
+        for position, high_edges in enumerate(high_edges_list):
+            yield position, _containment_rows_chunk(pattern_index, [high_edges])
+        return
+
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context())
+    try:
+        shards = {
+            executor.submit(_containment_rows_chunk, pattern_index, high_edges_list[start:start + chunk_size]): start
+            for start in range(0, len(high_edges_list), chunk_size)
+        }
+        for shard in as_completed(shards):
+            yield shards[shard], shard.result()
+    finally:
+        # Also reached when the consumer stops early (e.g. a cancelled job)
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def analyze_subgraph_containment(
+        higher_level_dict,
+        n_level_dict,
+        progress_callback=None,
+        parallel=False,
+        max_workers=None,
+        chunk_size=64,
+        emit_rows=False
+    ):
     """
     Analyzes the containment of n-level topologies within higher-level graphs.
     Counts how many times each n-level topology appears in each higher-level graph.
@@ -471,6 +577,17 @@ def analyze_subgraph_containment(higher_level_dict, n_level_dict, progress_callb
         higher_level_dict (dict): Dictionary containing higher-level graph edges.
         n_level_dict (dict): Dictionary containing n-level graph edges.
         progress_callback (callable): Optional callback function to report progress.
+        parallel (bool): Shard the higher-level graphs across a ProcessPoolExecutor
+                         (when there are more than chunk_size of them). Progress is
+                         reported as the shards finish ('current' counts all finished
+                         graphs) and the timing estimate is recalculated from the
+                         combined throughput after every shard; the results keep the
+                         input order.
+        max_workers (int): Number of worker processes (defaults to the CPU count).
+        chunk_size (int): Number of higher-level graphs per shard.
+        emit_rows (bool): Add the finished row to every 'progress' event as
+                          "row": {"higher_level", "counts"}, with only the nonzero
+                          counts (for live streams).
     Returns:
         dict: A dictionary where keys are higher-level graph representations
               and values are dictionaries with n-level graph representations
@@ -484,44 +601,65 @@ def analyze_subgraph_containment(higher_level_dict, n_level_dict, progress_callb
     
     # Time the first 10 iterations for estimation
     start_time = time.time()
-
-    for index, (high_key, high_edges) in enumerate(higher_level_dict.items()):
-        high_str = str(high_edges)
-        results[high_str] = {}
-        for n_key, n_edges in n_level_dict.items():
-            n_str = str(n_edges)
-            count = n_in_higher_level(high_edges, n_edges)
-            results[high_str][n_str] = count
-        
-        # Send progress update via callback
-        if progress_callback:
-            progress_callback({
-                "type": "progress",
-                "current": index + 1,
-                "total": total_items,
-                "message": f"Processed {high_str} with {len(n_level_dict)} n-level structures."
-            })
-        
-        # After first 10 iterations, estimate total time
-        if index + 1 == sample_size:
-            elapsed_time = time.time() - start_time
-            avg_time_per_iteration = elapsed_time / sample_size
-            estimated_total_time = avg_time_per_iteration * total_items
-            remaining_time = estimated_total_time - elapsed_time
-            
-            timing_info = {
-                "type": "timing_analysis",
-                "completed_iterations": sample_size,
-                "elapsed_time": elapsed_time,
-                "avg_time_per_iteration": avg_time_per_iteration,
-                "estimated_total_time": estimated_total_time,
-                "estimated_remaining_time": remaining_time,
-                "estimated_total_seconds": estimated_total_time,
-                "estimated_remaining_seconds": remaining_time
-            }
-            
-            if progress_callback:
-                progress_callback(timing_info)
+    timing_reported = False
+
+    # Canonical forms of the n-level patterns, so each higher-level graph is
+    # enumerated once and every pattern count is a dictionary lookup
+    pattern_index = PatternIndex((str(n_edges), n_edges) for n_edges in n_level_dict.values())
+
+    high_edges_list = list(higher_level_dict.values())
+    sharded = parallel and total_items > chunk_size
+    rows = [None] * total_items
+    completed = 0
+    with closing(_iter_containment_rows(high_edges_list, pattern_index, sharded, max_workers, chunk_size)) as finished_rows:
+        for start, shard_rows in finished_rows:
+            for position, row in enumerate(shard_rows, start):
+                rows[position] = row
+                completed += 1
+                high_str = str(high_edges_list[position])
+
+                # Send progress update via callback (with the nonzero counts of the row if asked)
+                if progress_callback:
+                    progress = {
+                        "type": "progress",
+                        "current": completed,
+                        "total": total_items,
+                        "message": f"Processed {high_str} with {len(n_level_dict)} n-level structures."
+                    }
+                    if emit_rows:
+                        progress["row"] = {
+                            "higher_level": high_str,
+                            "counts": {label: count for label, count in row.items() if count}
+                        }
+                    progress_callback(progress)
+
+            # After first 10 iterations estimate total time; when sharded the first
+            # shard already holds chunk_size graphs, so re-estimate after every shard
+            # from the throughput of all workers together
+            if completed >= sample_size and (not timing_reported or (sharded and completed < total_items)):
+                timing_reported = True
+                elapsed_time = time.time() - start_time
+                avg_time_per_iteration = elapsed_time / completed
+                estimated_total_time = avg_time_per_iteration * total_items
+                remaining_time = estimated_total_time - elapsed_time
+
+                timing_info = {
+                    "type": "timing_analysis",
+                    "completed_iterations": completed,
+                    "elapsed_time": elapsed_time,
+                    "avg_time_per_iteration": avg_time_per_iteration,
+                    "estimated_total_time": estimated_total_time,
+                    "estimated_remaining_time": remaining_time,
+                    "estimated_total_seconds": estimated_total_time,
+                    "estimated_remaining_seconds": remaining_time
+                }
+
+                if progress_callback:
+                    progress_callback(timing_info)
+
+    # Merge the rows in input order
+    for high_edges, row in zip(high_edges_list, rows):
+        results[str(high_edges)] = row
 
     # Send completion notification
     if progress_callback:
@@ -550,20 +688,29 @@ def build_all_linkages_multimers(
         largest_multimer_size: The maximum size of the multimers to build.
         project_root_: The root path of the project for saving output files.
     """
+
+    # Enumerate unique topologies directly as edge trees; dictionaries and contexts
+    # are only materialised per level for saving. Falls back to building trees with
+    # ubiquitin_building_all() if the monomer cannot be enumerated.
+    try:
+        edge_tree_levels = enumerate_multimer_levels(monomer, monomer, largest_multimer_size)
+    except CompactConversionError:
+        edge_tree_levels = None
     
-    # Initialize the multimers
-    multimers = initialize_multimer_dicts_all(monomer)
+    # Initialize the multimers (kept as structurally shared UbiquitinNode trees between sizes)
+    if edge_tree_levels is None:
+        multimers = initialize_multimer_dicts_all(monomer, structural_sharing=True)
 
     # Build multimers of increasing size
     for multimer_size in range(2, largest_multimer_size+1):
         # Expand the multimer list by adding new ubiquitins
-        multimers = defining_json_multimers_all(multimers, monomer)
-
-        print(f"Multimer size {multimer_size} built with {len(multimers['multimers'])} entries.")
-
-        # Remove duplicate entries from the multimer dictionary
-        delete_duplicate_multimers(multimers)
+        if edge_tree_levels is not None:
+            _, edge_trees = next(edge_tree_levels)
+            multimers = materialize_edge_trees_all(edge_trees)
+        else:
+            multimers = defining_json_multimers_all(multimers, monomer, structural_sharing=True, deduplicate=True)
 
+        # Duplicates are discarded while building, so the count is that of unique multimers
         print(f"Following deletion, multimer size {multimer_size} built with {len(multimers['multimers'])} entries.")
 
         # Create output directory for JSON files
@@ -581,8 +728,11 @@ def build_all_linkages_multimers(
         contexts_data = {}
         jsons_data = {}
         
-        if isinstance(multimers, dict):
-            for key, value in multimers.items():
+        # Materialise the node trees as dictionaries for saving
+        saved_multimers = materialize_multimer_dicts(dict(multimers))
+
+        if isinstance(saved_multimers, dict):
+            for key, value in saved_multimers.items():
                 if isinstance(value, list) and len(value) > 0:
                     # Check if this looks like context data (nested protein structures)
                     if isinstance(value[0], dict) and 'protein' in value[0] and 'branching_sites' in value[0]:
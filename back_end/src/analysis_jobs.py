@@ -0,0 +1,629 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+import src.api_jobs as api_jobs
+from src.artifact_cache import env_megabytes
+from src.data_registry import file_signature, get_data_registry
+from src.worker_pools import get_worker_pools
+
+logger = logging.getLogger(__name__)
+
+"""
+ANALYSIS JOBS
+=============
+
+Long analyses run as jobs that outlive the HTTP request that started them:
+
+    submit      AnalysisJobManager.submit(kind, request_data) -> AnalysisJob (job_id)
+    progress    job.events, the progress_callback protocol of the analysis
+                ({'type': 'progress' | 'timing_analysis' | 'complete', ...})
+    result      job.result once job.status == 'complete'
+
+Results are written to back_end/data/job_results/<key>.json, keyed by the job kind,
+the normalised request parameters and the (mtime, size) of the data files the job
+reads, so an identical request is answered from disk without running the analysis.
+Each write prunes the store: results whose data files changed since, results older
+than UBIQUITIN_JOB_RESULTS_MAX_AGE_DAYS (default 30) and the oldest results beyond
+UBIQUITIN_JOB_RESULTS_DISK_MB (default 4096) are removed.
+Identical requests submitted while a job runs share that job.
+
+Process workers report progress on one Manager queue as (job_id, event) pairs; a
+dispatcher thread hands them to the event loop, so nothing polls.
+
+Live subscribers (the analyze-subgraphs SSE stream) submit with watch=True and
+read job.iter_updates(): progress coalesced to at most one update per
+PROGRESS_INTERVAL carrying every finished result row, and heartbeats when idle.
+Workers only send rows (nonzero counts) for jobs started with watch=True; they
+are buffered while a watcher is attached and dropped once every watcher has read
+them, and job.events (replayed by /events) keeps no rows.
+When the last watcher leaves a cancellable job that no other request asked for,
+its Manager cancel event is set and the worker stops after the current graph.
+"""
+
+JOB_RESULTS_DIR = project_root / 'back_end' / 'data' / 'job_results'
+MAX_FINISHED_JOBS = 256
+PROGRESS_INTERVAL = 0.25  # seconds between coalesced progress updates
+HEARTBEAT_INTERVAL = 15.0  # seconds without output before a heartbeat
+_JOB_FINISHED = '_job_finished'
+
+
+def _subgraph_params(data: dict) -> dict:
+    result_format = data.get("result_format", "nested")
+    if result_format not in api_jobs.SUBGRAPH_RESULT_FORMATS:
+        raise ValueError(f"Invalid result_format value (expected one of {', '.join(api_jobs.SUBGRAPH_RESULT_FORMATS)})")
+    return {
+        "higher_level_size": int(data.get("higher_level_size", 5)),  # Default to pentamers
+        "n_level_size": int(data.get("n_level_size", 4)),  # Default to tetramers
+        "higher_level_lysine_ids": sorted(set(data.get("higher_level_lysine_ids", ["K48", "K63"]))),  # Default to K48/K63
+        "n_level_lysine_ids": sorted(set(data.get("n_level_lysine_ids", ["K48", "K63"]))),
+        "result_format": result_format
+    }
+
+
+def _subgraph_data_paths(params: dict) -> list:
+    registry = get_data_registry()
+    return [registry.multimer_contexts_path(params["higher_level_size"]), registry.multimer_contexts_path(params["n_level_size"])]
+
+
+# Job kind -> how to normalise its parameters, which files it reads, what runs
+# and whether the function takes a cancel_event and an emit_rows flag
+JOB_KINDS = {
+    'analyze-subgraphs': {
+        'params': _subgraph_params,
+        'data_paths': _subgraph_data_paths,
+        'function': api_jobs.subgraph_containment_outputs,
+        'cancellable': True,
+        'rows': True
+    }
+}
+
+
+def job_key(kind: str, params: dict, data_paths: list) -> str:
+    """
+    Cache key of a job: sha256 of the kind, the parameters and the data file signatures.
+    """
+    signature = [[Path(path).name, mtime, size] for path, mtime, size in file_signature(data_paths)]
+    payload = json.dumps({"kind": kind, "params": params, "data": signature}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TaggedQueue:
+    """
+    Picklable progress sink putting (tag, event) pairs on a shared queue.
+    """
+
+    def __init__(self, queue, tag: str):
+        self.queue = queue
+        self.tag = tag
+
+    def put(self, event):
+        self.queue.put((self.tag, event))
+
+
+def _env_days(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    try:
+        return float(value) if value not in (None, '') else default
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}; using {default} days")
+        return default
+
+
+class ResultStore:
+    """
+    Job results on local disk, one JSON file per job key, with a small
+    <key>.meta.json next to it (kind, parameters and the data file signature).
+
+    Args:
+        directory (Path): Folder of the result files (created on first write).
+        max_bytes (int): Limit of all result files; the oldest are removed first.
+        max_age_seconds (float): Results older than this are removed.
+    """
+
+    def __init__(self, directory: Path = JOB_RESULTS_DIR, max_bytes: int | None = None, max_age_seconds: float | None = None):
+        if max_bytes is None:
+            max_bytes = env_megabytes('UBIQUITIN_JOB_RESULTS_DISK_MB', 4096)
+        if max_age_seconds is None:
+            max_age_seconds = _env_days('UBIQUITIN_JOB_RESULTS_MAX_AGE_DAYS', 30) * 24 * 3600
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    def __repr__(self):
+        return f"ResultStore(directory={str(self.directory)!r}, max_bytes={self.max_bytes}, max_age_seconds={self.max_age_seconds})"
+
+    def path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+
+    def meta_path(self, key: str) -> Path:
+        return self.directory / f'{key}.meta.json'
+
+    def get(self, key: str):
+        """Stored result of key, or None."""
+        try:
+            with open(self.path(key), 'r') as f:
+                return json.load(f)['result']
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable job result {self.path(key)}: {e}")
+            return None
+
+    def put(self, key: str, kind: str, params: dict, result, data_paths: list = ()):
+        """
+        Write the result atomically (temporary file + rename), then prune the store.
+
+        Args:
+            data_paths (list): Files the result was computed from; it is removed once
+                their file_signature() changes.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        created_at = time.time()
+        meta = {
+            "kind": kind,
+            "params": params,
+            "created_at": created_at,
+            "data": [list(entry) for entry in file_signature(data_paths)]
+        }
+        self._write(self.path(key), {**meta, "result": result})
+        self._write(self.meta_path(key), meta)
+        self.prune(keep=key)
+
+    @staticmethod
+    def _write(path: Path, content: dict):
+        temporary_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        with open(temporary_path, 'w') as f:
+            json.dump(content, f)
+        os.replace(temporary_path, path)
+
+    def remove(self, key: str):
+        self.path(key).unlink(missing_ok=True)
+        self.meta_path(key).unlink(missing_ok=True)
+
+    def prune(self, keep: str | None = None):
+        """
+        Remove stale results (data files changed), results older than max_age_seconds
+        and the oldest results beyond max_bytes; keep is never removed.
+        """
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*.json'):
+            if path.name.endswith('.meta.json'):
+                continue
+            key = path.name[:-len('.json')]
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if key != keep:
+                if now - stat.st_mtime > self.max_age_seconds or self._is_stale(key):
+                    self.remove(key)
+                    continue
+            entries.append((key == keep, stat.st_mtime_ns, stat.st_size, key))
+
+        total = sum(size for _, _, size, _ in entries)
+        for kept, _, size, key in sorted(entries):
+            if total <= self.max_bytes or kept:
+                break
+            self.remove(key)
+            total -= size
+
+    def _is_stale(self, key: str) -> bool:
+        """Whether the data files of a result changed (results without metadata are kept)."""
+        try:
+            with open(self.meta_path(key), 'r') as f:
+                data = json.load(f)["data"]
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError):
+            return True
+        return data != [list(entry) for entry in file_signature([path for path, _, _ in data])]
+
+
+class AnalysisJob:
+    """
+    State of one submitted analysis, updated on the event loop.
+    """
+
+    def __init__(self, kind: str, params: dict, key: str):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.key = key
+        self.status = 'queued'
+        self.cached = False
+        self.events = []
+        self.live_rows = {}  # event index -> result row, only while someone watches
+        self._row_cursors = {}  # iter_updates() generator -> next event index
+        self.latest_progress = None
+        self.timing_analysis = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.watchers = 0
+        self.keep_running = False
+        self.cancel_event = None
+        self.cancelled = False
+        self._changed = asyncio.Event()
+
+    def __repr__(self):
+        return f"AnalysisJob(job_id={self.job_id!r}, kind={self.kind!r}, status={self.status!r})"
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('complete', 'error', 'cancelled')
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def record_event(self, event: dict):
+        if self.status == 'queued':
+            self.status = 'running'
+        # Result rows only go to live watchers (iter_updates()); the stored events
+        # stay small and the rows are in the job result
+        if "row" in event:
+            if self.watchers:
+                self.live_rows[len(self.events)] = event["row"]
+            event = {key: value for key, value in event.items() if key != "row"}
+        self.events.append(event)
+        if event.get("type") == "progress":
+            self.latest_progress = event
+        elif event.get("type") == "timing_analysis":
+            self.timing_analysis = event
+        self._notify()
+
+    def finish(self, result=None, error: str | None = None):
+        self.result = result
+        self.error = error
+        if error is None:
+            self.status = 'complete'
+        else:
+            self.status = 'cancelled' if self.cancelled else 'error'
+        self.finished_at = time.time()
+        if not self.watchers:
+            self.drop_live_rows()
+        self._notify()
+
+    def drop_live_rows(self):
+        self.live_rows.clear()
+
+    def _consumed_rows(self, token, cursor: int):
+        """Record how far an iter_updates() has read and drop rows every watcher has read."""
+        self._row_cursors[token] = cursor
+        if len(self._row_cursors) < self.watchers:
+            # A watcher that has not started reading still needs its rows
+            return
+        oldest = min(self._row_cursors.values())
+        for index in [index for index in self.live_rows if index < oldest]:
+            del self.live_rows[index]
+
+    async def wait_for_change(self):
+        """Return after the next event or status change."""
+        await self._changed.wait()
+
+    async def wait(self):
+        """Return once the job has finished."""
+        while not self.done:
+            await self.wait_for_change()
+
+    async def iter_events(self, start: int = 0):
+        """Yield the progress events from index start on, until the job has finished."""
+        cursor = start
+        while True:
+            while cursor < len(self.events):
+                yield self.events[cursor]
+                cursor += 1
+            if self.done:
+                return
+            await self.wait_for_change()
+
+    async def iter_updates(self, progress_interval: float = PROGRESS_INTERVAL, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        """
+        Yield the events for a live subscriber until the job has finished.
+
+        'progress' events arriving within progress_interval are merged into one
+        (latest counters, the finished result rows of all of them under 'rows');
+        other events pass through in order, and {'type': 'heartbeat'} is yielded
+        after heartbeat_interval seconds without output.
+        """
+        loop = asyncio.get_running_loop()
+        token = object()
+        try:
+            async for update in self._iter_updates(token, loop, progress_interval, heartbeat_interval):
+                yield update
+        finally:
+            self._row_cursors.pop(token, None)
+
+    async def _iter_updates(self, token, loop, progress_interval: float, heartbeat_interval: float):
+        cursor = 0
+        pending = None
+        last_progress = float('-inf')
+        last_output = loop.time()
+        while True:
+            while cursor < len(self.events):
+                event = self.events[cursor]
+                cursor += 1
+                if event.get("type") == "progress":
+                    rows = pending["rows"] if pending is not None else []
+                    row = self.live_rows.get(cursor - 1)
+                    if row is not None:
+                        rows.append(row)
+                    pending = dict(event)
+                    pending["rows"] = rows
+                    continue
+                if pending is not None:
+                    yield pending
+                    pending = None
+                    last_progress = loop.time()
+                yield event
+                last_output = loop.time()
+
+            self._consumed_rows(token, cursor)
+            now = loop.time()
+            if pending is not None and (self.done or now - last_progress >= progress_interval):
+                yield pending
+                pending = None
+                last_progress = last_output = now
+            if self.done:
+                return
+            if now - last_output >= heartbeat_interval:
+                yield {"type": "heartbeat"}
+                last_output = now
+
+            timeout = heartbeat_interval - (now - last_output)
+            if pending is not None:
+                timeout = min(timeout, progress_interval - (now - last_progress))
+            try:
+                await asyncio.wait_for(self.wait_for_change(), max(0.0, timeout))
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "job_status": self.status,
+            "cached": self.cached,
+            "progress": self.latest_progress,
+            "timing_analysis": self.timing_analysis,
+            "event_count": len(self.events),
+            "watchers": self.watchers,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class AnalysisJobManager:
+    """
+    Submits analysis jobs to the CPU worker pool and keeps their state.
+
+    Args:
+        result_store (ResultStore): Where results are persisted.
+        max_finished_jobs (int): Finished jobs kept in memory; older ones are only on disk.
+    """
+
+    def __init__(self, result_store: ResultStore | None = None, max_finished_jobs: int = MAX_FINISHED_JOBS):
+        self.result_store = result_store or ResultStore()
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs = OrderedDict()
+        self._running_by_key = {}
+        self._tasks = set()
+        self._loop = None
+        self._progress_queue = None
+        self._dispatcher = None
+
+    def __repr__(self):
+        return f"AnalysisJobManager(result_store={self.result_store!r}, jobs={len(self._jobs)})"
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def _add(self, job: AnalysisJob):
+        self._jobs[job.job_id] = job
+        finished = [job_id for job_id, stored in self._jobs.items() if stored.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    # =========================================
+    # Progress dispatch
+    # =========================================
+
+    def _dispatch_progress(self, progress_queue):
+        """Dispatcher thread: forward (job_id, event) pairs to the event loop."""
+        while True:
+            try:
+                item = progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._record_progress, *item)
+
+    def _record_progress(self, job_id: str, event):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        if event == _JOB_FINISHED:
+            # All events the worker sent precede this marker
+            job.finish(job.result, job.error)
+        else:
+            job.record_event(event)
+
+    async def _ensure_dispatcher(self):
+        if self._dispatcher is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        worker_pools = get_worker_pools()
+        self._progress_queue = await worker_pools.io.run(worker_pools.progress_queue)
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_progress, args=(self._progress_queue,), name='analysis-job-progress', daemon=True
+        )
+        self._dispatcher.start()
+
+    # =========================================
+    # Jobs
+    # =========================================
+
+    async def submit(self, kind: str, request_data: dict, watch: bool = False) -> AnalysisJob:
+        """
+        Start a job, or return the stored result or the running job of an identical request.
+
+        Args:
+            kind (str): A key of JOB_KINDS.
+            request_data (dict): Request parameters of the job.
+            watch (bool): The caller follows the job live and calls release() when it
+                stops; a job only watched this way is cancelled once nobody watches it.
+                Otherwise the job runs to completion.
+
+        Raises:
+            ValueError: If kind is unknown.
+            PoolSaturatedError: If the CPU worker pool cannot admit the job.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind!r}")
+        job_kind = JOB_KINDS[kind]
+        params = job_kind['params'](request_data)
+        key = job_key(kind, params, job_kind['data_paths'](params))
+
+        running_job = self._running_by_key.get(key)
+        if running_job is not None:
+            return self._attach(running_job, watch)
+
+        worker_pools = get_worker_pools()
+        job = AnalysisJob(kind, params, key)
+        stored_result = await worker_pools.io.run(self.result_store.get, key)
+        running_job = self._running_by_key.get(key)
+        if running_job is not None:
+            # An identical request was started while the store was read
+            return self._attach(running_job, watch)
+        if stored_result is not None:
+            job.cached = True
+            job.finish(stored_result)
+            self._add(job)
+            return job
+
+        await self._ensure_dispatcher()
+        function_kwargs = {"progress_queue": TaggedQueue(self._progress_queue, job.job_id)}
+        if job_kind.get('rows'):
+            # Result rows only cross the process boundary for a job started by a live watcher
+            function_kwargs["emit_rows"] = watch
+        if job_kind.get('cancellable'):
+            job.cancel_event = function_kwargs["cancel_event"] = await worker_pools.io.run(worker_pools.cancel_event)
+        running_job = self._running_by_key.get(key)
+        if running_job is not None:
+            return self._attach(running_job, watch)
+        future = worker_pools.cpu.submit(job_kind['function'], **params, **function_kwargs)
+        self._attach(job, watch)
+        self._add(job)
+        self._running_by_key[key] = job
+        task = asyncio.ensure_future(self._complete(job, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _attach(self, job: AnalysisJob, watch: bool) -> AnalysisJob:
+        if watch:
+            job.watchers += 1
+        else:
+            job.keep_running = True
+        return job
+
+    def release(self, job: AnalysisJob):
+        """
+        Drop a watcher added by submit(watch=True). The last watcher leaving cancels
+        the job unless a request without watch shares it.
+        """
+        job.watchers = max(0, job.watchers - 1)
+        if not job.watchers:
+            job.drop_live_rows()
+        if job.watchers or job.keep_running or job.done or job.cancelled or job.cancel_event is None:
+            return
+        logger.info(f"Cancelling job {job.job_id} ({job.kind}): no client is watching it")
+        job.cancelled = True
+        if self._running_by_key.get(job.key) is job:
+            # An identical request from now on starts a new job
+            del self._running_by_key[job.key]
+        task = asyncio.ensure_future(self._set_cancel_event(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _set_cancel_event(self, job: AnalysisJob):
+        try:
+            await get_worker_pools().io.run(job.cancel_event.set)
+        except Exception as e:
+            logger.warning(f"Could not cancel job {job.job_id}: {e}")
+
+    async def _complete(self, job: AnalysisJob, future):
+        worker_pools = get_worker_pools()
+        try:
+            job.result = await future
+            data_paths = JOB_KINDS[job.kind]['data_paths'](job.params)
+            await worker_pools.io.run(self.result_store.put, job.key, job.kind, job.params, job.result, data_paths)
+        except api_jobs.JobCancelledError:
+            logger.info(f"Job {job.job_id} ({job.kind}) cancelled")
+            job.result, job.error = None, "Job cancelled: no client was watching it"
+        except Exception as e:
+            logger.error(f"Job {job.job_id} ({job.kind}) failed: {e}")
+            job.result, job.error = None, str(e)
+        finally:
+            if self._running_by_key.get(job.key) is job:
+                del self._running_by_key[job.key]
+
+        # Finish through the progress queue so the job completes after its last event
+        try:
+            await worker_pools.io.run(self._progress_queue.put, (job.job_id, _JOB_FINISHED))
+        except Exception:
+            job.finish(job.result, job.error)
+
+    def shutdown(self):
+        """Stop the dispatcher thread (running jobs are abandoned)."""
+        if self._dispatcher is not None:
+            try:
+                self._progress_queue.put(None)
+            except Exception:
+                pass
+            self._dispatcher.join(timeout=5)
+            self._dispatcher = None
+            self._progress_queue = None
+
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> AnalysisJobManager:
+    """Return the process-wide AnalysisJobManager."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = AnalysisJobManager()
+        return _job_manager
+
+
+def shutdown_job_manager():
+    """Stop the process-wide job manager; the next get_job_manager() creates a new one."""
+    global _job_manager
+    with _job_manager_lock:
+        manager, _job_manager = _job_manager, None
+    if manager is not None:
+        manager.shutdown()
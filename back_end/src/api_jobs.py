@@ -0,0 +1,360 @@
+import base64
+import json
+import sys
+import time
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+from src.data_registry import get_data_registry
+from src.worker_pools import analysis_shard_workers
+from src.plate_renderer import render_plate
+from src.artifact_bundles import build_bundle
+from src.containment_matrices import ContainmentResult
+
+"""
+API JOBS
+========
+
+CPU-heavy work of the API endpoints as top-level functions, so the handlers can
+run them on the process pool of worker_pools.py. Jobs take small, picklable
+arguments, read their data through the DataRegistry of the process they run in
+and return JSON-ready dictionaries.
+"""
+
+
+# =========================================
+# Plate generation
+# =========================================
+
+def plate_generation_artifacts(selected_ids: list, page: str, multimer_size: int, figure_format: str = 'png') -> dict:
+    """
+    Plate maps, reagent sheet, Opentrons protocol and reaction sequences for the selected multimers.
+
+    Args:
+        selected_ids (list): UbX_Y ids selected in the UI.
+        page (str): 'tetramers' or 'pentamers' (echoed in the response).
+        multimer_size (int): Size of the selected multimers.
+        figure_format (str): Image format of the plate maps, 'png' or 'svg'.
+
+    Returns:
+        dict: received_labels, page, status, figure_format and the raw bytes of each
+            artifact under 'artifacts' (an error dictionary if an id is unknown).
+    """
+    import src.plotting as plotting
+
+    # Shared tables from the data registry (parsed once per process)
+    data_dict = get_data_registry().filtered_reaction_database(multimer_size)
+    combined_database = data_dict['combined_database']
+
+    # Convert selected ids to a list of indexes
+    indexes = []
+    for id in selected_ids:
+        try:
+            new_index = int(combined_database[(combined_database['multimer_id'] == id) & (combined_database['used_in_synthesis'] == 1)]['index'].unique()[0])
+            indexes.append(new_index)
+        except Exception as e:
+            return {"error": f"ID {id} not found or invalid: {str(e)}", "status": "error"}
+
+    # Create plate dataframes
+    output_dict = plotting.inner_create_plate_dfs(data_dict, indexes, multimer_size)
+
+    # Extract the plate dataframes
+    enzymes_donors_96 = output_dict['enzymes_donors_96']
+    deprots_96 = output_dict['deprots_96']
+    acceptors_96 = output_dict['dimer_acceptors_96']
+
+    # Render the plate maps on the reusable templates of this worker
+    fig1_bytes = render_plate('enzymes_donors', enzymes_donors_96, 'Plate map: Enzyme + Donor Mixes', figure_format)
+    fig2_bytes = render_plate('deprots', deprots_96, 'Deprotection Cycles', figure_format)
+    fig3_bytes = render_plate('acceptors', acceptors_96, 'Plate map: Acceptors', figure_format)
+
+    # Generate Excel file
+    excel_bytes = plotting.create_xlsx_bytes(output_dict)
+    excel_bytes.seek(0)
+
+    # Generate python opentrons file
+    opentrons_bytes = plotting.create_opentrons_file_bytes(output_dict)
+    opentrons_bytes.seek(0)
+
+    # Reaction sequences as JSON
+    reaction_sequences_dicts = plotting.build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size)
+
+    return {
+        "received_labels": indexes,
+        "page": page,
+        "status": "ok",
+        "figure_format": figure_format,
+        "artifacts": {
+            "enzymes_donors_96": fig1_bytes,
+            "deprots_96": fig2_bytes,
+            "acceptors_96": fig3_bytes,
+            "reagent_calculations.xlsx": excel_bytes.read(),
+            "opentrons.py": opentrons_bytes.read(),
+            "reaction_sequences.json": json.dumps(reaction_sequences_dicts).encode('utf-8')
+        }
+    }
+
+
+def plate_generation_outputs(selected_ids: list, page: str, multimer_size: int, figure_format: str = 'png') -> dict:
+    """
+    The artifacts of plate_generation_artifacts() base64-encoded in one JSON-ready dictionary.
+
+    Returns:
+        dict: Response content of /api/submit-selection (an error dictionary if an id is unknown).
+    """
+    outputs = plate_generation_artifacts(selected_ids, page, multimer_size, figure_format)
+    if outputs.get("status") != "ok":
+        return outputs
+    artifacts = outputs.pop("artifacts")
+    outputs["figures"] = {name: base64.b64encode(artifact).decode('utf-8') for name, artifact in artifacts.items()}
+    return outputs
+
+
+def plate_generation_bundle(selected_ids: list, page: str, multimer_size: int, figure_format: str = 'png'):
+    """
+    The artifacts of plate_generation_artifacts() as a zip bundle (see artifact_bundles.py).
+
+    Returns:
+        bytes | dict: The zip archive, or the error dictionary if an id is unknown.
+    """
+    outputs = plate_generation_artifacts(selected_ids, page, multimer_size, figure_format)
+    if outputs.get("status") != "ok":
+        return outputs
+    return build_bundle(outputs)
+
+
+# =========================================
+# Reaction sequences
+# =========================================
+
+def reaction_sequences_b64(indexes: list, multimer_size: int) -> str:
+    """
+    Reaction schemes of the given simulation indexes as base64-encoded JSON.
+
+    Args:
+        indexes (list): Simulation indexes of the filtered reaction database.
+        multimer_size (int): Size of the multimers.
+
+    Returns:
+        str: base64 of the JSON list built by plotting.build_reaction_dictionaries_for_UI().
+    """
+    import src.plotting as plotting
+
+    data_dict = get_data_registry().filtered_reaction_database(multimer_size)
+    reaction_sequences_dicts = plotting.build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size)
+    return base64.b64encode(json.dumps(reaction_sequences_dicts).encode('utf-8')).decode('utf-8')
+
+
+# =========================================
+# Subgraph analysis
+# =========================================
+
+SUBGRAPH_RESULT_FORMATS = ('nested', 'matrix')
+
+
+class JobCancelledError(RuntimeError):
+    """Raised in a worker when the cancel event of its job is set."""
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelledError("Job cancelled")
+
+
+def precomputed_containment(higher_level_size: int, n_level_size: int, higher_level_dict: dict, n_level_dict: dict):
+    """
+    analyze_subgraph_containment() counts from the precomputed containment matrix.
+
+    Returns:
+        ContainmentResult | None: The counts, or None when no current matrix covers the multimers.
+    """
+    matrix = get_data_registry().containment_matrix(higher_level_size, n_level_size)
+    if matrix is None:
+        return None
+    try:
+        return matrix.select(higher_level_dict, n_level_dict)
+    except KeyError:
+        return None
+
+
+def subgraph_containment_outputs(
+        higher_level_size: int,
+        n_level_size: int,
+        higher_level_lysine_ids: set,
+        n_level_lysine_ids: set,
+        result_format: str = 'nested',
+        progress_queue=None,
+        cancel_event=None,
+        emit_rows=False
+    ) -> dict:
+    """
+    Subgraph containment of the n-level multimers in the higher-level multimers.
+
+    Args:
+        higher_level_size (int): Size of the containing multimers.
+        n_level_size (int): Size of the contained multimers.
+        higher_level_lysine_ids (set): Linkages allowed in the higher-level multimers.
+        n_level_lysine_ids (set): Linkages allowed in the n-level multimers.
+        result_format (str): 'nested' returns the counts as "results"
+            ({higher-level edges: {n-level edges: count}}), 'matrix' as "matrix"
+            (ContainmentResult.to_json()); both include the CSV.
+        progress_queue (queue, optional): Receives every progress update of
+            analyze_subgraph_containment() (e.g. WorkerPools.progress_queue()).
+        cancel_event (Event, optional): Checked after every higher-level graph; when
+            set the analysis stops with JobCancelledError (e.g. WorkerPools.cancel_event()).
+        emit_rows (bool): Put the nonzero counts of every finished row on the progress
+            queue as well (only for live streams).
+
+    Returns:
+        dict: Response content of /api/analyze-subgraphs, with "timing_analysis"
+        when the analysis reported an estimate.
+    """
+    import src.all_linkages as linkages
+
+    if result_format not in SUBGRAPH_RESULT_FORMATS:
+        raise ValueError(f"Invalid result_format: {result_format!r}. Must be one of {SUBGRAPH_RESULT_FORMATS}")
+
+    # A job cancelled while it waited for a worker stops before loading anything
+    _check_cancelled(cancel_event)
+
+    # Load the data
+    registry = get_data_registry()
+    higher_level_data = registry.multimer_contexts(higher_level_size)
+    n_level_data = registry.multimer_contexts(n_level_size)
+
+    # Filter by lysine types
+    higher_level_dict = linkages.get_multimer_edges_by_lysines(higher_level_data, higher_level_lysine_ids)
+    n_level_dict = linkages.get_multimer_edges_by_lysines(n_level_data, n_level_lysine_ids)
+
+    # Store timing information for response
+    timing_info = {}
+
+    def progress_callback(progress_data):
+        """Callback to capture timing information and forward progress"""
+        nonlocal timing_info
+        if progress_queue is not None:
+            progress_queue.put(progress_data)
+        if progress_data.get("type") == "progress":
+            _check_cancelled(cancel_event)
+        if progress_data.get("type") == "timing_analysis":
+            timing_info = {
+                "completed_iterations": progress_data.get("completed_iterations"),
+                "elapsed_time": progress_data.get("elapsed_time"),
+                "avg_time_per_iteration": progress_data.get("avg_time_per_iteration"),
+                "estimated_total_time": progress_data.get("estimated_total_time"),
+                "estimated_remaining_time": progress_data.get("estimated_remaining_time"),
+                "estimated_total_seconds": progress_data.get("estimated_total_seconds"),
+                "estimated_remaining_seconds": progress_data.get("estimated_remaining_seconds")
+            }
+
+    # Serve the precomputed containment matrix when it matches the data, else run
+    # the analysis with progress callback
+    analysis_start_time = time.time()
+    result = precomputed_containment(higher_level_size, n_level_size, higher_level_dict, n_level_dict)
+    precomputed = result is not None
+    results = None
+    if precomputed:
+        if progress_queue is not None:
+            progress_queue.put({
+                "type": "complete",
+                "message": "Served from the precomputed containment matrix",
+                "total_results": len(result.row_labels)
+            })
+    else:
+        # Shard large analyses across UBIQUITIN_ANALYSIS_SHARDS processes
+        shards = analysis_shard_workers()
+        results = linkages.analyze_subgraph_containment(
+            higher_level_dict, n_level_dict, progress_callback, parallel=shards > 1, max_workers=shards,
+            emit_rows=emit_rows
+        )
+        result = ContainmentResult.from_nested(results)
+    total_analysis_time = time.time() - analysis_start_time
+
+    # Convert results to CSV bytes
+    csv_bytes = result.to_dataframe().to_csv().encode('utf-8')
+    csv_b64 = base64.b64encode(csv_bytes).decode('utf-8')
+
+    response_content = {"status": "ok"}
+    if result_format == 'matrix':
+        response_content["matrix"] = result.to_json()
+    else:
+        response_content["results"] = results if results is not None else result.to_nested()
+    response_content.update({
+        "csv_b64": csv_b64,
+        "analysis_metadata": {
+            "total_analysis_time": total_analysis_time,
+            "higher_level_count": len(higher_level_dict),
+            "n_level_count": len(n_level_dict),
+            "total_comparisons": len(higher_level_dict) * len(n_level_dict),
+            "precomputed": precomputed
+        }
+    })
+
+    # Add timing information if available
+    if timing_info:
+        response_content["timing_analysis"] = timing_info
+
+    return response_content
+
+
+# =========================================
+# Reaction path statistics
+# =========================================
+
+def reaction_path_statistics_outputs(multimer_size: int, pathway_type: str) -> list:
+    """
+    Reaction pathway and linkage statistics of every multimer of a size.
+
+    Args:
+        multimer_size (int): Multimer size.
+        pathway_type (str): 'aboc' (Aboc-saturated database paths) or 'all' (every reaction network path).
+
+    Returns:
+        list: Output of plotting.reaction_path_statistics().
+    """
+    import src.all_linkages as linkages
+    import src.plotting as plotting
+
+    registry = get_data_registry()
+    path_counts = None
+    if pathway_type == 'aboc':
+        # Load the filtered data
+        data_dict = registry.filtered_reaction_database(multimer_size)
+        context_history = data_dict['context_history']
+        ubiquitin_history = data_dict['ubiquitin_history']
+
+    elif pathway_type == 'all':
+        # Count the paths per final multimer on the species graph instead of
+        # loading and deprotecting every reaction history (cached in the registry)
+        path_counts = registry.final_multimer_path_counts(multimer_size)
+        context_history = None
+        ubiquitin_history = None
+
+    else:
+        raise ValueError(f"Unknown pathway_type: {pathway_type!r}")
+
+    # Load multimers JSON file
+    multimers = registry.multimer_id_to_json(multimer_size)
+
+    # Trimer containment with K48 and K63 linkages, precomputed when available
+    containment_results = None
+    try:
+        containment_results = precomputed_containment(
+            multimer_size,
+            3,
+            linkages.get_multimer_edges_by_lysines(registry.multimer_contexts(multimer_size), {"K48", "K63"}),
+            linkages.get_multimer_edges_by_lysines(registry.multimer_contexts(3), {"K48", "K63"})
+        )
+    except FileNotFoundError:
+        pass
+
+    return plotting.reaction_path_statistics(
+        ubiquitin_history, context_history, multimers, project_root, multimer_size,
+        path_counts=path_counts, containment_results=containment_results
+    )
@@ -0,0 +1,186 @@
+import gzip
+import io
+import json
+import logging
+import re
+import sys
+import zipfile
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+try:
+    import brotli
+except ImportError:  # Optional; without it responses are only gzip-compressed
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+"""
+ARTIFACT BUNDLES
+================
+
+Binary response modes of /api/submit-selection. Instead of one JSON document with
+every artifact base64-encoded, the artifacts are packed into a zip bundle:
+
+    manifest.json               received_labels, page, status, figure_format and
+                                the artifact list (first member of the archive)
+    enzymes_donors_96.<fmt>     plate maps (PNG or SVG)
+    deprots_96.<fmt>
+    acceptors_96.<fmt>
+    reagent_calculations.xlsx
+    opentrons.py
+    reaction_sequences.json
+
+The bundle is what the artifact cache stores. The API returns either the archive
+itself or bundle_manifest() - the manifest with the size, media type and URL of
+every artifact - so a client fetches the artifacts independently (in parallel,
+and only the ones it shows).
+
+Text artifacts (JSON, Python, SVG) and JSON responses are compressed with br or
+gzip according to the Accept-Encoding of the request (compress_body()); PNG and
+xlsx are already compressed and sent as they are.
+"""
+
+MANIFEST_NAME = 'manifest.json'
+BUNDLE_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+MIN_COMPRESS_BYTES = 1024
+
+MEDIA_TYPES = {
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.py': 'text/x-python',
+    '.json': 'application/json',
+    '.zip': 'application/zip'
+}
+COMPRESSIBLE_MEDIA_TYPES = {'application/json', 'text/x-python', 'image/svg+xml'}
+
+
+def media_type(filename: str) -> str:
+    return MEDIA_TYPES.get(Path(filename).suffix, 'application/octet-stream')
+
+
+def artifact_filename(name: str, figure_format: str) -> str:
+    """File name of an artifact in the bundle; plate maps get the figure format as extension."""
+    return name if Path(name).suffix else f'{name}.{figure_format}'
+
+
+def build_bundle(outputs: dict) -> bytes:
+    """
+    Pack the result of api_jobs.plate_generation_artifacts() into a zip bundle.
+
+    Args:
+        outputs (dict): received_labels, page, status, figure_format and the
+            artifact bytes under 'artifacts'.
+
+    Returns:
+        bytes: The zip archive, manifest.json first.
+    """
+    figure_format = outputs["figure_format"]
+    files = {artifact_filename(name, figure_format): artifact for name, artifact in outputs["artifacts"].items()}
+    manifest = {key: value for key, value in outputs.items() if key != "artifacts"}
+    manifest["artifacts"] = [
+        {"name": name, "filename": filename, "media_type": media_type(filename)}
+        for name, filename in zip(outputs["artifacts"], files)
+    ]
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as archive:
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest), compress_type=zipfile.ZIP_DEFLATED)
+        for filename, artifact in files.items():
+            # PNG and xlsx are compressed already
+            compress_type = zipfile.ZIP_DEFLATED if media_type(filename) in COMPRESSIBLE_MEDIA_TYPES else zipfile.ZIP_STORED
+            archive.writestr(filename, artifact, compress_type=compress_type)
+    return buf.getvalue()
+
+
+def bundle_manifest(bundle: bytes, bundle_id: str, base_url: str = '/api/artifact-bundles') -> dict:
+    """
+    Manifest of a bundle with the size and URL of every artifact.
+
+    Args:
+        bundle (bytes): Zip archive built by build_bundle().
+        bundle_id (str): Id of the bundle in the artifact cache.
+        base_url (str): Prefix of the artifact URLs.
+
+    Returns:
+        dict: The stored manifest plus bundle_id, bundle_url and per-artifact size and url.
+    """
+    with zipfile.ZipFile(io.BytesIO(bundle)) as archive:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+        for artifact in manifest["artifacts"]:
+            artifact["size"] = archive.getinfo(artifact["filename"]).file_size
+            artifact["url"] = f'{base_url}/{bundle_id}/{artifact["filename"]}'
+    manifest["bundle_id"] = bundle_id
+    manifest["bundle_url"] = f'{base_url}/{bundle_id}'
+    manifest["bundle_size"] = len(bundle)
+    return manifest
+
+
+def read_artifact(bundle: bytes, filename: str) -> bytes:
+    """
+    One artifact of a bundle.
+
+    Raises:
+        KeyError: If the bundle has no artifact of that name.
+    """
+    with zipfile.ZipFile(io.BytesIO(bundle)) as archive:
+        if filename == MANIFEST_NAME:
+            raise KeyError(filename)
+        return archive.read(filename)
+
+
+# =========================================
+# Response compression
+# =========================================
+
+def accepted_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Content encoding to use for a request: 'br' (if brotli is installed), 'gzip' or None.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for coding in ('br', 'gzip'):
+        if coding == 'br' and brotli is None:
+            continue
+        if accepted.get(coding, accepted.get('*', 0.0)) > 0:
+            return coding
+    return None
+
+
+def compress_body(body: bytes, accept_encoding: str | None, content_type: str = 'application/json') -> tuple:
+    """
+    Compress a response body for the client's Accept-Encoding.
+
+    Args:
+        body (bytes): Encoded response body.
+        accept_encoding (str): Accept-Encoding header of the request.
+        content_type (str): Media type; only COMPRESSIBLE_MEDIA_TYPES are compressed.
+
+    Returns:
+        tuple: (body, content encoding or None).
+    """
+    if content_type not in COMPRESSIBLE_MEDIA_TYPES or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    encoding = accepted_encoding(accept_encoding)
+    if encoding == 'br':
+        return brotli.compress(body, quality=5), encoding
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=5), encoding
+    return body, None
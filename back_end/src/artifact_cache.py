@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+logger = logging.getLogger(__name__)
+
+"""
+ARTIFACT CACHE
+==============
+
+Content-addressed cache of rendered /api/submit-selection responses (plate PNGs,
+reagent workbook, Opentrons script, reaction sequences), stored as the encoded
+JSON body or the zip bundle of artifact_bundles.py, so a hit is returned without
+re-rendering or re-serialising.
+
+    key       sha256 of (page, ids in submitted order, data signature, figure
+              format, variant 'json' or 'bundle')
+    memory    LRU bounded by total body bytes
+    disk      entries evicted from memory spill to back_end/data/artifact_cache,
+              itself bounded by bytes (oldest files removed first); a disk hit is
+              promoted back to memory
+
+Limits are read from UBIQUITIN_ARTIFACT_CACHE_MEMORY_MB (default 256) and
+UBIQUITIN_ARTIFACT_CACHE_DISK_MB (default 2048; 0 disables the spill).
+"""
+
+ARTIFACT_CACHE_DIR = project_root / 'back_end' / 'data' / 'artifact_cache'
+
+
+def artifact_key(page: str, ids: list, data_signature, figure_format: str = 'png', variant: str = 'json') -> str:
+    """
+    Cache key of a selection; the id order is kept because plate layouts follow it.
+
+    Args:
+        page (str): Page of the selection ('tetramers' or 'pentamers').
+        ids (list): Selected UbX_Y ids, in submitted order.
+        data_signature (tuple): file_signature() of the data the artifacts are built from.
+        figure_format (str): Image format of the plate maps.
+        variant (str): 'json' (base64 JSON body) or 'bundle' (zip bundle).
+    """
+    signature = [[Path(path).name, mtime, size] for path, mtime, size in data_signature]
+    payload = json.dumps({"page": page, "ids": [str(id) for id in ids], "data": signature, "figure_format": figure_format, "variant": variant}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def env_megabytes(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    try:
+        return int(float(value) * 1024 * 1024) if value not in (None, '') else default * 1024 * 1024
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}; using {default} MB")
+        return default * 1024 * 1024
+
+
+class ArtifactCache:
+    """
+    Byte-bounded LRU of response bodies with on-disk spill.
+
+    Args:
+        max_memory_bytes (int): Limit of the bodies held in memory.
+        directory (Path): Spill folder.
+        max_disk_bytes (int): Limit of the spill folder; 0 disables spilling.
+    """
+
+    def __init__(
+            self,
+            max_memory_bytes: int | None = None,
+            directory: Path = ARTIFACT_CACHE_DIR,
+            max_disk_bytes: int | None = None
+        ):
+        if max_memory_bytes is None:
+            max_memory_bytes = env_megabytes('UBIQUITIN_ARTIFACT_CACHE_MEMORY_MB', 256)
+        if max_disk_bytes is None:
+            max_disk_bytes = env_megabytes('UBIQUITIN_ARTIFACT_CACHE_DISK_MB', 2048)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory)
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.spills = 0
+
+    def __repr__(self):
+        return (
+            f"ArtifactCache(entries={len(self._entries)}, memory_bytes={self._memory_bytes}, "
+            f"max_memory_bytes={self.max_memory_bytes}, directory={str(self.directory)!r})"
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.bin'
+
+    def get(self, key: str):
+        """
+        Cached body of key from memory or the spill folder, or None.
+        """
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+
+        body = self._read_spilled(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self.put(key, body)
+        return body
+
+    def put(self, key: str, body: bytes):
+        """
+        Store a body, spilling the least recently used entries beyond the memory limit.
+        """
+        spilled = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._entries[key] = body
+            self._memory_bytes += len(body)
+            while self._memory_bytes > self.max_memory_bytes and self._entries:
+                evicted_key, evicted_body = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted_body)
+                spilled.append((evicted_key, evicted_body))
+
+        for evicted_key, evicted_body in spilled:
+            self._spill(evicted_key, evicted_body)
+
+    def _read_spilled(self, key: str):
+        if self.max_disk_bytes <= 0:
+            return None
+        path = self._path(key)
+        try:
+            body = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        path.unlink(missing_ok=True)  # Back in memory; spilled again on eviction
+        return body
+
+    def _spill(self, key: str, body: bytes):
+        if self.max_disk_bytes <= 0 or len(body) > self.max_disk_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            temporary_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+            temporary_path.write_bytes(body)
+            os.replace(temporary_path, path)
+            with self._lock:
+                self.spills += 1
+            self._prune_disk()
+        except OSError as e:
+            logger.warning(f"Could not spill artifact {key}: {e}")
+
+    def _prune_disk(self):
+        """Remove the oldest spilled entries beyond max_disk_bytes."""
+        files = []
+        for path in self.directory.glob('*.bin'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        for path in self.directory.glob('*.bin'):
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "spills": self.spills,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
+
+
+_artifact_cache = None
+_artifact_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> ArtifactCache:
+    """Return the process-wide ArtifactCache."""
+    global _artifact_cache
+    with _artifact_cache_lock:
+        if _artifact_cache is None:
+            _artifact_cache = ArtifactCache()
+        return _artifact_cache
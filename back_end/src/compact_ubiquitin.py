@@ -0,0 +1,1012 @@
+import json
+import sys
+import threading
+from array import array
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+from src.utils.utils import *
+
+"""
+COMPACT UBIQUITIN TREES
+=======================
+
+Array-backed representation of polyubiquitin structures used as the fast path
+for iterate_through_ubiquitin(), ubiquitin_building() and ubiquitin_simulation().
+
+Every ubiquitin of a multimer is one node, stored in pre-order (node index 0 is
+the proximal ubiquitin, index i is chain number i + 1 after relabelling).
+A tree is held in flat integer arrays:
+
+    parent[i]            index of the parent node (-1 for the root)
+    lysine[i]            site code on the parent the node is conjugated to (-1 for the root)
+    protecting_groups[i] 2 bits per site: 0 = free, 1 = SMAC, 2 = ABOC
+    template[i]          id of the (protein, FASTA_sequence) sequence template
+    chain_number[i]      chain number as stored in the dictionary
+    chain_length[i]      chain length as stored in the dictionary
+
+Site codes follow the order of the branching sites in every building block:
+K63, K48, K33, K29, K27, K11, K6, M1. Because each site holds at most one child
+and children are visited in site order, the pre-order numbering is canonical.
+
+The single-pass engine at the end of this module applies the same layout rules
+directly to dictionaries, producing the relabelled dictionary and its context in
+one traversal.
+
+Only dictionaries in the canonical layout (key order and site order of the
+building blocks) are converted; anything else raises CompactConversionError so
+callers can fall back to the nested dictionary traversal in main.py.
+"""
+
+SITE_NAMES = ('K63', 'K48', 'K33', 'K29', 'K27', 'K11', 'K6', 'M1')
+SITE_SEQUENCE_IDS = ('NIQ(K)EST', 'FAG(K)QLE', 'IQD(K)EGI', 'VKA(K)IQD', 'ENV(K)AKI', 'LTG(K)TIT', 'IFV(K)TLT', '(M)QIF')
+SITE_CODES = {site_name: site_code for site_code, site_name in enumerate(SITE_NAMES)}
+
+PROTECTING_GROUPS = ('', 'SMAC', 'ABOC')
+SMAC_CODE = 1
+ABOC_CODE = 2
+
+# Bit masks selecting every SMAC (01) or every ABOC (10) site of a protecting_groups value
+SMAC_MASK = 0x5555
+ABOC_MASK = 0xAAAA
+
+PROTEIN_KEYS = ('protein', 'chain_number', 'FASTA_sequence', 'chain_length', 'branching_sites')
+BRANCH_KEYS = ('site_name', 'sequence_id', 'children')
+
+HISTAG_UBIQUITIN_FASTA = "MQIFVKTLTGKTITLEVEPSDTIENVKAKIQDKEGIPPDQQRLIFAGKQLEDGRTLSDYNIQKESTLHLVLRLRGGDHHHHHH"
+UBIQUITIN_FASTA = "MQIFVKTLTGKTITLEVEPSDTIENVKAKIQDKEGIPPDQQRLIFAGKQLEDGRTLSDYNIQKESTLHLVLRLRGG"
+
+# Free lysines reported in the context (M1 is never reported)
+MAIN_FREE_SITES = frozenset({SITE_CODES['K63'], SITE_CODES['K48']})
+ALL_FREE_SITES = frozenset(SITE_CODES[site] for site in ('K63', 'K48', 'K33', 'K29', 'K27', 'K11', 'K6'))
+
+E2_REACTION_SITES = {'K48': SITE_CODES['K48'], 'K63': SITE_CODES['K63']}
+
+
+class CompactConversionError(ValueError):
+    """Raised when a structure cannot be represented losslessly as a CompactUbiquitin."""
+
+
+# =========================================
+# Sequence templates
+# =========================================
+
+_templates = []             # template id -> (protein, FASTA_sequence)
+_template_ids = {}          # (protein, FASTA_sequence) -> template id
+_template_lock = threading.Lock()
+
+
+def intern_sequence_template(protein, FASTA_sequence):
+    """
+    Returns the template id of a (protein, FASTA_sequence) pair, registering it on first use.
+
+    The branching sequence ids are located in the FASTA sequence once per template,
+    instead of once per node and traversal.
+
+    Raises:
+        CompactConversionError: If the values are not strings or a branching site
+            sequence is missing from the FASTA sequence.
+    """
+    key = (protein, FASTA_sequence)
+    try:
+        return _template_ids[key]
+    except KeyError:
+        pass
+    except TypeError:
+        raise CompactConversionError("protein and FASTA_sequence must be strings")
+
+    if not isinstance(protein, str) or not isinstance(FASTA_sequence, str):
+        raise CompactConversionError("protein and FASTA_sequence must be strings")
+    for sequence_id in SITE_SEQUENCE_IDS:
+        if sequence_id.replace('(', '').replace(')', '') not in FASTA_sequence:
+            raise CompactConversionError(f"Branching site {sequence_id} not found in FASTA sequence")
+
+    with _template_lock:
+        if key not in _template_ids:
+            _template_ids[key] = len(_templates)
+            _templates.append(key)
+        return _template_ids[key]
+
+
+def get_sequence_template(template_id):
+    """Returns the (protein, FASTA_sequence) pair registered under template_id."""
+    return _templates[template_id]
+
+
+# =========================================
+# Compact tree
+# =========================================
+
+class CompactUbiquitin:
+    """
+    A polyubiquitin tree held in flat integer arrays, one entry per ubiquitin in pre-order.
+    """
+    __slots__ = ('parent', 'lysine', 'protecting_groups', 'template', 'chain_number', 'chain_length')
+
+    def __init__(self, parent, lysine, protecting_groups, template, chain_number, chain_length):
+        self.parent = array('i', parent)
+        self.lysine = array('i', lysine)
+        self.protecting_groups = array('i', protecting_groups)
+        self.template = array('i', template)
+        self.chain_number = array('i', chain_number)
+        self.chain_length = array('i', chain_length)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactUbiquitin):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"CompactUbiquitin(size={len(self)}, edges={self.edges()})"
+
+    def children(self):
+        """Returns, for every node, the list of its child node indexes in site order."""
+        children = [[] for _ in range(len(self.parent))]
+        for node in range(1, len(self.parent)):
+            children[self.parent[node]].append(node)
+        return children
+
+    def site_children(self):
+        """Returns, for every node, a list of 8 entries holding the child index per site or None."""
+        site_children = [[None] * 8 for _ in range(len(self.parent))]
+        for node in range(1, len(self.parent)):
+            site_children[self.parent[node]][self.lysine[node]] = node
+        return site_children
+
+    def edges(self):
+        """Returns the conjugated lysines as [[parent_chain, site_name, child_chain], ...] in pre-order numbering."""
+        return [[self.parent[node] + 1, SITE_NAMES[self.lysine[node]], node + 1] for node in range(1, len(self.parent))]
+
+
+def relabel_compact(compact_ubiquitin):
+    """
+    Returns a copy with chain numbers set to the pre-order position and chain lengths
+    set to the length of each FASTA sequence, as iterate_through_ubiquitin() does.
+    """
+    size = len(compact_ubiquitin)
+    return CompactUbiquitin(
+        compact_ubiquitin.parent,
+        compact_ubiquitin.lysine,
+        compact_ubiquitin.protecting_groups,
+        compact_ubiquitin.template,
+        range(1, size + 1),
+        [len(_templates[template_id][1]) for template_id in compact_ubiquitin.template]
+    )
+
+
+def _check_node_layout(node):
+    """Raises CompactConversionError unless node has the canonical protein layout."""
+    if not isinstance(node, dict) or tuple(node) != PROTEIN_KEYS:
+        raise CompactConversionError("Node is not a canonical protein dictionary")
+    if type(node['chain_number']) is not int or type(node['chain_length']) is not int:
+        raise CompactConversionError("chain_number and chain_length must be integers")
+    branching_sites = node['branching_sites']
+    if not isinstance(branching_sites, list) or len(branching_sites) != len(SITE_NAMES):
+        raise CompactConversionError("branching_sites must list the 8 lysine sites")
+    for site_code, branch in enumerate(branching_sites):
+        if (
+            not isinstance(branch, dict)
+            or tuple(branch) != BRANCH_KEYS
+            or branch['site_name'] != SITE_NAMES[site_code]
+            or branch['sequence_id'] != SITE_SEQUENCE_IDS[site_code]
+        ):
+            raise CompactConversionError("branching_sites are not in the canonical site order")
+
+
+def compact_from_dict(parent_dictionary):
+    """
+    Converts a ubiquitin dictionary (or JSON string) into a CompactUbiquitin.
+
+    Args:
+        parent_dictionary (dict or str): Ubiquitin structure as a dictionary or JSON string.
+
+    Returns:
+        CompactUbiquitin: The same structure in array form.
+
+    Raises:
+        CompactConversionError: If the structure is not in the canonical layout.
+    """
+    if isinstance(parent_dictionary, CompactUbiquitin):
+        return parent_dictionary
+    try:
+        root = convert_json_to_dict(parent_dictionary)
+    except (TypeError, ValueError) as e:
+        raise CompactConversionError(str(e)) from e
+
+    parent, lysine, protecting_groups, template, chain_number, chain_length = [], [], [], [], [], []
+
+    # Iterative pre-order traversal; children are pushed in reverse site order
+    stack = [(root, -1, -1)]
+    while stack:
+        node, parent_index, site_code = stack.pop()
+        _check_node_layout(node)
+        node_index = len(parent)
+
+        node_protecting_groups = 0
+        pending_children = []
+        for child_site, branch in enumerate(node['branching_sites']):
+            children = branch['children']
+            if isinstance(children, dict):
+                pending_children.append((children, node_index, child_site))
+            elif children == '':
+                continue
+            elif children == 'SMAC':
+                node_protecting_groups |= SMAC_CODE << (2 * child_site)
+            elif children == 'ABOC':
+                node_protecting_groups |= ABOC_CODE << (2 * child_site)
+            else:
+                raise CompactConversionError(f"Invalid children format: {children}")
+
+        parent.append(parent_index)
+        lysine.append(site_code)
+        protecting_groups.append(node_protecting_groups)
+        template.append(intern_sequence_template(node['protein'], node['FASTA_sequence']))
+        chain_number.append(node['chain_number'])
+        chain_length.append(node['chain_length'])
+        stack.extend(reversed(pending_children))
+
+    try:
+        return CompactUbiquitin(parent, lysine, protecting_groups, template, chain_number, chain_length)
+    except OverflowError as e:
+        raise CompactConversionError(str(e)) from e
+
+
+def compact_to_dict(compact_ubiquitin):
+    """
+    Converts a CompactUbiquitin back into the nested dictionary format.
+
+    Args:
+        compact_ubiquitin (CompactUbiquitin): The structure in array form.
+
+    Returns:
+        dict: Nested ubiquitin dictionary with the canonical key and site order.
+    """
+    nodes = []
+    for node_index in range(len(compact_ubiquitin)):
+        protein, FASTA_sequence = _templates[compact_ubiquitin.template[node_index]]
+        node_protecting_groups = compact_ubiquitin.protecting_groups[node_index]
+        nodes.append({
+            'protein': protein,
+            'chain_number': compact_ubiquitin.chain_number[node_index],
+            'FASTA_sequence': FASTA_sequence,
+            'chain_length': compact_ubiquitin.chain_length[node_index],
+            'branching_sites': [
+                {
+                    'site_name': SITE_NAMES[site_code],
+                    'sequence_id': SITE_SEQUENCE_IDS[site_code],
+                    'children': PROTECTING_GROUPS[(node_protecting_groups >> (2 * site_code)) & 3]
+                }
+                for site_code in range(len(SITE_NAMES))
+            ]
+        })
+
+    for node_index in range(1, len(nodes)):
+        parent_node = nodes[compact_ubiquitin.parent[node_index]]
+        parent_node['branching_sites'][compact_ubiquitin.lysine[node_index]]['children'] = nodes[node_index]
+
+    return nodes[0]
+
+
+class ContextBuilder:
+    """
+    Accumulates the iterate_through_ubiquitin() context while a tree is walked in pre-order.
+
+    Used by compact_context() and the single-pass engine so both produce exactly the
+    strings and lysine lists of the dictionary traversal.
+    """
+    __slots__ = ('all_linkages', 'free_sites', 'chain_length_list', 'multimer_string_name',
+                 'nomenclature_w_preorder', 'nomenclature_wo_preorder',
+                 'ABOC_lysines', 'SMAC_lysines', 'free_lysines', 'conjugated_lysines')
+
+    def __init__(self, all_linkages=False):
+        self.all_linkages = all_linkages
+        self.free_sites = ALL_FREE_SITES if all_linkages else MAIN_FREE_SITES
+        self.chain_length_list = []
+        self.multimer_string_name = []
+        self.nomenclature_w_preorder = []
+        self.nomenclature_wo_preorder = []
+        self.ABOC_lysines, self.SMAC_lysines, self.free_lysines, self.conjugated_lysines = [], [], [], []
+
+    def open_node(self, protein, FASTA_sequence, chain_number):
+        self.chain_length_list.append(len(FASTA_sequence))
+        if FASTA_sequence == HISTAG_UBIQUITIN_FASTA and chain_number == 1:
+            self.multimer_string_name.append(f"his-GG-{protein}-{chain_number}-(")
+            self.nomenclature_wo_preorder.append("his-Ub")
+        elif FASTA_sequence == UBIQUITIN_FASTA and chain_number == 1:
+            self.multimer_string_name.append(f"GG-{protein}-{chain_number}-(")
+            self.nomenclature_wo_preorder.append("Ub")
+        else:
+            self.multimer_string_name.append(f"{protein}-{chain_number}-(")
+            self.nomenclature_wo_preorder.append("Ub")
+        self.nomenclature_w_preorder.append(f"Ub{chain_number}")
+
+    def unconjugated_site(self, chain_number, site_code, protecting_group):
+        site_name = SITE_NAMES[site_code]
+        if protecting_group == SMAC_CODE:
+            self.multimer_string_name.append(f"<{site_name}_SMAC>")
+            self.SMAC_lysines.append([chain_number, site_name])
+            self.nomenclature_w_preorder.append(f",{site_name[1:]}smac")
+            self.nomenclature_wo_preorder.append(f",{site_name[1:]}smac")
+        elif protecting_group == ABOC_CODE:
+            self.multimer_string_name.append(f"<{site_name}_ABOC>")
+            self.ABOC_lysines.append([chain_number, site_name])
+            self.nomenclature_w_preorder.append(f",{site_name[1:]}aboc")
+            self.nomenclature_wo_preorder.append(f",{site_name[1:]}aboc")
+        elif site_code in self.free_sites:
+            self.free_lysines.append([chain_number, site_name])
+
+    def open_conjugation(self, chain_number, site_code, child_chain_number):
+        site_name = SITE_NAMES[site_code]
+        if self.all_linkages:
+            self.nomenclature_w_preorder.append(f", {site_name}(")
+        else:
+            self.nomenclature_w_preorder.append(f",{site_name[1:]}(")
+        self.nomenclature_wo_preorder.append(f",{site_name[1:]}(")
+        self.multimer_string_name.append(f"<{site_name}_")
+        self.conjugated_lysines.append([chain_number, site_name, child_chain_number])
+
+    def close_conjugation(self):
+        self.multimer_string_name.append(")" if self.all_linkages else ">")
+        self.nomenclature_w_preorder.append(")")
+        self.nomenclature_wo_preorder.append(")")
+
+    def close_node(self):
+        self.multimer_string_name.append(")")
+
+    def context(self):
+        size = len(self.chain_length_list)
+        return {
+            "chain_number_list": list(range(1, size + 2)),
+            "chain_length_list": self.chain_length_list,
+            "multimer_string_name": "".join(self.multimer_string_name),
+            "nomenclature_w_preorder": "".join(self.nomenclature_w_preorder),
+            "nomenclature_wo_preorder": "".join(self.nomenclature_wo_preorder),
+            "max_chain_number": size,
+            "ABOC_lysines": self.ABOC_lysines,
+            "SMAC_lysines": self.SMAC_lysines,
+            "free_lysines": self.free_lysines,
+            "conjugated_lysines": self.conjugated_lysines
+        }
+
+
+def compact_context(compact_ubiquitin, all_linkages=False):
+    """
+    Builds the context dictionary of a relabelled CompactUbiquitin in one traversal.
+
+    Produces the same values as iterate_through_ubiquitin() (or
+    iterate_through_ubiquitin_all() when all_linkages is True).
+
+    Args:
+        compact_ubiquitin (CompactUbiquitin): Relabelled structure.
+        all_linkages (bool): Use the all-linkage nomenclature and free lysine rules.
+
+    Returns:
+        dict: Context with chain numbers, nomenclature strings and lysine lists.
+    """
+    site_children = compact_ubiquitin.site_children()
+    builder = ContextBuilder(all_linkages)
+
+    def visit(node_index):
+        chain_number = node_index + 1
+        protein, FASTA_sequence = _templates[compact_ubiquitin.template[node_index]]
+        builder.open_node(protein, FASTA_sequence, chain_number)
+
+        node_protecting_groups = compact_ubiquitin.protecting_groups[node_index]
+        for site_code, child_index in enumerate(site_children[node_index]):
+            if child_index is not None:
+                builder.open_conjugation(chain_number, site_code, child_index + 1)
+                visit(child_index)
+                builder.close_conjugation()
+            else:
+                builder.unconjugated_site(chain_number, site_code, (node_protecting_groups >> (2 * site_code)) & 3)
+
+        builder.close_node()
+
+    visit(0)
+    return builder.context()
+
+
+# =========================================
+# Persistent trees with structural sharing
+# UbiquitinNode values are immutable; an edit allocates only the nodes on the
+# path from the root to the modified site and reuses every untouched subtree.
+# Chain numbers are not stored, they follow from the pre-order position.
+# =========================================
+
+class UbiquitinNode:
+    """
+    Immutable ubiquitin node: sequence template, protecting groups and one child slot per site.
+    """
+    __slots__ = ('template', 'protecting_groups', 'children', 'size', '_hash')
+
+    def __init__(self, template, protecting_groups, children=(None,) * len(SITE_NAMES)):
+        children = tuple(children)
+        if len(children) != len(SITE_NAMES):
+            raise ValueError("UbiquitinNode needs one child slot per branching site")
+        object.__setattr__(self, 'template', template)
+        object.__setattr__(self, 'protecting_groups', protecting_groups)
+        object.__setattr__(self, 'children', children)
+        object.__setattr__(self, 'size', 1 + sum(child.size for child in children if child is not None))
+        object.__setattr__(self, '_hash', hash((template, protecting_groups, children)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("UbiquitinNode is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, UbiquitinNode):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self.template == other.template
+            and self.protecting_groups == other.protecting_groups
+            and self.children == other.children
+        )
+
+    def __repr__(self):
+        return f"UbiquitinNode(size={self.size}, edges={node_to_compact(self).edges()})"
+
+    def replace(self, protecting_groups=None, children=None):
+        """Returns self if nothing changes, otherwise a new node sharing the unchanged fields."""
+        if protecting_groups is None:
+            protecting_groups = self.protecting_groups
+        if children is None:
+            children = self.children
+        if protecting_groups == self.protecting_groups and all(
+            new_child is old_child for new_child, old_child in zip(children, self.children)
+        ):
+            return self
+        return UbiquitinNode(self.template, protecting_groups, children)
+
+
+def node_from_compact(compact_ubiquitin):
+    """Builds the persistent node tree of a CompactUbiquitin bottom-up."""
+    size = len(compact_ubiquitin)
+    site_children = compact_ubiquitin.site_children()
+    nodes = [None] * size
+    for node_index in reversed(range(size)):
+        nodes[node_index] = UbiquitinNode(
+            compact_ubiquitin.template[node_index],
+            compact_ubiquitin.protecting_groups[node_index],
+            [None if child_index is None else nodes[child_index] for child_index in site_children[node_index]]
+        )
+    return nodes[0]
+
+
+def node_to_compact(root):
+    """Flattens a node tree into a relabelled CompactUbiquitin (pre-order numbering)."""
+    parent, lysine, protecting_groups, template = [], [], [], []
+    stack = [(root, -1, -1)]
+    while stack:
+        node, parent_index, site_code = stack.pop()
+        node_index = len(parent)
+        parent.append(parent_index)
+        lysine.append(site_code)
+        protecting_groups.append(node.protecting_groups)
+        template.append(node.template)
+        stack.extend(
+            (child, node_index, child_site)
+            for child_site, child in reversed(list(enumerate(node.children)))
+            if child is not None
+        )
+    size = len(parent)
+    return CompactUbiquitin(
+        parent, lysine, protecting_groups, template,
+        range(1, size + 1),
+        [len(_templates[template_id][1]) for template_id in template]
+    )
+
+
+def as_ubiquitin_node(ubiquitin):
+    """
+    Returns ubiquitin as a UbiquitinNode, converting dictionaries, JSON strings and CompactUbiquitin values.
+
+    Raises:
+        CompactConversionError: If a dictionary is not in the canonical layout.
+    """
+    if isinstance(ubiquitin, UbiquitinNode):
+        return ubiquitin
+    return node_from_compact(compact_from_dict(ubiquitin))
+
+
+def node_to_dict(root):
+    """Materialises a node tree as a relabelled ubiquitin dictionary."""
+    return compact_to_dict(node_to_compact(root))
+
+
+def node_context(root, all_linkages=False):
+    """Returns the iterate_through_ubiquitin() context of a node tree."""
+    return compact_context(node_to_compact(root), all_linkages)
+
+
+def _node_with_child(node, site_code, child):
+    children = list(node.children)
+    children[site_code] = child
+    return node.replace(children=children)
+
+
+def persistent_building(root, ubi_molecule_to_add, ubiquitin_number, lysine_residue):
+    """
+    Structurally shared form of ubiquitin_building(): only the path to the modified site is copied.
+
+    Args:
+        root (UbiquitinNode): The acceptor structure.
+        ubi_molecule_to_add (UbiquitinNode or str): Donor structure, 'SMAC' or 'ABOC'.
+        ubiquitin_number (int): Pre-order chain number of the ubiquitin to modify.
+        lysine_residue (str): Site name of the lysine to modify.
+
+    Returns:
+        UbiquitinNode: The product (root itself if the site is not free).
+
+    Raises:
+        TypeError: If a donor ubiquitin does not end with RLRGG.
+    """
+    node_index = next((index for index in range(root.size) if index + 1 == ubiquitin_number), None)
+    site_code = next((code for code, site_name in enumerate(SITE_NAMES) if site_name == lysine_residue), None)
+    if node_index is None or site_code is None:
+        return root
+
+    # Walk down to the target node, keeping the path of (node, site) pairs
+    path = []
+    node = root
+    while node_index:
+        node_index -= 1
+        for child_site, child in enumerate(node.children):
+            if child is None:
+                continue
+            if node_index < child.size:
+                path.append((node, child_site))
+                node = child
+                break
+            node_index -= child.size
+
+    if node.children[site_code] is not None or (node.protecting_groups >> (2 * site_code)) & 3:
+        return root
+
+    if ubi_molecule_to_add in ('SMAC', 'ABOC'):
+        new_node = node.replace(
+            protecting_groups=node.protecting_groups | PROTECTING_GROUPS.index(ubi_molecule_to_add) << (2 * site_code)
+        )
+    else:
+        if _templates[ubi_molecule_to_add.template][1][-5:] != 'RLRGG':
+            raise TypeError("Ubiquitin C-terminus does not end with RLRGG.")
+        new_node = _node_with_child(node, site_code, ubi_molecule_to_add)
+
+    # Copy the path back up to the root
+    for path_node, child_site in reversed(path):
+        new_node = _node_with_child(path_node, child_site, new_node)
+    return new_node
+
+
+def persistent_simulation(root, ubi_molecule_to_add, type_of_reaction):
+    """
+    Structurally shared form of ubiquitin_simulation(): subtrees the reaction does not touch are reused.
+
+    Args:
+        root (UbiquitinNode): The reactant structure.
+        ubi_molecule_to_add (UbiquitinNode or str): Donor structure for 'K48'/'K63' reactions.
+        type_of_reaction (str): 'SMAC_deprot', 'ABOC_deprot', 'GLOBAL_deprot', 'FAKE_deprot', 'K48' or 'K63'.
+
+    Returns:
+        UbiquitinNode: The product; the donor is shared between all conjugation sites.
+
+    Raises:
+        TypeError: If a donor ubiquitin is missing or does not end with RLRGG.
+    """
+    if type_of_reaction == 'FAKE_deprot':
+        return root
+    elif type_of_reaction == 'SMAC_deprot':
+        keep_mask = ABOC_MASK
+    elif type_of_reaction == 'ABOC_deprot':
+        keep_mask = SMAC_MASK
+    elif type_of_reaction == 'GLOBAL_deprot':
+        keep_mask = 0
+    else:
+        keep_mask = None
+        site_code = E2_REACTION_SITES[type_of_reaction]
+        site_bits = 3 << (2 * site_code)
+
+    def react(node):
+        children = [None if child is None else react(child) for child in node.children]
+        if keep_mask is not None:
+            return node.replace(protecting_groups=node.protecting_groups & keep_mask, children=children)
+        if children[site_code] is None and not node.protecting_groups & site_bits:
+            if not isinstance(ubi_molecule_to_add, UbiquitinNode):
+                raise TypeError("ubi_molecule_to_add must be a ubiquitin for K48/K63 reactions")
+            if _templates[ubi_molecule_to_add.template][1][-5:] != 'RLRGG':
+                raise TypeError("Ubiquitin C-terminus does not end with RLRGG.")
+            children[site_code] = ubi_molecule_to_add
+        return node.replace(children=children)
+
+    return react(root)
+
+
+# =========================================
+# Canonical topology keys
+# Sites are distinguishable and visited in a fixed order, so the pre-order arrays
+# of a structure are already a canonical form: two structures are identical
+# exactly when their arrays are. No tree isomorphism search is needed.
+# =========================================
+
+def topology_key(ubiquitin):
+    """
+    Returns a hashable canonical key of a ubiquitin structure for duplicate detection.
+
+    For dictionaries the key covers templates, protecting groups, edges, chain numbers
+    and chain lengths, so two canonical dictionaries share a key exactly when
+    json.dumps(..., sort_keys=True) of both is equal. A UbiquitinNode is its own key.
+
+    Keys hold process-local sequence template ids (intern_sequence_template()), so
+    they are only comparable within one process and must not be stored or sent to
+    another worker.
+
+    Args:
+        ubiquitin (dict, CompactUbiquitin or UbiquitinNode): The structure.
+
+    Returns:
+        Hashable key.
+
+    Raises:
+        CompactConversionError: If a dictionary is not in the canonical layout.
+    """
+    if isinstance(ubiquitin, UbiquitinNode):
+        return ubiquitin
+    compact_ubiquitin = ubiquitin if isinstance(ubiquitin, CompactUbiquitin) else compact_from_dict(ubiquitin)
+    return (
+        compact_ubiquitin.template.tobytes(),
+        compact_ubiquitin.protecting_groups.tobytes(),
+        compact_ubiquitin.parent.tobytes(),
+        compact_ubiquitin.lysine.tobytes(),
+        compact_ubiquitin.chain_number.tobytes(),
+        compact_ubiquitin.chain_length.tobytes()
+    )
+
+
+def duplicate_marker(item):
+    """
+    Returns the marker delete_duplicate_multimers() compares: the topology key for
+    canonical ubiquitin dictionaries and nodes, json.dumps(sort_keys=True) otherwise.
+    """
+    if isinstance(item, (UbiquitinNode, CompactUbiquitin)):
+        return topology_key(item)
+    if isinstance(item, dict) and 'branching_sites' in item:
+        try:
+            return topology_key(item)
+        except CompactConversionError:
+            pass
+    return json.dumps(item, sort_keys=True)
+
+
+# =========================================
+# Generative enumeration of multimers
+# Edge trees are tuples of (parent, lysine, template, protecting_groups) per node in
+# pre-order; they are their own canonical form and hash key. Each level is grown
+# from the previous one by canonical augmentation, so every unique topology is
+# emitted exactly once without building or deduplicating dictionaries.
+# =========================================
+
+def edge_tree_from_compact(compact_ubiquitin):
+    """Returns the edge tree (pre-order tuple of node tuples) of a CompactUbiquitin."""
+    return tuple(zip(
+        compact_ubiquitin.parent,
+        compact_ubiquitin.lysine,
+        compact_ubiquitin.template,
+        compact_ubiquitin.protecting_groups
+    ))
+
+
+def compact_from_edge_tree(edge_tree):
+    """Returns the relabelled CompactUbiquitin of an edge tree."""
+    parent, lysine, template, protecting_groups = zip(*edge_tree)
+    return CompactUbiquitin(
+        parent, lysine, protecting_groups, template,
+        range(1, len(edge_tree) + 1),
+        [len(_templates[template_id][1]) for template_id in template]
+    )
+
+
+def materialize_edge_tree(edge_tree, all_linkages=False):
+    """Returns (dictionary, context) of an edge tree, as iterate_through_ubiquitin() would."""
+    compact_ubiquitin = compact_from_edge_tree(edge_tree)
+    return compact_to_dict(compact_ubiquitin), compact_context(compact_ubiquitin, all_linkages)
+
+
+def _free_positions(edge_tree, free_sites):
+    """
+    Free lysines of an edge tree as (node_index, site_code), in context['free_lysines'] order:
+    sites are visited in order and a conjugated site is descended into before the next one.
+    """
+    conjugated = {(node[0], node[1]): node_index for node_index, node in enumerate(edge_tree) if node_index}
+    positions = []
+
+    def visit(node_index):
+        node_protecting_groups = edge_tree[node_index][3]
+        for site_code in range(len(SITE_NAMES)):
+            child_index = conjugated.get((node_index, site_code))
+            if child_index is not None:
+                visit(child_index)
+            elif site_code in free_sites and not (node_protecting_groups >> (2 * site_code)) & 3:
+                positions.append((node_index, site_code))
+
+    visit(0)
+    return positions
+
+
+def _attach_leaf(edge_tree, node_index, site_code, template, protecting_groups):
+    """Attaches a single-node donor at (node_index, site_code); returns (edge tree, new index)."""
+    # The new node follows node_index and the subtrees of its children on earlier sites
+    insert_at = node_index + 1
+    while insert_at < len(edge_tree):
+        ancestor = edge_tree[insert_at][0]
+        child_site = edge_tree[insert_at][1]
+        while ancestor > node_index:
+            child_site = edge_tree[ancestor][1]
+            ancestor = edge_tree[ancestor][0]
+        if ancestor < node_index or child_site > site_code:
+            break
+        insert_at += 1
+
+    shifted = tuple(
+        (parent + 1 if parent >= insert_at else parent, lysine, node_template, node_protecting_groups)
+        for parent, lysine, node_template, node_protecting_groups in edge_tree
+    )
+    new_tree = shifted[:insert_at] + ((node_index, site_code, template, protecting_groups),) + shifted[insert_at:]
+    return new_tree, insert_at
+
+
+def _remove_leaf(edge_tree, leaf_index):
+    """Removes a leaf node; pre-order of the remaining nodes is unchanged."""
+    return tuple(
+        (parent - 1 if parent > leaf_index else parent, lysine, template, protecting_groups)
+        for parent, lysine, template, protecting_groups in edge_tree[:leaf_index] + edge_tree[leaf_index + 1:]
+    )
+
+
+def enumerate_multimer_levels(acceptor, donor, largest_multimer_size, free_sites=ALL_FREE_SITES):
+    """
+    Enumerates every unique multimer grown from an acceptor by single-ubiquitin additions.
+
+    A tree T of size n + 1 is emitted from the parent P and free lysine position i
+    that minimise (rank of P in level n, i) over all removable leaves of T. Parents
+    are visited in rank order and positions in free_lysines order, so each topology is
+    emitted once and the levels come out in the same order as repeatedly calling
+    defining_json_multimers(_all) followed by delete_duplicate_multimers().
+
+    Args:
+        acceptor (dict, str or CompactUbiquitin): The starting structure.
+        donor (dict, str or CompactUbiquitin): A single ubiquitin added at free lysines.
+        largest_multimer_size (int): Size of the last level to generate.
+        free_sites (frozenset): Site codes a donor can be added to.
+
+    Returns:
+        generator: Yields (multimer_size, list of edge trees) for each size after the
+            acceptor's up to largest_multimer_size.
+
+    Raises:
+        CompactConversionError: If the structures are not canonical or the donor is
+            not a single ubiquitin (raised here, before the first level is generated).
+    """
+    acceptor = relabel_compact(compact_from_dict(acceptor))
+    donor = compact_from_dict(donor)
+    if len(donor) != 1:
+        raise CompactConversionError("Generative enumeration needs a single-ubiquitin donor")
+    return _grow_multimer_levels(
+        edge_tree_from_compact(acceptor), donor.template[0], donor.protecting_groups[0],
+        largest_multimer_size, free_sites
+    )
+
+
+def _grow_multimer_levels(acceptor_tree, donor_template, donor_protecting_groups, largest_multimer_size, free_sites):
+    level = [acceptor_tree]
+    for multimer_size in range(len(acceptor_tree) + 1, largest_multimer_size + 1):
+        rank = {edge_tree: index for index, edge_tree in enumerate(level)}
+        free_positions_cache = {}
+
+        def free_positions(edge_tree):
+            if edge_tree not in free_positions_cache:
+                free_positions_cache[edge_tree] = _free_positions(edge_tree, free_sites)
+            return free_positions_cache[edge_tree]
+
+        next_level = []
+        for parent_rank, parent_tree in enumerate(level):
+            parent_positions = free_positions(parent_tree)
+            for position, (node_index, site_code) in enumerate(parent_positions):
+                tree, new_index = _attach_leaf(parent_tree, node_index, site_code, donor_template, donor_protecting_groups)
+
+                # Accept only if no other removable leaf gives an earlier (rank, position)
+                parents = {node[0] for node in tree}
+                canonical = True
+                # Nodes of the acceptor are never removable: dropping one gives a tree
+                # without the acceptor, which has no rank
+                for leaf_index in range(1, len(tree)):
+                    leaf = tree[leaf_index]
+                    if (
+                        leaf_index == new_index
+                        or leaf_index in parents
+                        or leaf[1] not in free_sites
+                        or leaf[2] != donor_template
+                        or leaf[3] != donor_protecting_groups
+                    ):
+                        continue
+                    reduced_tree = _remove_leaf(tree, leaf_index)
+                    reduced_rank = rank.get(reduced_tree)
+                    if reduced_rank is None or reduced_rank > parent_rank:
+                        continue
+                    if reduced_rank < parent_rank:
+                        canonical = False
+                        break
+                    # Parents precede their children in pre-order, so leaf[0] is unchanged by the removal
+                    if free_positions(reduced_tree).index((leaf[0], leaf[1])) < position:
+                        canonical = False
+                        break
+
+                if canonical:
+                    next_level.append(tree)
+
+        level = next_level
+        yield multimer_size, level
+
+
+# =========================================
+# Single-pass engine for main.py and all_linkages.py
+# Reads the input dictionary once and writes the relabelled output dictionary and
+# its context in the same pre-order traversal. CompactConversionError means the
+# caller should use its nested dictionary traversal instead.
+# =========================================
+
+_SITE_EDIT_KEEP = object()
+
+
+def _relabel_single_pass(parent_dictionary, all_linkages=False, edit_site=None):
+    """
+    Walks a ubiquitin dictionary once, applying edit_site() to the sites of the input nodes.
+
+    Args:
+        parent_dictionary (dict or str): Ubiquitin structure as a dictionary or JSON string.
+        all_linkages (bool): Use the all-linkage nomenclature and free lysine rules.
+        edit_site (callable): Optional edit_site(input_node_index, site_code, children)
+            returning the new children of that site ('', 'SMAC', 'ABOC' or a donor
+            dictionary), or _SITE_EDIT_KEEP to leave the site as it is. Donors are
+            relabelled but not edited.
+
+    Returns:
+        tuple: (relabelled dictionary, context)
+
+    Raises:
+        CompactConversionError: If any node is not in the canonical layout.
+    """
+    try:
+        root = convert_json_to_dict(parent_dictionary)
+    except (TypeError, ValueError) as e:
+        raise CompactConversionError(str(e)) from e
+
+    builder = ContextBuilder(all_linkages)
+    counters = {'chain_number': 0, 'input_node_index': 0}
+
+    def visit(node, from_input):
+        _check_node_layout(node)
+        protein, FASTA_sequence = node['protein'], node['FASTA_sequence']
+        intern_sequence_template(protein, FASTA_sequence)
+
+        counters['chain_number'] += 1
+        chain_number = counters['chain_number']
+        if from_input:
+            input_node_index = counters['input_node_index']
+            counters['input_node_index'] += 1
+        builder.open_node(protein, FASTA_sequence, chain_number)
+
+        branching_sites = []
+        for site_code, branch in enumerate(node['branching_sites']):
+            children = branch['children']
+            child_from_input = from_input
+            if from_input and edit_site is not None:
+                edited = edit_site(input_node_index, site_code, children)
+                if edited is not _SITE_EDIT_KEEP:
+                    children = edited
+                    child_from_input = False
+
+            if isinstance(children, dict):
+                builder.open_conjugation(chain_number, site_code, counters['chain_number'] + 1)
+                children = visit(children, child_from_input)
+                builder.close_conjugation()
+            elif children == '':
+                builder.unconjugated_site(chain_number, site_code, 0)
+            elif children == 'SMAC':
+                builder.unconjugated_site(chain_number, site_code, SMAC_CODE)
+            elif children == 'ABOC':
+                builder.unconjugated_site(chain_number, site_code, ABOC_CODE)
+            else:
+                raise CompactConversionError(f"Invalid children format: {children}")
+
+            branching_sites.append({
+                'site_name': SITE_NAMES[site_code],
+                'sequence_id': SITE_SEQUENCE_IDS[site_code],
+                'children': children
+            })
+
+        builder.close_node()
+        return {
+            'protein': protein,
+            'chain_number': chain_number,
+            'FASTA_sequence': FASTA_sequence,
+            'chain_length': len(FASTA_sequence),
+            'branching_sites': branching_sites
+        }
+
+    output_dictionary = visit(root, True)
+    return output_dictionary, builder.context()
+
+
+def _check_donor_dict(ubi_molecule_to_add):
+    """Mirrors the checks of K_residue_ubi_addition(); the reference path raises the errors."""
+    if not isinstance(ubi_molecule_to_add, dict):
+        raise CompactConversionError("ubi_molecule_to_add must be a ubiquitin dictionary")
+    FASTA_sequence = ubi_molecule_to_add.get('FASTA_sequence')
+    if not isinstance(FASTA_sequence, str) or FASTA_sequence[-5:] != 'RLRGG':
+        raise CompactConversionError("Ubiquitin C-terminus does not end with RLRGG.")
+    return ubi_molecule_to_add
+
+
+def iterate_single_pass(parent_dictionary, all_linkages=False):
+    """Single-pass equivalent of iterate_through_ubiquitin(); returns (dictionary, context)."""
+    return _relabel_single_pass(parent_dictionary, all_linkages)
+
+
+def building_single_pass(parent_dictionary, ubi_molecule_to_add, ubiquitin_number, lysine_residue, all_linkages=False):
+    """
+    Single-pass equivalent of ubiquitin_building(); returns (dictionary, context).
+
+    The target is the input node at pre-order position ubiquitin_number; only a free
+    site is modified, as in handle_lysine_modification().
+    """
+    def edit_site(input_node_index, site_code, children):
+        if input_node_index + 1 == ubiquitin_number and SITE_NAMES[site_code] == lysine_residue and children == '':
+            if ubi_molecule_to_add in ('SMAC', 'ABOC'):
+                return ubi_molecule_to_add
+            return _check_donor_dict(ubi_molecule_to_add)
+        return _SITE_EDIT_KEEP
+
+    return _relabel_single_pass(parent_dictionary, all_linkages, edit_site)
+
+
+def simulation_single_pass(parent_dictionary, ubi_molecule_to_add, type_of_reaction, all_linkages=False):
+    """
+    Single-pass equivalent of ubiquitin_simulation(); returns (dictionary, context).
+
+    Deprotections clear the matching protecting groups; K48/K63 reactions attach the
+    donor at every free K48/K63 site of the input nodes (not of the donors).
+    """
+    removed_groups = {
+        'SMAC_deprot': ('SMAC',),
+        'ABOC_deprot': ('ABOC',),
+        'GLOBAL_deprot': ('SMAC', 'ABOC'),
+        'FAKE_deprot': ()
+    }
+
+    if type_of_reaction in removed_groups:
+        groups = removed_groups[type_of_reaction]
+
+        def edit_site(input_node_index, site_code, children):
+            return '' if children in groups else _SITE_EDIT_KEEP
+    else:
+        reaction_site = E2_REACTION_SITES[type_of_reaction]
+
+        def edit_site(input_node_index, site_code, children):
+            if site_code == reaction_site and children == '':
+                return _check_donor_dict(ubi_molecule_to_add)
+            return _SITE_EDIT_KEEP
+
+    return _relabel_single_pass(parent_dictionary, all_linkages, edit_site)
@@ -0,0 +1,422 @@
+import hashlib
+import io
+import json
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+from src.reaction_database import pack_strings, unpack_strings
+from src.subtree_counting import PatternIndex
+
+"""
+CONTAINMENT MATRICES
+====================
+
+Precomputed results of all_linkages.analyze_subgraph_containment(). The count of
+an n-level multimer in a higher-level multimer does not depend on the lysine
+filters of a request - a filter only selects the multimers whose linkages are all
+allowed - so one matrix over all multimers per (higher_level_size, n_level_size)
+serves every filter combination by selecting rows and columns.
+
+Each matrix is a folder back_end/data/containment_matrices/<H>_in_<N>/:
+
+    indptr.npy      int64 (rows + 1)    CSR row pointers
+    indices.npy     int32 (nonzeros)    column of each count
+    counts.npy      int32 (nonzeros)    occurrence counts
+    meta.json       format version, data version, sizes, row and column multimer
+                    ids (keys of all_jsons/N_multimers_contexts.json); written last
+
+The data version is a sha256 of the two multimer context files, so a matrix built
+from other contexts is ignored and the analysis runs instead. The arrays are
+memory-mapped on load.
+
+A single analysis is held as a ContainmentResult: the same CSR arrays with tables
+of row and column labels (str() of the edge lists, the keys of the nested
+dictionary of analyze_subgraph_containment()), instead of one dictionary per row
+repeating every column label. It converts to the nested dictionary and the
+DataFrame/CSV of the API, sums columns by pattern class without building rows,
+and serialises to a compact JSON document or .npz bytes.
+"""
+
+CONTAINMENT_FORMAT_VERSION = 1
+CONTAINMENT_SIZE_PAIRS = ((3, 2), (4, 2), (4, 3), (5, 2), (5, 3), (5, 4))
+CONTAINMENT_ARRAYS = ('indptr', 'indices', 'counts')
+CONTAINMENT_META_FILENAME = 'meta.json'
+
+
+def containment_matrix_dir(directory: Path, higher_level_size: int, n_level_size: int) -> Path:
+    return Path(directory) / f'{higher_level_size}_in_{n_level_size}'
+
+
+def containment_matrix_paths(directory: Path, higher_level_size: int, n_level_size: int) -> list:
+    """The files of one matrix, meta.json first."""
+    matrix_dir = containment_matrix_dir(directory, higher_level_size, n_level_size)
+    return [matrix_dir / CONTAINMENT_META_FILENAME] + [matrix_dir / f'{name}.npy' for name in CONTAINMENT_ARRAYS]
+
+
+def containment_data_version(context_paths: list) -> str:
+    """
+    sha256 of the multimer context files (and the format version) a matrix is built from.
+    """
+    digest = hashlib.sha256(f'containment-v{CONTAINMENT_FORMAT_VERSION}'.encode('utf-8'))
+    for path in context_paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+# =========================================
+# Analysis results
+# =========================================
+
+class ContainmentResult:
+    """
+    Containment counts of one analysis as CSR arrays with row and column labels.
+
+    Args:
+        row_labels (list): Higher-level labels (str of the edge list), unique.
+        column_labels (list): N-level labels, unique.
+        indptr (np.ndarray): Row pointers, len(row_labels) + 1.
+        indices (np.ndarray): Column of each nonzero count.
+        counts (np.ndarray): The nonzero counts.
+    """
+
+    def __init__(self, row_labels, column_labels, indptr, indices, counts):
+        self.row_labels = list(row_labels)
+        self.column_labels = list(column_labels)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int32)
+        self.column_positions = {label: position for position, label in enumerate(self.column_labels)}
+        if len(self.indptr) != len(self.row_labels) + 1:
+            raise ValueError(f"indptr has {len(self.indptr)} entries for {len(self.row_labels)} rows")
+
+    def __repr__(self):
+        return f"ContainmentResult(shape={self.shape}, nonzeros={len(self.counts)})"
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.row_labels), len(self.column_labels)
+
+    @classmethod
+    def from_nested(cls, results: dict) -> 'ContainmentResult':
+        """
+        From the dictionary of analyze_subgraph_containment(); columns are ordered by
+        first appearance and missing counts are 0 (like the API's DataFrame).
+        """
+        column_positions = {}
+        indptr = np.zeros(len(results) + 1, dtype=np.int64)
+        indices = []
+        counts = []
+        for row, inner in enumerate(results.values()):
+            for label, count in inner.items():
+                position = column_positions.setdefault(label, len(column_positions))
+                if count:
+                    indices.append(position)
+                    counts.append(count)
+            indptr[row + 1] = len(indices)
+        return cls(list(results), list(column_positions), indptr, indices, counts)
+
+    def dense_row(self, row: int) -> np.ndarray:
+        """Counts of one row (by position) over all columns."""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        dense = np.zeros(len(self.column_labels), dtype=np.int64)
+        dense[self.indices[start:end]] = self.counts[start:end]
+        return dense
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.shape, dtype=np.int64)
+        rows = np.repeat(np.arange(len(self.row_labels)), np.diff(self.indptr))
+        dense[rows, self.indices] = self.counts
+        return dense
+
+    def to_nested(self) -> dict:
+        """The dictionary returned by analyze_subgraph_containment()."""
+        return {
+            label: dict(zip(self.column_labels, self.dense_row(row).tolist()))
+            for row, label in enumerate(self.row_labels)
+        }
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Equal to pd.DataFrame.from_dict(self.to_nested(), orient='index').fillna(0).astype(int).
+        """
+        if not self.row_labels or not self.column_labels:
+            # from_dict() of rows without counts has no rows either
+            return pd.DataFrame()
+        return pd.DataFrame(self.to_dense(), index=self.row_labels, columns=self.column_labels)
+
+    def column_totals(self, groups: dict) -> dict:
+        """
+        Sum the counts of every row over groups of columns (e.g. pattern classes).
+
+        Args:
+            groups (dict): Group name -> column labels; labels that are not columns
+                are ignored and a column counts towards its last group.
+
+        Returns:
+            dict: Group name -> int64 array with one total per row.
+        """
+        group_of_column = np.full(len(self.column_labels), -1, dtype=np.int64)
+        for group, labels in enumerate(groups.values()):
+            for label in labels:
+                position = self.column_positions.get(label)
+                if position is not None:
+                    group_of_column[position] = group
+
+        rows = np.repeat(np.arange(len(self.row_labels)), np.diff(self.indptr))
+        entry_groups = group_of_column[self.indices]
+        grouped = entry_groups >= 0
+        totals = np.zeros((len(groups), len(self.row_labels)), dtype=np.int64)
+        np.add.at(totals, (entry_groups[grouped], rows[grouped]), self.counts[grouped])
+        return {name: totals[group] for group, name in enumerate(groups)}
+
+    # =========================================
+    # Serialisation
+    # =========================================
+
+    def to_json(self) -> dict:
+        """Compact JSON form: label tables and the CSR arrays as lists."""
+        return {
+            "rows": self.row_labels,
+            "columns": self.column_labels,
+            "indptr": self.indptr.tolist(),
+            "indices": self.indices.tolist(),
+            "counts": self.counts.tolist()
+        }
+
+    @classmethod
+    def from_json(cls, document: dict) -> 'ContainmentResult':
+        return cls(document["rows"], document["columns"], document["indptr"], document["indices"], document["counts"])
+
+    def to_bytes(self) -> bytes:
+        """The result as .npz bytes (labels packed as utf-8 buffers)."""
+        arrays = {"indptr": self.indptr, "indices": self.indices, "counts": self.counts}
+        arrays["rows.data"], arrays["rows.offsets"] = pack_strings(self.row_labels)
+        arrays["columns.data"], arrays["columns.offsets"] = pack_strings(self.column_labels)
+        buf = io.BytesIO()
+        np.savez_compressed(buf, **arrays)
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ContainmentResult':
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            return cls(
+                unpack_strings(npz["rows.data"], npz["rows.offsets"]).tolist(),
+                unpack_strings(npz["columns.data"], npz["columns.offsets"]).tolist(),
+                npz["indptr"],
+                npz["indices"],
+                npz["counts"]
+            )
+
+# =========================================
+# Building
+# =========================================
+
+def save_containment_matrix(
+        directory: Path,
+        higher_level_size: int,
+        n_level_size: int,
+        higher_level_contexts: dict,
+        n_level_contexts: dict,
+        data_version: str
+    ) -> Path:
+    """
+    Count every n-level multimer in every higher-level multimer and write the matrix.
+
+    Args:
+        directory (Path): Folder of the containment matrices.
+        higher_level_size (int): Size of the containing multimers.
+        n_level_size (int): Size of the contained multimers.
+        higher_level_contexts (dict): Contents of all_jsons/<H>_multimers_contexts.json.
+        n_level_contexts (dict): Contents of all_jsons/<N>_multimers_contexts.json.
+        data_version (str): containment_data_version() of the two context files.
+
+    Returns:
+        Path: The folder of the matrix.
+    """
+    from src.all_linkages import n_in_higher_level_isomorphism
+
+    pattern_index = PatternIndex((key, context['conjugated_lysines']) for key, context in n_level_contexts.items())
+    column_positions = {key: position for position, key in enumerate(n_level_contexts)}
+
+    indptr = np.zeros(len(higher_level_contexts) + 1, dtype=np.int64)
+    indices = []
+    counts = []
+    for row, context in enumerate(higher_level_contexts.values()):
+        count_row = pattern_index.count_row(context['conjugated_lysines'], fallback=n_in_higher_level_isomorphism)
+        for key, count in count_row.items():
+            if count:
+                indices.append(column_positions[key])
+                counts.append(count)
+        indptr[row + 1] = len(indices)
+
+    matrix_dir = containment_matrix_dir(directory, higher_level_size, n_level_size)
+    matrix_dir.mkdir(parents=True, exist_ok=True)
+
+    # Drop the old meta.json first, so a half-written matrix is never loaded
+    meta_path = matrix_dir / CONTAINMENT_META_FILENAME
+    meta_path.unlink(missing_ok=True)
+    np.save(matrix_dir / 'indptr.npy', indptr)
+    np.save(matrix_dir / 'indices.npy', np.array(indices, dtype=np.int32))
+    np.save(matrix_dir / 'counts.npy', np.array(counts, dtype=np.int32))
+    with open(meta_path, 'w') as f:
+        json.dump({
+            "format_version": CONTAINMENT_FORMAT_VERSION,
+            "data_version": data_version,
+            "higher_level_size": higher_level_size,
+            "n_level_size": n_level_size,
+            "row_ids": list(higher_level_contexts),
+            "column_ids": list(n_level_contexts)
+        }, f)
+    return matrix_dir
+
+
+def build_containment_matrices(root: Path = project_root, size_pairs=CONTAINMENT_SIZE_PAIRS) -> list:
+    """
+    Precompute the containment matrices of all size pairs whose contexts exist.
+
+    Args:
+        root (Path): Project root holding back_end/data/all_jsons.
+        size_pairs (tuple): (higher_level_size, n_level_size) pairs to build.
+
+    Returns:
+        list: Folders of the written matrices.
+    """
+    all_jsons_dir = Path(root) / 'back_end' / 'data' / 'all_jsons'
+    directory = Path(root) / 'back_end' / 'data' / 'containment_matrices'
+    written = []
+    for higher_level_size, n_level_size in size_pairs:
+        context_paths = [
+            all_jsons_dir / f'{higher_level_size}_multimers_contexts.json',
+            all_jsons_dir / f'{n_level_size}_multimers_contexts.json'
+        ]
+        if not all(path.exists() for path in context_paths):
+            continue
+        with open(context_paths[0], 'r') as f:
+            higher_level_contexts = json.load(f)
+        with open(context_paths[1], 'r') as f:
+            n_level_contexts = json.load(f)
+        written.append(save_containment_matrix(
+            directory, higher_level_size, n_level_size, higher_level_contexts, n_level_contexts,
+            containment_data_version(context_paths)
+        ))
+    return written
+
+# =========================================
+# Reading
+# =========================================
+
+class ContainmentMatrix:
+    """
+    Memory-mapped containment counts of one size pair.
+
+    Args:
+        matrix_dir (Path): Folder written by save_containment_matrix().
+    """
+
+    def __init__(self, matrix_dir: Path):
+        self.path = Path(matrix_dir)
+        with open(self.path / CONTAINMENT_META_FILENAME, 'r') as f:
+            self.meta = json.load(f)
+        self.indptr, self.indices, self.counts = (
+            np.load(self.path / f'{name}.npy', mmap_mode='r', allow_pickle=False) for name in CONTAINMENT_ARRAYS
+        )
+        self.row_positions = {key: position for position, key in enumerate(self.meta["row_ids"])}
+        self.column_positions = {key: position for position, key in enumerate(self.meta["column_ids"])}
+
+    def __repr__(self):
+        return f"ContainmentMatrix({str(self.path)!r}, shape={self.shape})"
+
+    @property
+    def data_version(self) -> str:
+        return self.meta["data_version"]
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.row_positions), len(self.column_positions)
+
+    def row(self, row_id: str) -> np.ndarray:
+        """Dense counts of one higher-level multimer, in column order."""
+        position = self.row_positions[row_id]
+        start, end = int(self.indptr[position]), int(self.indptr[position + 1])
+        dense = np.zeros(len(self.column_positions), dtype=np.int64)
+        dense[self.indices[start:end]] = self.counts[start:end]
+        return dense
+
+    def select(self, higher_level_dict: dict, n_level_dict: dict) -> ContainmentResult:
+        """
+        The counts of filtered multimer dictionaries, sliced without building rows.
+
+        Args:
+            higher_level_dict (dict): Multimer id -> edges of the higher-level multimers.
+            n_level_dict (dict): Multimer id -> edges of the n-level multimers.
+
+        Returns:
+            ContainmentResult: Labelled with str() of the edge lists.
+
+        Raises:
+            KeyError: If a multimer id is not in the matrix.
+        """
+        rows = np.array([self.row_positions[key] for key in higher_level_dict], dtype=np.int64)
+        columns = np.array([self.column_positions[key] for key in n_level_dict], dtype=np.int64)
+        new_column = np.full(len(self.column_positions), -1, dtype=np.int64)
+        new_column[columns] = np.arange(len(columns))
+
+        # Entries of the selected rows, then of the selected columns
+        starts = np.asarray(self.indptr)[rows]
+        lengths = np.asarray(self.indptr)[rows + 1] - starts
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        entries = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - starts, lengths)
+        entry_columns = new_column[np.asarray(self.indices)[entries]]
+        kept = entry_columns >= 0
+        entry_rows = np.repeat(np.arange(len(rows)), lengths)[kept]
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(entry_rows, minlength=len(rows)))))
+
+        result = ContainmentResult(
+            [str(high_edges) for high_edges in higher_level_dict.values()],
+            [str(n_edges) for n_edges in n_level_dict.values()],
+            indptr,
+            entry_columns[kept],
+            np.asarray(self.counts)[entries][kept]
+        )
+        if len(set(result.row_labels)) != len(result.row_labels) or len(result.column_positions) != len(result.column_labels):
+            # Multimers with the same edge list share one entry, as in the nested dictionary
+            result = ContainmentResult.from_nested(result.to_nested())
+        return result
+
+    def results(self, higher_level_dict: dict, n_level_dict: dict) -> dict:
+        """
+        The result of analyze_subgraph_containment() for filtered multimer dictionaries.
+
+        Returns:
+            dict: str(higher-level edges) -> {str(n-level edges): count}.
+
+        Raises:
+            KeyError: If a multimer id is not in the matrix.
+        """
+        return self.select(higher_level_dict, n_level_dict).to_nested()
+
+
+def load_containment_matrix(directory: Path, higher_level_size: int, n_level_size: int, data_version: str):
+    """
+    Load a matrix if it exists and was built from the current data.
+
+    Returns:
+        ContainmentMatrix | None: None when missing, of another format or stale.
+    """
+    matrix_dir = containment_matrix_dir(directory, higher_level_size, n_level_size)
+    if not all(path.exists() for path in containment_matrix_paths(directory, higher_level_size, n_level_size)):
+        return None
+    matrix = ContainmentMatrix(matrix_dir)
+    if matrix.meta.get("format_version") != CONTAINMENT_FORMAT_VERSION or matrix.data_version != data_version:
+        return None
+    return matrix
@@ -17,6 +17,7 @@ sys.path.insert(0, str(local_path))
 from src.utils.utils import *
 from src.utils.logging_utils import *
 from src.main import *
+from src.reaction_database import *
 
 # =========================================
 # Functions for DataFrame Manipulation
@@ -43,6 +44,70 @@ def global_deprotection_dual(ubiquitin_history_df, context_history_df):
     
     return ubiquitin_history_df, context_history_df
 
+# =========================================
+# Context feature extraction
+# =========================================
+
+# CONTEXT_FEATURES comes from reaction_database, which stores the same features as typed columns
+
+def _context_feature_values(context) -> tuple:
+    """
+    Typed features of one context dictionary (or its string form), in CONTEXT_FEATURES order.
+    Missing cells get -1 for every feature.
+    """
+    if isinstance(context, str):
+        if context in ('', 'nan'):
+            return (-1,) * len(CONTEXT_FEATURES)
+        context = ast.literal_eval(context)
+    elif not isinstance(context, dict):
+        return (-1,) * len(CONTEXT_FEATURES)
+    return (
+        len(context['ABOC_lysines']),
+        len(context['SMAC_lysines']),
+        len(context['conjugated_lysines']),
+        int(context['max_chain_number'])
+    )
+
+
+def extract_context_features(context_history: pd.DataFrame, stored_features: dict | None = None) -> dict:
+    """
+    Materialise the typed features of every context of a context history.
+
+    Columns covered by stored_features (the typed columns of the columnar reaction
+    database, see load_context_features()) are read from it; only the remaining
+    columns are parsed. Histories share most contexts between paths, so those are
+    factorized first and only the unique contexts are parsed.
+
+    Args:
+        context_history (pd.DataFrame): DataFrame of context dictionaries (as strings).
+        stored_features (dict): Optional feature name -> int DataFrame for the same
+            paths (matched by index label), e.g. from load_context_features().
+
+    Returns:
+        dict: Feature name (CONTEXT_FEATURES) -> int DataFrame with the index and
+            columns of context_history; -1 marks missing cells.
+    """
+    stored_columns = set(stored_features[CONTEXT_FEATURES[0]].columns) if stored_features else set()
+    parsed_columns = [column for column in context_history.columns if column not in stored_columns]
+
+    values = context_history[parsed_columns].to_numpy(dtype=object)
+    codes, unique_contexts = pd.factorize(values.ravel(), use_na_sentinel=False)
+    unique_features = np.array(
+        [_context_feature_values(context) for context in unique_contexts], dtype=np.int64
+    ).reshape(len(unique_contexts), len(CONTEXT_FEATURES))
+
+    features = {}
+    for position, feature in enumerate(CONTEXT_FEATURES):
+        feature_values = pd.DataFrame(
+            unique_features[codes, position].reshape(values.shape), index=context_history.index, columns=parsed_columns
+        )
+        if stored_columns:
+            covered = [column for column in context_history.columns if column in stored_columns]
+            stored = stored_features[feature].loc[context_history.index, covered]
+            feature_values = pd.concat([stored, feature_values], axis=1)[list(context_history.columns)]
+        features[feature] = feature_values
+    return features
+
 # =========================================
 # Function to filter reaction histories by number of SMAC lysines
 # =========================================
@@ -53,6 +118,7 @@ def filter_histories_by_number_of_SMAC(
     donor_history,
     context_history,
     number_of_smac=0,
+    context_features=None,
 ):
     """
     Filters reaction histories by the maximum number of ABOC_lysines in a specified column
@@ -68,8 +134,10 @@ def filter_histories_by_number_of_SMAC(
         DataFrame containing donor species history.
     context_history : pd.DataFrame
         DataFrame of context dictionaries.
-    column_offset : int
-        Offset from the end of the DataFrame to select the target column (default -2).
+    number_of_smac : int
+        Number of SMAC lysines of the selected final products (default 0).
+    context_features : dict, optional
+        Output of extract_context_features(context_history), if already computed.
 
     Returns:
     -------
@@ -77,33 +145,21 @@ def filter_histories_by_number_of_SMAC(
         Filtered versions of (ubiquitin_history, reaction_history,
         donor_history, context_history) based on max ABOC_lysines.
     """
+    if context_features is None:
+        context_features = extract_context_features(context_history)
 
-    def extract_aboc_length(cell_string):
-        d = ast.literal_eval(cell_string)
-        return len(d['ABOC_lysines'])
-    
-    def extract_smac_length(cell_string):
-        d = ast.literal_eval(cell_string)
-        return len(d['SMAC_lysines'])
-    
-    # Apply ABOC length extraction across context_history
-    aboc_num_df = context_history.map(extract_aboc_length)
-
-    # Apply SMAC length extraction across context_history
-    smac_num_df = context_history.map(extract_smac_length)
-
-    # Select the column of interest using offset
-    final_product_column_aboc = aboc_num_df.iloc[:, -2]
-    final_product_column_smac = smac_num_df.iloc[:, -2]
+    # The final product column (the last step before 'final_multimer')
+    final_product_column_aboc = context_features['ABOC_count'].iloc[:, -2].to_numpy()
+    final_product_column_smac = context_features['SMAC_count'].iloc[:, -2].to_numpy()
 
     # Identify rows where ABOC count is maximal
     max_value = final_product_column_aboc.max()
 
     # If number_of_smac is specified, adjust the max_value accordingly
     number_of_aboc = max_value - number_of_smac
-     
-    filtered_rows = final_product_column_aboc[(final_product_column_aboc == number_of_aboc) & (final_product_column_smac == number_of_smac)]
-    selected_indexes = filtered_rows.index
+
+    mask = (final_product_column_aboc == number_of_aboc) & (final_product_column_smac == number_of_smac)
+    selected_indexes = context_history.index[mask]
 
     # Apply index filtering across all input histories
     return (
@@ -156,12 +212,14 @@ def validate_most_frequent_index(current_df):
 # Function to perform global deprotection and filtering by SMAC
 # =========================================
 
-def global_deprotection_filtering_by_smac(data_dict, ubiquitin_library):
+def global_deprotection_filtering_by_smac(data_dict, ubiquitin_library, stored_context_features=None):
     """
     Create a combined DataFrame from the provided data dictionary and ubiquitin library.
     Args:
         data_dict (dict): Dictionary containing DataFrames for ubiquitin history, reaction history, donor history, and context history.
         ubiquitin_library (dict): Dictionary mapping ubiquitin names to their identifiers.
+        stored_context_features (dict): Optional typed context features of the histories
+            (load_context_features()), so only the deprotected contexts are parsed.
     Returns:
         pd.DataFrame: A combined DataFrame with the specified structure.
     """
@@ -180,7 +238,8 @@ def global_deprotection_filtering_by_smac(data_dict, ubiquitin_library):
         reaction_history,
         donor_history,
         context_history,
-        number_of_smac=0
+        number_of_smac=0,
+        context_features=extract_context_features(context_history, stored_context_features)
     )
 
     # Combine the filtered histories into a dictionary (these are filtered by number of SMAC & ABOC)
@@ -564,8 +623,9 @@ def validate_data(multimer_size):
     input_dir = project_root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
 
     # Load the combined database and ubiquitin history
-    combined_database = pd.read_csv(input_dir / 'combined_database.csv', index_col=0)
-    ubiquitin_history = pd.read_csv(input_dir / 'ubiquitin_history.csv', index_col=0)
+    data_dict = load_reaction_database(input_dir, tables=('combined_database', 'ubiquitin_history'), index_col=0)
+    combined_database = data_dict['combined_database']
+    ubiquitin_history = data_dict['ubiquitin_history']
 
     confirmation_dir = project_root / 'back_end' / 'src' / 'confirmation_data' 
 
@@ -609,18 +669,9 @@ def run_script_pulling_indexes_validataing(multimer_size, ubiquitin_library):
 
     input_dir = project_root / 'back_end' / 'data' / 'reaction_database' / f'multimer_size_{multimer_size}'
 
-    # Create the dictionary to hold the data
-    data_dict = {
-        "ubiquitin_history": [],
-        "reaction_history": [],
-        "donor_history": [],
-        "context_history": []
-    }
-    # Read the CSV files into DataFrames
-    data_dict['ubiquitin_history'] = pd.read_csv(input_dir / "ubiquitin_history.csv")
-    data_dict['reaction_history'] = pd.read_csv(input_dir / "reaction_history.csv")
-    data_dict['donor_history'] = pd.read_csv(input_dir / "donor_history.csv")
-    data_dict['context_history'] = pd.read_csv(input_dir / "context_history.csv")
+    # Read the history tables into DataFrames (columnar file if present, else the CSVs)
+    data_dict = load_reaction_database(input_dir)
+    stored_context_features = load_context_features(input_dir)
 
     # open back_end/src/original_data/reaction_summeries/1mer__to_4_reaction_summary.csv
     confirmation_data_dir = project_root / 'back_end' / 'src' / 'confirmation_data' 
@@ -632,7 +683,7 @@ def run_script_pulling_indexes_validataing(multimer_size, ubiquitin_library):
 
     # These two should always go together
     # Perform the global deprotection and filtering
-    filtered_data_dict = global_deprotection_filtering_by_smac(data_dict, ubiquitin_library)
+    filtered_data_dict = global_deprotection_filtering_by_smac(data_dict, ubiquitin_library, stored_context_features)
 
     # Create the directory for filtered data
     filtereed_data_dir = project_root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
@@ -719,6 +770,14 @@ def run_script_pulling_indexes_validataing(multimer_size, ubiquitin_library):
     donor_history_output.to_csv(filtereed_data_dir / "donor_history.csv", index=True)
     context_history_output.to_csv(filtereed_data_dir / "context_history.csv", index=True)
     combined_history_output.to_csv(filtereed_data_dir / "combined_database.csv", index=True)
+    save_columnar_reaction_database(
+        filtereed_data_dir,
+        ubiquitin_history_output,
+        reaction_history_output,
+        donor_history_output,
+        context_history_output,
+        index=True
+    )
 
     return indexed_values, validation_errors
 
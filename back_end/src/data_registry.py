@@ -0,0 +1,296 @@
+import json
+import logging
+import sys
+import threading
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+from src.reaction_database import COLUMNAR_DATABASE_FILENAME, CONTEXT_NAMES_TABLE, load_reaction_database
+from src.containment_matrices import CONTAINMENT_SIZE_PAIRS, containment_data_version, containment_matrix_paths, load_containment_matrix
+from src.multimer_lookup import canonical_edge_key, build_edge_key_index, build_value_index
+
+logger = logging.getLogger(__name__)
+
+"""
+DATA REGISTRY
+=============
+
+Process-wide cache of the data files read by the API endpoints. Every entry
+remembers the (mtime, size) signature of the files it was loaded from and is
+reloaded on the next access after one of them changes, so a rebuilt database
+is picked up without restarting the server.
+
+Returned DataFrames are shallow copies and dictionaries are shared; callers
+must treat the contents as read-only.
+"""
+
+FILTERED_DATABASE_TABLES = (
+    'combined_database',
+    'context_history',
+    CONTEXT_NAMES_TABLE,
+    'donor_history',
+    'reaction_history',
+    'ubiquitin_history'
+)
+
+
+def file_signature(paths: list) -> tuple:
+    """
+    (path, mtime_ns, size) of each path; missing files have None entries.
+    """
+    signature = []
+    for path in paths:
+        try:
+            stat = Path(path).stat()
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+def _load_json(path: Path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class DataRegistry:
+    """
+    Shared, lazily loaded data for the API endpoints.
+
+    Args:
+        root (Path): Project root holding back_end/data and front_end/src/data.
+    """
+
+    def __init__(self, root: Path = project_root):
+        self.root = Path(root)
+        self._entries = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"DataRegistry(root={str(self.root)!r}, entries={sorted(self._entries)})"
+
+    def _get(self, key, paths: list, loader):
+        """
+        Return the cached value of key, calling loader() when the files changed.
+
+        Hits take no lock; loads take a per-key lock, so a slow load only blocks
+        callers of the same key.
+        """
+        signature = file_signature(paths)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                return entry[1]
+            if entry is not None:
+                logger.info(f"Reloading {key}: files changed on disk")
+            value = loader()
+            self._entries[key] = (signature, value)
+            return value
+
+    def _key_lock(self, key) -> threading.RLock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.RLock())
+
+    def clear(self):
+        self._entries.clear()
+
+    # =========================================
+    # File locations
+    # =========================================
+
+    def filtered_database_dir(self, multimer_size: int) -> Path:
+        return self.root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
+
+    def all_jsons_dir(self) -> Path:
+        return self.root / 'back_end' / 'data' / 'all_jsons'
+
+    def multimer_contexts_path(self, multimer_size: int) -> Path:
+        return self.all_jsons_dir() / f'{multimer_size}_multimers_contexts.json'
+
+    def multimer_id_to_json_path(self, multimer_size: int) -> Path:
+        return self.root / 'front_end' / 'src' / 'data' / f'multimer_id_to_json{multimer_size}.json'
+
+    def containment_matrices_dir(self) -> Path:
+        return self.root / 'back_end' / 'data' / 'containment_matrices'
+
+    # =========================================
+    # Entries
+    # =========================================
+
+    def filtered_reaction_database(self, multimer_size: int) -> dict:
+        """
+        Tables of filtered_reaction_database/multimer_size_N, as read with index_col=0.
+
+        Returns:
+            dict: Table name -> pd.DataFrame (shallow copy), for FILTERED_DATABASE_TABLES.
+        """
+        input_dir = self.filtered_database_dir(multimer_size)
+        tables = self._get(
+            ('filtered_reaction_database', multimer_size),
+            self._filtered_database_paths(multimer_size),
+            lambda: load_reaction_database(input_dir, tables=FILTERED_DATABASE_TABLES, index_col=0)
+        )
+        return {name: table.copy(deep=False) for name, table in tables.items()}
+
+    def multimer_jsons(self, multimer_size: int) -> dict:
+        """Contents of all_jsons/N_multimers_jsons.json."""
+        path = self.all_jsons_dir() / f'{multimer_size}_multimers_jsons.json'
+        return self._get(('multimer_jsons', multimer_size), [path], lambda: _load_json(path))
+
+    def multimer_contexts(self, multimer_size: int) -> dict:
+        """Contents of all_jsons/N_multimers_contexts.json."""
+        path = self.multimer_contexts_path(multimer_size)
+        return self._get(('multimer_contexts', multimer_size), [path], lambda: _load_json(path))
+
+    def multimer_id_to_json(self, multimer_size: int) -> dict:
+        """Contents of front_end/src/data/multimer_id_to_jsonN.json."""
+        path = self.multimer_id_to_json_path(multimer_size)
+        return self._get(('multimer_id_to_json', multimer_size), [path], lambda: _load_json(path))
+
+    def containment_matrix(self, higher_level_size: int, n_level_size: int):
+        """
+        Precomputed ContainmentMatrix of a size pair, or None when it was not built
+        or the multimer contexts changed since (the data version is checked on load).
+        """
+        context_paths = [self.multimer_contexts_path(higher_level_size), self.multimer_contexts_path(n_level_size)]
+        directory = self.containment_matrices_dir()
+
+        def load():
+            if not all(path.exists() for path in context_paths):
+                return None
+            return load_containment_matrix(directory, higher_level_size, n_level_size, containment_data_version(context_paths))
+
+        return self._get(
+            ('containment_matrix', higher_level_size, n_level_size),
+            containment_matrix_paths(directory, higher_level_size, n_level_size) + context_paths,
+            load
+        )
+
+    def _filtered_database_paths(self, multimer_size: int) -> list:
+        input_dir = self.filtered_database_dir(multimer_size)
+        return [input_dir / COLUMNAR_DATABASE_FILENAME] + [
+            input_dir / f'{table}.csv' for table in FILTERED_DATABASE_TABLES if table != CONTEXT_NAMES_TABLE
+        ]
+
+    def filtered_database_signature(self, multimer_size: int) -> tuple:
+        """file_signature() of the filtered reaction database (a data version for caches)."""
+        return file_signature(self._filtered_database_paths(multimer_size))
+
+    # =========================================
+    # Lookup indexes
+    # =========================================
+
+    def indexes_by_multimer_id(self, multimer_size: int) -> dict:
+        """UbX_Y -> simulation indexes of the filtered reaction database."""
+        return self._get(
+            ('indexes_by_multimer_id', multimer_size),
+            self._filtered_database_paths(multimer_size),
+            lambda: build_value_index(self.filtered_reaction_database(multimer_size)['ubiquitin_history'], 'multimer_id')
+        )
+
+    def indexes_by_final_multimer(self, multimer_size: int) -> dict:
+        """final_multimer string -> simulation indexes of the filtered reaction database."""
+        return self._get(
+            ('indexes_by_final_multimer', multimer_size),
+            self._filtered_database_paths(multimer_size),
+            lambda: build_value_index(self.filtered_reaction_database(multimer_size)['ubiquitin_history'], 'final_multimer')
+        )
+
+    def multimer_id_edge_index(self, multimer_size: int) -> dict:
+        """Canonical edge key -> UbX_Y of multimer_id_to_jsonN.json."""
+        def build():
+            import src.main as main
+            edge_lists = {}
+            for multimer_id, multimer in self.multimer_id_to_json(multimer_size).items():
+                _, context = main.iterate_through_ubiquitin(multimer)
+                edge_lists[multimer_id] = context['conjugated_lysines']
+            return build_edge_key_index(edge_lists)
+
+        return self._get(('multimer_id_by_edges', multimer_size), [self.multimer_id_to_json_path(multimer_size)], build)
+
+    def multimer_id_by_edges(self, multimer_size: int, edges: list):
+        """
+        UbX_Y of multimer_id_to_jsonN.json with the given conjugations, or None.
+        """
+        return self.multimer_id_edge_index(multimer_size).get(canonical_edge_key(edges))
+
+    def multimer_number_edge_index(self, multimer_size: int) -> dict:
+        """Canonical edge key -> key of all_jsons/N_multimers_jsons.json."""
+        def build():
+            contexts = self.multimer_contexts(multimer_size)
+            return build_edge_key_index({key: context['conjugated_lysines'] for key, context in contexts.items()})
+
+        path = self.multimer_contexts_path(multimer_size)
+        return self._get(('multimer_number_by_edges', multimer_size), [path], build)
+
+    def multimer_number_by_edges(self, multimer_size: int, edges: list):
+        """
+        Key of all_jsons/N_multimers_jsons.json with the given conjugations, or None.
+        """
+        return self.multimer_number_edge_index(multimer_size).get(canonical_edge_key(edges))
+
+    def final_multimer_path_counts(self, multimer_size: int) -> dict:
+        """
+        Synthesis paths per final multimer of the full reaction network (computed once).
+        """
+        def build():
+            import src.simulation as simulation
+            network = simulation.build_reaction_network(
+                simulation.REACTION_DATABASE_ACCEPTORS,
+                simulation.REACTION_DATABASE_DONORS,
+                multimer_size
+            )
+            return network.final_multimer_path_counts()
+
+        return self._get(('final_multimer_path_counts', multimer_size), [], build)
+
+    def preload(self, database_sizes=(4, 5), json_sizes=(2, 3, 4, 5), containment_size_pairs=CONTAINMENT_SIZE_PAIRS):
+        """
+        Load the files the endpoints read and build their lookup indexes, skipping the
+        ones that were not generated yet.
+        """
+        loaders = []
+        for multimer_size in database_sizes:
+            loaders.append((self.filtered_reaction_database, multimer_size))
+            loaders.append((self.indexes_by_multimer_id, multimer_size))
+            loaders.append((self.indexes_by_final_multimer, multimer_size))
+            loaders.append((self.multimer_id_to_json, multimer_size))
+            loaders.append((self.multimer_id_edge_index, multimer_size))
+        for multimer_size in json_sizes:
+            loaders.append((self.multimer_jsons, multimer_size))
+            loaders.append((self.multimer_contexts, multimer_size))
+            loaders.append((self.multimer_number_edge_index, multimer_size))
+
+        for loader, multimer_size in loaders:
+            try:
+                loader(multimer_size)
+            except FileNotFoundError as e:
+                logger.warning(f"Skipping preload of {loader.__name__}({multimer_size}): {e}")
+
+        # Precomputed containment matrices (None when not built)
+        for higher_level_size, n_level_size in containment_size_pairs:
+            self.containment_matrix(higher_level_size, n_level_size)
+        return self
+
+
+_data_registry = None
+_data_registry_lock = threading.Lock()
+
+
+def get_data_registry() -> DataRegistry:
+    """Return the process-wide DataRegistry."""
+    global _data_registry
+    with _data_registry_lock:
+        if _data_registry is None:
+            _data_registry = DataRegistry()
+        return _data_registry
@@ -1,11 +1,12 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-import base64
-import io
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import json
 import asyncio
 import logging
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
 
 # Configure logging to write to a file instead of the terminal
 log_file_path = "application.log"
@@ -19,7 +20,79 @@ logging.getLogger().handlers.clear()
 logging.getLogger().addHandler(file_handler)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Make the backend modules importable as src.*
+backend_path = Path(__file__).resolve().parents[2] / 'back_end'
+if str(backend_path) not in sys.path:
+    sys.path.insert(0, str(backend_path))
+
+import src.warmup as warmup
+
+# Import pandas, matplotlib, networkx and the backend modules once at startup,
+# recording how long each one takes (see /api/startup)
+warmup.import_modules()
+
+import src.main as main
+import src.plotting as plotting
+import src.nomenclature as nomenclature
+import src.api_jobs as api_jobs
+from src.data_registry import get_data_registry
+from src.worker_pools import PoolSaturatedError, get_worker_pools, shutdown_worker_pools
+from src.analysis_jobs import get_job_manager, shutdown_job_manager
+from src.artifact_cache import artifact_key, get_artifact_cache
+from src.plate_renderer import IMAGE_FORMATS
+from src.containment_matrices import ContainmentResult
+from src.artifact_bundles import (
+    BUNDLE_ID_PATTERN, MANIFEST_NAME, bundle_manifest, compress_body, media_type, read_artifact
+)
+
+SELECTION_RESPONSE_MODES = ('json', 'manifest', 'zip')
+BUNDLE_CACHE_CONTROL = "private, max-age=86400, immutable"
+
+
+def pool_saturated_response(error: PoolSaturatedError) -> JSONResponse:
+    """503 answer for a request that a full worker pool did not admit."""
+    logger.warning(str(error))
+    return JSONResponse(content={"status": "error", "message": str(error)}, status_code=503, headers={"Retry-After": "5"})
+
+
+async def encoded_response(request: Request, body: bytes, media_type: str = "application/json", headers: dict | None = None) -> Response:
+    """Response compressed with br or gzip when the client accepts it (text media types only)."""
+    body, encoding = await get_worker_pools().io.run(compress_body, body, request.headers.get("accept-encoding"), media_type)
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def bundle_response(bundle: bytes, bundle_id: str) -> Response:
+    """Zip bundle as a download."""
+    return Response(content=bundle, media_type="application/zip", headers={
+        "Cache-Control": BUNDLE_CACHE_CONTROL,
+        "Content-Disposition": f'attachment; filename="selection_{bundle_id[:12]}.zip"'
+    })
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # CPU-heavy handlers run on a bounded process pool, file loading on a thread pool
+    app.state.worker_pools = get_worker_pools()
+
+    # Pre-warm the matplotlib font cache and renderer
+    await app.state.worker_pools.io.run(warmup.warm_matplotlib)
+
+    # Parse the reaction databases and multimer JSONs once at startup; entries
+    # are reloaded on access when the files change on disk
+    await app.state.worker_pools.io.run(warmup.preload_data)
+    app.state.data_registry = get_data_registry()
+
+    # Start the process workers in the background; each one warms up before its first job
+    app.state.cpu_worker_warmup = app.state.worker_pools.cpu.submit(warmup.startup_report)
+    yield
+    await asyncio.to_thread(shutdown_job_manager)
+    await asyncio.to_thread(shutdown_worker_pools)
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow CORS for local frontend development
 app.add_middleware(
@@ -35,23 +108,9 @@ async def submit_selection(request: Request):
     data = await request.json()
     selected_ids = data.get("labels", [])
     page = data.get("page", "")
-
-    import sys
-    from pathlib import Path
-    import pandas as pd
-
-    # Dynamically get the backend path relative to this file's location
-    current_path = Path(__file__).resolve()
-    project_root = current_path.parents[2]  # Go up to project root
-    sys.path.insert(0, str(project_root))
-    local_path = project_root / 'back_end'
-    sys.path.insert(0, str(local_path))
-
-    # Import project modules
-    import src.utils.utils
-    import src.utils.logging_utils
-    import src.main as main
-    import src.plotting as plotting
+    figure_format = data.get("figure_format", "png")  # 'svg' for vector plate maps
+    # 'json': base64 artifacts in one document; 'manifest': artifact URLs; 'zip': the bundle itself
+    response_mode = data.get("response_mode", "json")
 
     # Determine multimer size from page
     if page == 'tetramers':
@@ -60,122 +119,100 @@ async def submit_selection(request: Request):
         multimer_size = 5
     else:
         return {"error": "Invalid page value", "status": "error"}
+    if figure_format not in IMAGE_FORMATS:
+        return {"error": f"Invalid figure_format value (expected one of {', '.join(IMAGE_FORMATS)})", "status": "error"}
+    if response_mode not in SELECTION_RESPONSE_MODES:
+        return {"error": f"Invalid response_mode value (expected one of {', '.join(SELECTION_RESPONSE_MODES)})", "status": "error"}
+
+    # Rendered bundles are cached by page, ids and data version; a hit returns the stored body
+    worker_pools = get_worker_pools()
+    artifact_cache = get_artifact_cache()
+    try:
+        data_signature = await worker_pools.io.run(get_data_registry().filtered_database_signature, multimer_size)
+        variant = 'json' if response_mode == 'json' else 'bundle'
+        cache_key = artifact_key(page, selected_ids, data_signature, figure_format, variant)
+        body = await worker_pools.io.run(artifact_cache.get, cache_key)
+        if body is None:
+            # Plate maps, spreadsheets and reaction sequences are built on the process pool
+            if variant == 'json':
+                content = await worker_pools.cpu.run(api_jobs.plate_generation_outputs, selected_ids, page, multimer_size, figure_format)
+                if content.get("status") != "ok":
+                    return JSONResponse(content=content)
+                # JSON with base64-encoded PNG (or SVG) plate maps, Excel, Opentrons Python file, and reaction sequences
+                body = JSONResponse(content=content).body
+            else:
+                body = await worker_pools.cpu.run(api_jobs.plate_generation_bundle, selected_ids, page, multimer_size, figure_format)
+                if isinstance(body, dict):
+                    return JSONResponse(content=body)
+            try:
+                await worker_pools.io.run(artifact_cache.put, cache_key, body)
+            except PoolSaturatedError as e:
+                logger.warning(f"Artifact bundle not cached: {e}")
+
+        if response_mode == 'zip':
+            return bundle_response(body, cache_key)
+        if response_mode == 'manifest':
+            body = JSONResponse(content=bundle_manifest(body, cache_key)).body
+        return await encoded_response(request, body)
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
+
+
+async def cached_bundle(bundle_id: str):
+    """Zip bundle of a bundle id from the artifact cache, or None."""
+    if not BUNDLE_ID_PATTERN.match(bundle_id):
+        return None
+    return await get_worker_pools().io.run(get_artifact_cache().get, bundle_id)
+
+
+def bundle_not_found_response(bundle_id: str) -> JSONResponse:
+    return JSONResponse(
+        content={"status": "error", "message": f"Artifact bundle {bundle_id} not found; submit the selection again"},
+        status_code=404
+    )
+
+
+@app.get("/api/artifact-bundles/{bundle_id}")
+async def artifact_bundle(bundle_id: str):
+    """
+    Zip bundle of a /api/submit-selection request (manifest.json first).
+    """
+    try:
+        bundle = await cached_bundle(bundle_id)
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
+    if bundle is None:
+        return bundle_not_found_response(bundle_id)
+    return bundle_response(bundle, bundle_id)
+
 
-    # Download CSV files
-    def download_data_dict(multimer_size):
-        input_dir = project_root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
-        combined_database = pd.read_csv(input_dir / 'combined_database.csv', index_col=0)
-        context_history = pd.read_csv(input_dir / 'context_history.csv', index_col=0)
-        donor_history = pd.read_csv(input_dir / 'donor_history.csv', index_col=0)
-        reaction_history = pd.read_csv(input_dir / 'reaction_history.csv', index_col=0)
-        ubiquitin_history = pd.read_csv(input_dir / 'ubiquitin_history.csv', index_col=0)
-        return {
-            'combined_database': combined_database,
-            'context_history': context_history,
-            'donor_history': donor_history,
-            'reaction_history': reaction_history,
-            'ubiquitin_history': ubiquitin_history
-        }
-
-    # Download the data dictionary
-    data_dict = download_data_dict(multimer_size)
-    combined_database = data_dict['combined_database']
-    context_history = data_dict['context_history']
-    donor_history = data_dict['donor_history']
-    reaction_history = data_dict['reaction_history']
-    ubiquitin_history = data_dict['ubiquitin_history']
-
-    # Convert selected ids to a list of indexes
-    indexes = []
-    for id in selected_ids:
+@app.get("/api/artifact-bundles/{bundle_id}/{filename}")
+async def artifact_bundle_file(bundle_id: str, filename: str, request: Request):
+    """
+    One artifact of a bundle, or its manifest (manifest.json, with artifact URLs).
+    """
+    try:
+        bundle = await cached_bundle(bundle_id)
+        if bundle is None:
+            return bundle_not_found_response(bundle_id)
+        if filename == MANIFEST_NAME:
+            return await encoded_response(request, JSONResponse(content=bundle_manifest(bundle, bundle_id)).body)
         try:
-            new_index = int(combined_database[(combined_database['multimer_id'] == id) & (combined_database['used_in_synthesis'] == 1)]['index'].unique()[0])
-            indexes.append(new_index)
-        except Exception as e:
-            return {"error": f"ID {id} not found or invalid: {str(e)}", "status": "error"}
-
-    # Create plate dataframes
-    output_dict = plotting.inner_create_plate_dfs(data_dict, indexes, multimer_size)
-
-    # Extract the plate dataframes
-    enzymes_donors_96 = output_dict['enzymes_donors_96']
-    deprots_96 = output_dict['deprots_96']
-    acceptors_96 = output_dict['dimer_acceptors_96']
-
-    # Generate plots
-    fig1, ax1 = plotting.plot_96wells(cdata=enzymes_donors_96, figure=1, figure_name='Plate map: Enzyme + Donor Mixes', colorbar_type='enzymes_donors')
-    fig2, ax2 = plotting.plot_deprotection_cycles(cdata=deprots_96, figure=2, figure_name='Deprotection Cycles', colorbar_type='deprots')
-    fig3, ax3 = plotting.plot_96wells(cdata=acceptors_96, figure=3, figure_name='Plate map: Acceptors', colorbar_type='acceptors')
-
-    # Helper to convert figure to base64
-    def fig_to_base64(fig):
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', bbox_inches='tight')
-        buf.seek(0)
-        img_bytes = buf.read()
-        buf.close()
-        return base64.b64encode(img_bytes).decode('utf-8')
-
-    fig1_b64 = fig_to_base64(fig1)
-    fig2_b64 = fig_to_base64(fig2)
-    fig3_b64 = fig_to_base64(fig3)
-
-    # Generate Excel file as base64
-    excel_bytes = plotting.create_xlsx_bytes(output_dict)
-    excel_bytes.seek(0)
-    excel_b64 = base64.b64encode(excel_bytes.read()).decode('utf-8')
-
-    # Generate python opentrons file as base64
-    opentrons_bytes = plotting.create_opentrons_file_bytes(output_dict)
-    opentrons_bytes.seek(0)
-    opentrons_b64 = base64.b64encode(opentrons_bytes.read()).decode('utf-8')
-
-    # Convert reaction_sequences_dicts to bytes
-    reaction_sequences_dicts = plotting.build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size)
-    reaction_sequences_bytes = io.BytesIO()
-    reaction_sequences_bytes.write(json.dumps(reaction_sequences_dicts).encode('utf-8'))
-    reaction_sequences_bytes.seek(0)
-    reaction_sequences_b64 = base64.b64encode(reaction_sequences_bytes.read()).decode('utf-8')
-
-    # Return as JSON with base64-encoded PNGs, Excel, Opentrons Python file, and reaction sequences
-    return JSONResponse(content={
-        "received_labels": indexes,
-        "page": page,
-        "status": "ok",
-        "figures": {
-            "enzymes_donors_96": fig1_b64,
-            "deprots_96": fig2_b64,
-            "acceptors_96": fig3_b64,
-            "reagent_calculations.xlsx": excel_b64,
-            "opentrons.py": opentrons_b64,
-            "reaction_sequences.json": reaction_sequences_b64
-        }
-    })
+            artifact = read_artifact(bundle, filename)
+        except KeyError:
+            return JSONResponse(content={"status": "error", "message": f"Artifact {filename} not found in bundle {bundle_id}"}, status_code=404)
+        # Bundle ids are content hashes, so an artifact URL never changes content
+        return await encoded_response(request, artifact, media_type(filename), headers={
+            "Cache-Control": BUNDLE_CACHE_CONTROL,
+            "Content-Disposition": f'inline; filename="{filename}"'
+        })
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
 
 # New endpoint to handle UbX_Y submission
 @app.post("/api/submit-ubxy")
 async def submit_ubxy(request: Request):
 
-    import sys
-    from pathlib import Path
-    import pandas as pd
-    import copy
-    import json
-
-    # Dynamically get the backend path relative to this file's location
-    current_path = Path(__file__).resolve()
-    project_root = current_path.parents[2]  # Go up to project root
-    sys.path.insert(0, str(project_root))
-    local_path = project_root / 'back_end'
-    sys.path.insert(0, str(local_path))
-
-    # Import project modules
-    import src.utils.utils
-    import src.utils.logging_utils
-    import src.main as main
-    import src.plotting as plotting
-    import src.nomenclature as nomenclature
-    
     try:
         data = await request.json()
         ubxy_value = data.get("ubxy", None)
@@ -196,28 +233,10 @@ async def submit_ubxy(request: Request):
             # Original UbX_Y processing for values starting with 'U'
             multimer_size = int(ubxy_value.replace("Ub", "").split('_')[0])
         
-        # Function to load data
-        def download_data_dict(multimer_size):
-            input_dir = project_root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
-            combined_database = pd.read_csv(input_dir / 'combined_database.csv', index_col=0)
-            context_history = pd.read_csv(input_dir / 'context_history.csv', index_col=0)
-            donor_history = pd.read_csv(input_dir / 'donor_history.csv', index_col=0)
-            reaction_history = pd.read_csv(input_dir / 'reaction_history.csv', index_col=0)
-            ubiquitin_history = pd.read_csv(input_dir / 'ubiquitin_history.csv', index_col=0)
-            return {
-                'combined_database': combined_database,
-                'context_history': context_history,
-                'donor_history': donor_history,
-                'reaction_history': reaction_history,
-                'ubiquitin_history': ubiquitin_history
-            }
-
-        # Load the data
-        data_dict = download_data_dict(multimer_size)
+        # Shared tables from the data registry (parsed once per process, off the event loop)
+        data_dict = await get_worker_pools().io.run(get_data_registry().filtered_reaction_database, multimer_size)
         combined_database = data_dict['combined_database']
         context_history = data_dict['context_history']
-        donor_history = data_dict['donor_history']
-        reaction_history = data_dict['reaction_history']
         ubiquitin_history = data_dict['ubiquitin_history']
 
         # If it starts with 'A', convert from nomenclature format to UbX_Y format 
@@ -230,19 +249,9 @@ async def submit_ubxy(request: Request):
                 multimer_size = int(nomenclature.multimer_length_from_nomenclature(ubxy_value))
                 
                 parsed_edges = nomenclature.parse_compact_edges(ubxy_value)
-                output_ubiG_json = nomenclature.build_polyubiquitin_from_edges_with_histag(parsed_edges)
-
-                # Find the key in multimers_dict that corresponds to output_ubiG_json
-                ubxy_value = None
 
-                file_path1 = project_root / 'front_end' / 'src' / 'data' / f'multimer_id_to_json{multimer_size}.json'
-                with open(file_path1, 'r') as f:
-                    multimers_dict = json.load(f)
-
-                for key, value in multimers_dict.items():
-                    if value == str(output_ubiG_json):
-                        ubxy_value = key
-                        break
+                # Look the structure up by its canonical edge key
+                ubxy_value = await get_worker_pools().io.run(get_data_registry().multimer_id_by_edges, multimer_size, parsed_edges)
 
                 if ubxy_value is None:
                     return JSONResponse(content={"status": "error", "message": "Generated structure not found in multimers database"}, status_code=404)
@@ -251,9 +260,9 @@ async def submit_ubxy(request: Request):
             except Exception as e:
                 return JSONResponse(content={"status": "error", "message": f"Error in nomenclature conversion: {str(e)}"}, status_code=400)
 
-        # Get unique indices for the specified multimer_id and ensure all values are integers
-        indexes = ubiquitin_history.loc[ubiquitin_history["multimer_id"] == ubxy_value, "index"].dropna().unique()
-        indexes = [int(i) for i in indexes]
+        # Get unique indices for the specified multimer_id from the registry's hash index
+        indexes_by_multimer_id = await get_worker_pools().io.run(get_data_registry().indexes_by_multimer_id, multimer_size)
+        indexes = indexes_by_multimer_id.get(ubxy_value, [])
 
         if len(indexes) > 0:
             final_multimer = ubiquitin_history[ubiquitin_history["index"] == indexes[0]]["final_multimer"].iloc[0]
@@ -282,12 +291,8 @@ async def submit_ubxy(request: Request):
         # chemical_all_node_nomenclature = ....
         chemical_all_node_nomenclature = nomenclature.conjugated_lysines_to_chemical_all_node_nomenclature(edges)
 
-        # Convert reaction_sequences_dicts to bytes
-        reaction_sequences_dicts = plotting.build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size)
-        reaction_sequences_bytes = io.BytesIO()
-        reaction_sequences_bytes.write(json.dumps(reaction_sequences_dicts).encode('utf-8'))
-        reaction_sequences_bytes.seek(0)
-        reaction_sequences_b64 = base64.b64encode(reaction_sequences_bytes.read()).decode('utf-8')
+        # Reaction sequences as base64 JSON (pandas work, on the process pool)
+        reaction_sequences_b64 = await get_worker_pools().cpu.run(api_jobs.reaction_sequences_b64, [int(index) for index in indexes], multimer_size)
 
         # Return the entered UbX_Y value
         return JSONResponse(content={
@@ -300,30 +305,14 @@ async def submit_ubxy(request: Request):
             "graph_w_preorder_nomenclature": graph_w_preorder_nomenclature,
             "chemical_all_node_nomenclature": chemical_all_node_nomenclature
             })
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 # New endpoint to handle jsonOutput submission
 @app.post("/api/submit-json-output")
 async def submit_json_output(request: Request):
-    import sys
-    from pathlib import Path
-    import pandas as pd
-
-    # Dynamically get the backend path relative to this file's location
-    current_path = Path(__file__).resolve()
-    project_root = current_path.parents[2]  # Go up to project root
-    sys.path.insert(0, str(project_root))
-    local_path = project_root / 'back_end'
-    sys.path.insert(0, str(local_path))
-
-    # Import project modules
-    import src.utils.utils
-    import src.utils.logging_utils
-    import src.main as main
-    import src.plotting as plotting
-    import src.nomenclature as nomenclature
-
     try:
         data = await request.json()
         json_output = data.get("jsonOutput", None)
@@ -333,32 +322,18 @@ async def submit_json_output(request: Request):
         # Assuming jsonOutput is a list of dictionaries, determine multimer_size
         multimer_size = len(json_output) + 1
 
-        # Function to load data
-        def download_data_dict(multimer_size):
-            input_dir = project_root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
-            combined_database = pd.read_csv(input_dir / 'combined_database.csv', index_col=0)
-            context_history = pd.read_csv(input_dir / 'context_history.csv', index_col=0)
-            donor_history = pd.read_csv(input_dir / 'donor_history.csv', index_col=0)
-            reaction_history = pd.read_csv(input_dir / 'reaction_history.csv', index_col=0)
-            ubiquitin_history = pd.read_csv(input_dir / 'ubiquitin_history.csv', index_col=0)
-            return {
-                'combined_database': combined_database,
-                'context_history': context_history,
-                'donor_history': donor_history,
-                'reaction_history': reaction_history,
-                'ubiquitin_history': ubiquitin_history
-            }
-
-        # Load the data
-        data_dict = download_data_dict(multimer_size)
+        # Shared tables from the data registry (parsed once per process, off the event loop)
+        data_dict = await get_worker_pools().io.run(get_data_registry().filtered_reaction_database, multimer_size)
         combined_database = data_dict['combined_database']
         context_history = data_dict['context_history']
-        donor_history = data_dict['donor_history']
-        reaction_history = data_dict['reaction_history']
         ubiquitin_history = data_dict['ubiquitin_history']
 
         # Get indexes for the final multimer from jsonOutput
-        indexes = plotting.get_indexes_for_final_multimer(json_output, ubiquitin_history)
+        final_multimer_index = await get_worker_pools().io.run(get_data_registry().indexes_by_final_multimer, multimer_size)
+        indexes = plotting.get_indexes_for_final_multimer(
+            json_output, ubiquitin_history,
+            final_multimer_index=final_multimer_index
+        )
 
         if len(indexes) > 0:
             final_multimer = ubiquitin_history[ubiquitin_history["index"] == indexes[0]]["final_multimer"].iloc[0]
@@ -386,12 +361,8 @@ async def submit_json_output(request: Request):
         # chemical_all_node_nomenclature = ....
         chemical_all_node_nomenclature = nomenclature.conjugated_lysines_to_chemical_all_node_nomenclature(edges)
 
-        # Convert reaction_sequences_dicts to bytes
-        reaction_sequences_dicts = plotting.build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size)
-        reaction_sequences_bytes = io.BytesIO()
-        reaction_sequences_bytes.write(json.dumps(reaction_sequences_dicts).encode('utf-8'))
-        reaction_sequences_bytes.seek(0)
-        reaction_sequences_b64 = base64.b64encode(reaction_sequences_bytes.read()).decode('utf-8')
+        # Reaction sequences as base64 JSON (pandas work, on the process pool)
+        reaction_sequences_b64 = await get_worker_pools().cpu.run(api_jobs.reaction_sequences_b64, [int(index) for index in indexes], multimer_size)
 
         # Return the entered UbX_Y value
         return JSONResponse(content={
@@ -404,6 +375,8 @@ async def submit_json_output(request: Request):
             "graph_w_preorder_nomenclature": graph_w_preorder_nomenclature,
             "chemical_all_node_nomenclature": chemical_all_node_nomenclature
             })
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
@@ -412,270 +385,229 @@ async def submit_json_output(request: Request):
 @app.post("/api/analyze-subgraphs-stream")
 async def analyze_subgraphs_stream(request: Request):
     """
-    Streaming subgraph containment analysis with real-time timing information
+    Streaming subgraph containment analysis with real-time timing information.
+
+    Server-sent events: 'status', 'timing_update', 'progress_update' (at most one
+    per analysis_jobs.PROGRESS_INTERVAL), 'partial_results' (the nonzero counts of
+    the higher-level graphs finished since the previous one; none when the stream
+    joins a job started without a live watcher), then 'final_results' or 'error';
+    ': heartbeat' comments keep idle connections open. Closing the connection
+    cancels the analysis unless another request shares it.
     """
-    import sys
-    from pathlib import Path
-    
-    # Dynamically get the backend path relative to this file's location
-    current_path = Path(__file__).resolve()
-    project_root = current_path.parents[2]  # Go up to project root
-    sys.path.insert(0, str(project_root))
-    local_path = project_root / 'back_end'
-    sys.path.insert(0, str(local_path))
-
-    # Import project modules
-    import src.main as main
-    import src.all_linkages as linkages
-    
     try:
-        import pandas as pd
-        import base64
-        import time
-        
         data = await request.json()
-        higher_level_size = data.get("higher_level_size", 5)  # Default to pentamers
-        n_level_size = data.get("n_level_size", 4)  # Default to tetramers
-        higher_level_lysine_ids = set(data.get("higher_level_lysine_ids", ["K48", "K63"]))  # Default to K48/K63
-        n_level_lysine_ids = set(data.get("n_level_lysine_ids", ["K48", "K63"]))  # Default to K48/K63
 
-        # Load the data
-        higher_level_data = linkages.load_multimer_contexts(project_root, higher_level_size)
-        n_level_data = linkages.load_multimer_contexts(project_root, n_level_size)
+        # Run the analysis as a job before streaming, so a full pool answers 503
+        # instead of an empty stream; an identical request is answered from its
+        # stored result
+        job_manager = get_job_manager()
+        job = await job_manager.submit('analyze-subgraphs', data, watch=True)
 
-        # Filter by lysine types
-        higher_level_dict = linkages.get_multimer_edges_by_lysines(higher_level_data, higher_level_lysine_ids)
-        n_level_dict = linkages.get_multimer_edges_by_lysines(n_level_data, n_level_lysine_ids)
+        def sse(event: dict) -> str:
+            # Ensure proper JSON encoding
+            try:
+                return f"data: {json.dumps(event, ensure_ascii=True)}\n\n"
+            except Exception as json_error:
+                logger.error(f"JSON encoding error: {json_error}")
+                return f"data: {json.dumps({'type': 'error', 'message': 'JSON encoding error'})}\n\n"
+
+        def update_frames(update: dict):
+            """Server-sent frames for a job update"""
+            if update.get("type") == "heartbeat":
+                yield ": heartbeat\n\n"
+            elif update.get("type") == "timing_analysis":
+                # This is the key timing update after 10 iterations!
+                yield sse({
+                    "type": "timing_update",
+                    "data": {
+                        "completed_iterations": update.get("completed_iterations"),
+                        "elapsed_time": update.get("elapsed_time"),
+                        "avg_time_per_iteration": update.get("avg_time_per_iteration"),
+                        "estimated_total_time": update.get("estimated_total_time"),
+                        "estimated_remaining_time": update.get("estimated_remaining_time"),
+                        "estimated_total_seconds": update.get("estimated_total_seconds"),
+                        "estimated_remaining_seconds": update.get("estimated_remaining_seconds")
+                    }
+                })
+            elif update.get("type") == "progress":
+                # Coalesced progress updates with the rows finished since the last one
+                yield sse({
+                    "type": "progress_update",
+                    "data": {
+                        "current": update.get("current"),
+                        "total": update.get("total"),
+                        "message": update.get("message", "")
+                    }
+                })
+                if update.get("rows"):
+                    yield sse({
+                        "type": "partial_results",
+                        "data": {
+                            "rows": update["rows"],
+                            "current": update.get("current"),
+                            "total": update.get("total")
+                        }
+                    })
 
         async def stream_analysis():
             """Generator function for streaming analysis results"""
-            results = None
-            
-            # Send initial status
-            yield f"data: {json.dumps({'type': 'status', 'message': 'Starting analysis...'})}\n\n"
-            
-            # Run the analysis with progress callback
-            analysis_start_time = time.time()
-            
-            # We need to run the analysis in a way that allows async streaming
-            import threading
-            import queue
-            
-            result_queue = queue.Queue()
-            update_queue = queue.Queue()
-            
-            def run_analysis():
-                def streaming_callback(progress_data):
-                    # Put all progress updates into the queue for streaming
-                    update_queue.put(progress_data)
-                
-                try:
-                    results = linkages.analyze_subgraph_containment(higher_level_dict, n_level_dict, streaming_callback)
-                    result_queue.put(("success", results))
-                except Exception as e:
-                    result_queue.put(("error", str(e)))
-            
-            # Start analysis in separate thread
-            analysis_thread = threading.Thread(target=run_analysis)
-            analysis_thread.start()
-            
-            # Stream updates while analysis runs
-            while analysis_thread.is_alive():
-                try:
-                    # Check for any updates (timing or progress)
-                    while not update_queue.empty():
-                        progress_data = update_queue.get_nowait()
-                        
-                        if progress_data.get("type") == "timing_analysis":
-                            # This is the key timing update after 10 iterations!
-                            timing_event = {
-                                "type": "timing_update",
-                                "data": {
-                                    "completed_iterations": progress_data.get("completed_iterations"),
-                                    "elapsed_time": progress_data.get("elapsed_time"),
-                                    "avg_time_per_iteration": progress_data.get("avg_time_per_iteration"),
-                                    "estimated_total_time": progress_data.get("estimated_total_time"),
-                                    "estimated_remaining_time": progress_data.get("estimated_remaining_time"),
-                                    "estimated_total_seconds": progress_data.get("estimated_total_seconds"),
-                                    "estimated_remaining_seconds": progress_data.get("estimated_remaining_seconds")
-                                }
-                            }
-                            # Ensure proper JSON encoding
-                            try:
-                                json_str = json.dumps(timing_event, ensure_ascii=True)
-                                yield f"data: {json_str}\n\n"
-                            except Exception as json_error:
-                                print(f"JSON encoding error: {json_error}")
-                                yield f"data: {json.dumps({'type': 'error', 'message': 'JSON encoding error'})}\n\n"
-                        
-                        elif progress_data.get("type") == "progress":
-                            # Regular progress updates
-                            progress_event = {
-                                "type": "progress_update",
-                                "data": {
-                                    "current": progress_data.get("current"),
-                                    "total": progress_data.get("total"),
-                                    "message": progress_data.get("message", "")
-                                }
-                            }
-                            # Ensure proper JSON encoding
-                            try:
-                                json_str = json.dumps(progress_event, ensure_ascii=True)
-                                yield f"data: {json_str}\n\n"
-                            except Exception as json_error:
-                                print(f"JSON encoding error: {json_error}")
-                                yield f"data: {json.dumps({'type': 'error', 'message': 'JSON encoding error'})}\n\n"
-                    
-                    await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
-                except queue.Empty:
-                    pass
-            
-            # Get final results
             try:
-                result_type, result_data = result_queue.get_nowait()
-                if result_type == "error":
-                    yield f"data: {json.dumps({'type': 'error', 'message': result_data})}\n\n"
+                # Send initial status
+                yield sse({'type': 'status', 'message': 'Starting analysis...', 'job_id': job.job_id})
+
+                # Stream the job's updates as they arrive
+                async for update in job.iter_updates():
+                    if await request.is_disconnected():
+                        logger.info(f"Client left the analysis stream of job {job.job_id}")
+                        return
+                    for frame in update_frames(update):
+                        yield frame
+
+                # Get final results
+                if job.error is not None:
+                    yield sse({'type': 'error', 'message': job.error})
                     return
-                else:
-                    results = result_data
-            except queue.Empty:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Analysis completed but no results received'})}\n\n"
-                return
-            
-            total_analysis_time = time.time() - analysis_start_time
-
-            # Convert results to CSV
-            df = pd.DataFrame.from_dict(results, orient='index').fillna(0).astype(int)
-            csv_bytes = df.to_csv().encode('utf-8')
-            csv_b64 = base64.b64encode(csv_bytes).decode('utf-8')
-
-            # Send final results
-            final_result = {
-                "type": "final_results",
-                "data": {
-                    "status": "ok",
-                    "results": results,
-                    "csv_b64": csv_b64,
-                    "analysis_metadata": {
-                        "total_analysis_time": total_analysis_time,
-                        "higher_level_count": len(higher_level_dict),
-                        "n_level_count": len(n_level_dict),
-                        "total_comparisons": len(higher_level_dict) * len(n_level_dict)
+                response_content = job.result
+
+                # Send final results
+                yield sse({
+                    "type": "final_results",
+                    "data": {
+                        "status": "ok",
+                        **{key: response_content[key] for key in ("results", "matrix") if key in response_content},
+                        "csv_b64": response_content["csv_b64"],
+                        "analysis_metadata": response_content["analysis_metadata"]
                     }
-                }
-            }
-
-            # Ensure proper JSON encoding for final results
-            try:
-                json_str = json.dumps(final_result, ensure_ascii=True)
-                yield f"data: {json_str}\n\n"
-            except Exception as json_error:
-                print(f"JSON encoding error for final results: {json_error}")
-                yield f"data: {json.dumps({'type': 'error', 'message': 'JSON encoding error for final results'})}\n\n"
+                })
+            finally:
+                # Runs on completion and when the server stops the stream after a disconnect
+                job_manager.release(job)
 
         return StreamingResponse(
             stream_analysis(),
-            media_type="text/plain",
+            media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-                "Content-Type": "text/event-stream",
+                "X-Accel-Buffering": "no"  # No proxy buffering of the events
             }
         )
         
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
+    except ValueError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=400)
     except Exception as e:
         # For streaming errors, we need to return a regular JSON response
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
-# New endpoint for subgraph analysis (simplified)
+
 @app.post("/api/analyze-subgraphs")
 async def analyze_subgraphs(request: Request):
     """
-    Simple subgraph containment analysis with timing information
+    Simple subgraph containment analysis with timing information.
+
+    result_format: 'nested' (default, "results" as nested dictionaries), 'matrix'
+    ("matrix": row and column label tables with CSR count arrays) or 'npz' (the
+    matrix as a binary .npz body, see ContainmentResult.from_bytes()).
     """
-    import sys
-    from pathlib import Path
-    
-    # Dynamically get the backend path relative to this file's location
-    current_path = Path(__file__).resolve()
-    project_root = current_path.parents[2]  # Go up to project root
-    sys.path.insert(0, str(project_root))
-    local_path = project_root / 'back_end'
-    sys.path.insert(0, str(local_path))
-
-    # Import project modules
-    import src.main as main
-    import src.all_linkages as linkages
-
-    
     try:
-        import pandas as pd
-        import base64
-        import time
-        
         data = await request.json()
-        higher_level_size = data.get("higher_level_size", 5)  # Default to pentamers
-        n_level_size = data.get("n_level_size", 4)  # Default to tetramers
-        higher_level_lysine_ids = set(data.get("higher_level_lysine_ids", ["K48", "K63"]))  # Default to K48/K63
-        n_level_lysine_ids = set(data.get("n_level_lysine_ids", ["K48", "K63"]))  # Default to K48/K63
 
-        # Load the data
-        higher_level_data = linkages.load_multimer_contexts(project_root, higher_level_size)
-        n_level_data = linkages.load_multimer_contexts(project_root, n_level_size)
+        # 'npz' runs the 'matrix' job and serialises its result
+        npz = data.get("result_format") == "npz"
+        if npz:
+            data = {**data, "result_format": "matrix"}
+
+        # Run the containment analysis as a job and wait for it; the job keeps
+        # running if the connection drops and its result is stored on disk
+        job = await get_job_manager().submit('analyze-subgraphs', data)
+        await job.wait()
+        if job.error is not None:
+            return JSONResponse(content={"status": "error", "message": job.error}, status_code=500)
+
+        if npz:
+            return Response(
+                content=ContainmentResult.from_json(job.result["matrix"]).to_bytes(),
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": f'attachment; filename="containment_{job.params["higher_level_size"]}_in_{job.params["n_level_size"]}.npz"'}
+            )
+        return JSONResponse(content=job.result)
+        
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
+    except ValueError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=400)
+    except Exception as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
-        # Filter by lysine types
-        higher_level_dict = linkages.get_multimer_edges_by_lysines(higher_level_data, higher_level_lysine_ids)
-        n_level_dict = linkages.get_multimer_edges_by_lysines(n_level_data, n_level_lysine_ids)
 
-        # Store timing information for response
-        timing_info = {}
-        
-        def progress_callback(progress_data):
-            """Callback to capture timing information"""
-            if progress_data.get("type") == "timing_analysis":
-                nonlocal timing_info
-                timing_info = {
-                    "completed_iterations": progress_data.get("completed_iterations"),
-                    "elapsed_time": progress_data.get("elapsed_time"),
-                    "avg_time_per_iteration": progress_data.get("avg_time_per_iteration"),
-                    "estimated_total_time": progress_data.get("estimated_total_time"),
-                    "estimated_remaining_time": progress_data.get("estimated_remaining_time"),
-                    "estimated_total_seconds": progress_data.get("estimated_total_seconds"),
-                    "estimated_remaining_seconds": progress_data.get("estimated_remaining_seconds")
-                }
-
-        # Run the analysis with progress callback
-        analysis_start_time = time.time()
-        results = linkages.analyze_subgraph_containment(higher_level_dict, n_level_dict, progress_callback)
-        total_analysis_time = time.time() - analysis_start_time
-
-        # Convert results to CSV bytes
-        df = pd.DataFrame.from_dict(results, orient='index').fillna(0).astype(int)
-        csv_bytes = df.to_csv().encode('utf-8')
-        csv_b64 = base64.b64encode(csv_bytes).decode('utf-8')
-
-        response_content = {
-            "status": "ok",
-            "results": results,
-            "csv_b64": csv_b64,
-            "analysis_metadata": {
-                "total_analysis_time": total_analysis_time,
-                "higher_level_count": len(higher_level_dict),
-                "n_level_count": len(n_level_dict),
-                "total_comparisons": len(higher_level_dict) * len(n_level_dict)
-            }
-        }
-        
-        # Add timing information if available
-        if timing_info:
-            response_content["timing_analysis"] = timing_info
+# =========================================
+# Analysis jobs: submit, poll or subscribe, fetch the result
+# =========================================
 
-        return JSONResponse(content=response_content)
-        
+@app.post("/api/jobs/{kind}")
+async def submit_analysis_job(kind: str, request: Request):
+    """
+    Start an analysis job (kinds: analysis_jobs.JOB_KINDS) and return its id.
+    Identical requests return the running job or the stored result.
+    """
+    try:
+        data = await request.json()
+        job = await get_job_manager().submit(kind, data)
+        return JSONResponse(content={"status": "ok", **job.summary()}, status_code=200 if job.done else 202)
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
+    except ValueError as e:
+        return JSONResponse(content={"status": "error", "message": str(e)}, status_code=400)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
 
+@app.get("/api/jobs/{job_id}")
+async def analysis_job_status(job_id: str):
+    """
+    Status and latest progress of a job.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown job: {job_id}"}, status_code=404)
+    return JSONResponse(content={"status": "ok", **job.summary()})
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def analysis_job_events(job_id: str, start: int = 0):
+    """
+    Server-sent progress_callback events of a job ('progress', 'timing_analysis',
+    'complete') from index start, then a final 'job_status' event.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown job: {job_id}"}, status_code=404)
+
+    async def stream_events():
+        async for event in job.iter_events(start):
+            yield f"data: {json.dumps(event, ensure_ascii=True)}\n\n"
+        yield f"data: {json.dumps({'type': 'job_status', **job.summary()}, ensure_ascii=True)}\n\n"
+
+    return StreamingResponse(stream_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def analysis_job_result(job_id: str):
+    """
+    Result of a finished job (the response of the synchronous endpoint); 409 while it runs.
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JSONResponse(content={"status": "error", "message": f"Unknown job: {job_id}"}, status_code=404)
+    if not job.done:
+        return JSONResponse(content={"status": "error", "message": f"Job {job_id} is {job.status}", "job_status": job.status}, status_code=409)
+    if job.error is not None:
+        return JSONResponse(content={"status": "error", "message": job.error, "job_status": job.status}, status_code=410 if job.status == 'cancelled' else 500)
+    return JSONResponse(content=job.result)
+
+
 @app.post("/api/reaction-path-statistics")
 async def reaction_path_statistics_endpoint(request: Request):
     """
@@ -687,75 +619,8 @@ async def reaction_path_statistics_endpoint(request: Request):
         multimer_size = data.get("multimer_size", 5)
         pathway_type = data.get("pathway_type", "all")
 
-        import sys
-        from pathlib import Path
-        import pandas as pd
-
-        # Dynamically get the backend path relative to this file's location
-        current_path = Path(__file__).resolve()
-        project_root = current_path.parents[2]  # Go up to project root
-        sys.path.insert(0, str(project_root))
-        local_path = project_root / 'back_end'
-        sys.path.insert(0, str(local_path))
-
-        # Import project modules (with error handling)
-        try:
-            import src.main as main
-            import src.plotting as plotting
-            import src.all_linkages as linkages
-            import src.data_cleaning as data_cleaning
-        except ImportError as e:
-            return JSONResponse(content={"status": "error", "message": f"Import error: {str(e)}"}, status_code=500)
-
-        if pathway_type == 'aboc':# Function to load filtered data
-            
-            def download_data_dict(multimer_size):
-                input_dir = project_root / 'back_end' / 'data' / 'filtered_reaction_database' / f'multimer_size_{multimer_size}'
-                combined_database = pd.read_csv(input_dir / 'combined_database.csv', index_col=0)
-                context_history = pd.read_csv(input_dir / 'context_history.csv', index_col=0)
-                donor_history = pd.read_csv(input_dir / 'donor_history.csv', index_col=0)
-                reaction_history = pd.read_csv(input_dir / 'reaction_history.csv', index_col=0)
-                ubiquitin_history = pd.read_csv(input_dir / 'ubiquitin_history.csv', index_col=0)
-                return {
-                'combined_database': combined_database,
-                'context_history': context_history,
-                'donor_history': donor_history,
-                'reaction_history': reaction_history,
-                'ubiquitin_history': ubiquitin_history
-            }
-
-            # Load the filtered data
-            data_dict = download_data_dict(multimer_size)
-            context_history = data_dict['context_history']
-            ubiquitin_history = data_dict['ubiquitin_history']
-        
-        elif pathway_type == 'all':
-            # Function to load all data (unfiltered)
-            def download_all_data_dict(multimer_size):
-                input_dir = project_root / 'back_end' / 'data' / 'reaction_database' / f'multimer_size_{multimer_size}'
-                context_history = pd.read_csv(input_dir / 'context_history.csv', index_col=0)
-                donor_history = pd.read_csv(input_dir / 'donor_history.csv', index_col=0)
-                reaction_history = pd.read_csv(input_dir / 'reaction_history.csv', index_col=0)
-                ubiquitin_history = pd.read_csv(input_dir / 'ubiquitin_history.csv', index_col=0)
-                return {
-                    'context_history': context_history,
-                    'donor_history': donor_history,
-                    'reaction_history': reaction_history,
-                    'ubiquitin_history': ubiquitin_history
-                }
-
-            # Load the all data
-            data_dict = download_all_data_dict(multimer_size)
-            context_history = data_dict['context_history']
-            ubiquitin_history = data_dict['ubiquitin_history']
-
-        # Load multimers JSON file
-        file_path = project_root / 'front_end' / 'src' / 'data' / f'multimer_id_to_json{multimer_size}.json'
-        with open(file_path, 'r') as f:
-            multimers = json.load(f)
-
-        # Call the reaction_path_statistics function
-        json_with_reaction_information = plotting.reaction_path_statistics(ubiquitin_history, context_history, multimers, project_root, multimer_size)
+        # Count the pathways on the process pool
+        json_with_reaction_information = await get_worker_pools().cpu.run(api_jobs.reaction_path_statistics_outputs, multimer_size, pathway_type)
         
         return JSONResponse(content={
             "status": "ok",
@@ -764,6 +629,8 @@ async def reaction_path_statistics_endpoint(request: Request):
             "message": f"Successfully analyzed reaction path statistics for {len(json_with_reaction_information)} multimers of size {multimer_size} ({'Aboc-saturated' if pathway_type == 'aboc' else 'all'} pathways)"
         })
         
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
 
@@ -773,26 +640,6 @@ async def reaction_path_statistics_endpoint(request: Request):
 @app.post("/api/submit_nomenclature_request")
 async def submit_nomenclature_request(request: Request):
 
-    import sys
-    from pathlib import Path
-    import pandas as pd
-    import copy
-    import json
-
-    # Dynamically get the backend path relative to this file's location
-    current_path = Path(__file__).resolve()
-    project_root = current_path.parents[2]  # Go up to project root
-    sys.path.insert(0, str(project_root))
-    local_path = project_root / 'back_end'
-    sys.path.insert(0, str(local_path))
-
-    # Import project modules
-    import src.utils.utils
-    import src.utils.logging_utils
-    import src.main as main
-    import src.plotting as plotting
-    import src.nomenclature as nomenclature
-    
     try:
         data = await request.json()
         ubxy_value = data.get("ubxy", None)
@@ -846,27 +693,10 @@ async def submit_nomenclature_request(request: Request):
             except Exception as e:
                 return JSONResponse(content={"status": "error", "message": f"Error determining multimer size from nomenclature: {str(e)}"}, status_code=400)
 
-        # Function to load JSON data
-        def download_jsons(multimer_size):
-            input_dir = project_root / 'back_end' / 'data' / 'all_jsons'
-            
-            # Load multimers JSON files
-            with open(input_dir / f'{multimer_size}_multimers_jsons.json', 'r') as f:
-                multimer_jsons = json.load(f)
-            
-            # Load contexts JSON files  
-            with open(input_dir / f'{multimer_size}_multimers_contexts.json', 'r') as f:
-                multimer_contexts = json.load(f)
-                
-            return {
-                'multimer_jsons': multimer_jsons,
-                'multimer_contexts': multimer_contexts
-            }
-
-        # Load the data
-        data_dict = download_jsons(multimer_size)
-        multimer_jsons = data_dict['multimer_jsons']
-        multimer_contexts = data_dict['multimer_contexts']
+        # Load the data from the shared registry (off the event loop)
+        registry = get_data_registry()
+        multimer_jsons = await get_worker_pools().io.run(registry.multimer_jsons, multimer_size)
+        multimer_contexts = await get_worker_pools().io.run(registry.multimer_contexts, multimer_size)
 
         # If it starts with 'A', convert from nomenclature format to UbX_Y format 
         if ubxy_value.startswith('A'):
@@ -878,15 +708,9 @@ async def submit_nomenclature_request(request: Request):
                 multimer_size = int(nomenclature.multimer_length_from_nomenclature(ubxy_value))
                 
                 parsed_edges = nomenclature.parse_compact_edges(ubxy_value)
-                output_ubiG_json = nomenclature.build_polyubiquitin_from_edges(parsed_edges)
 
-                # Find the key in multimers_dict that corresponds to output_ubiG_json
-                ubxy_value = None
-
-                for key, value in multimer_jsons.items():
-                    if str(value) == str(output_ubiG_json):
-                        multimer_number = key
-                        break
+                # Look the structure up by its canonical edge key
+                multimer_number = await get_worker_pools().io.run(registry.multimer_number_by_edges, multimer_size, parsed_edges)
 
                 if multimer_number is None:
                     return JSONResponse(content={"status": "error", "message": "Generated structure not found in multimers database"}, status_code=404)
@@ -963,5 +787,38 @@ async def submit_nomenclature_request(request: Request):
             "graph_w_preorder_nomenclature": graph_w_preorder_nomenclature,
             "chemical_all_node_nomenclature": chemical_all_node_nomenclature
             })
+    except PoolSaturatedError as e:
+        return pool_saturated_response(e)
     except Exception as e:
         return JSONResponse(content={"status": "error", "message": str(e)}, status_code=500)
+
+
+@app.get("/api/startup")
+async def startup_timings():
+    """
+    Import, matplotlib and data warm-up seconds of the API process and of a CPU worker.
+    """
+    cpu_worker_warmup = getattr(app.state, "cpu_worker_warmup", None)
+    if cpu_worker_warmup is None or not cpu_worker_warmup.done():
+        cpu_worker = {"status": "warming up"}
+    elif cpu_worker_warmup.exception() is not None:
+        cpu_worker = {"status": "error", "message": str(cpu_worker_warmup.exception())}
+    else:
+        cpu_worker = cpu_worker_warmup.result()
+    return JSONResponse(content={"status": "ok", "api": warmup.startup_report(), "cpu_worker": cpu_worker})
+
+
+@app.get("/api/artifact-cache")
+async def artifact_cache_stats():
+    """
+    Size, hit rate and spill counters of the submit-selection artifact cache.
+    """
+    return JSONResponse(content={"status": "ok", "cache": get_artifact_cache().stats()})
+
+
+@app.get("/api/worker-pools")
+async def worker_pools_stats():
+    """
+    Admission limits and queue-depth counters of the CPU and I/O worker pools.
+    """
+    return JSONResponse(content={"status": "ok", "pools": get_worker_pools().stats()})
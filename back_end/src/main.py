@@ -13,6 +13,13 @@ sys.path.insert(0, str(local_path))
 
 from src.utils.utils import *
 from src.utils.logging_utils import *
+from src.compact_ubiquitin import *
+
+# Use the single-pass engine in src/compact_ubiquitin.py for relabelling, building and
+# simulation; structures it cannot represent fall back to the nested dictionary traversal.
+# Default of the use_fast_path argument of iterate_through_ubiquitin(), ubiquitin_simulation()
+# and ubiquitin_building().
+USE_COMPACT_FAST_PATH = True
 
 def find_branching_site(sequence_id, FASTA_sequence):
     """
@@ -298,7 +305,7 @@ def process_branch(branch, working_dictionary, context):
 
     return branch, working_dictionary, context
 
-def iterate_through_ubiquitin(parent_dictionary):
+def iterate_through_ubiquitin(parent_dictionary, use_fast_path: bool | None = None):
     
     """
     Relabel ubiquitin chain numbers, process protein branching and validate input dictionary keys.
@@ -306,6 +313,7 @@ def iterate_through_ubiquitin(parent_dictionary):
 
     Args:
         parent_dictionary (dict or str): Ubiquitin structure as a dictionary or JSON string.
+        use_fast_path (bool, optional): Use the single-pass engine; defaults to USE_COMPACT_FAST_PATH.
 
     Returns:
         dict: Updated polyubiquitin dictionary/JSON with relabeled values.
@@ -329,6 +337,15 @@ def iterate_through_ubiquitin(parent_dictionary):
 
     # Ensure that the parent dictionary has all the valid keys 
     validate_protein_keys(parent_dictionary)
+
+    # Fast path: relabel and build the context in a single traversal
+    if use_fast_path is None:
+        use_fast_path = USE_COMPACT_FAST_PATH
+    if use_fast_path:
+        try:
+            return iterate_single_pass(parent_dictionary)
+        except CompactConversionError:
+            pass
     
     # Initialize context object to track global-like variables
     context = {
@@ -475,7 +492,8 @@ def K_residue_ubi_addition(working_dictionary, specific_ubi_num, ubiquitination_
 def ubiquitin_simulation(
         parent_dictionary: dict | str, 
         ubi_molecule_to_add: dict | str, 
-        type_of_reaction: str
+        type_of_reaction: str,
+        use_fast_path: bool | None = None
         ):
     """
     Simulates ubiquitin addition, deprotection, or branching reactions by recursively traversing the protein structure.
@@ -485,9 +503,12 @@ def ubiquitin_simulation(
         ubi_molecule_to_add (dict or str): Ubiquitin molecule to be added, in dictionary or JSON string form.
         type_of_reaction (str): Reaction type (e.g., 'SMAC_deprot', 'GLOBAL_deprot', 'ABOC_deprot', 'K48' or 'K63').
             (type of reaction (str): is either K48 or K63, enzyme is not defined here
+        use_fast_path (bool, optional): Use the single-pass engine; defaults to USE_COMPACT_FAST_PATH.
 
     Returns:
         dict: Updated dictionary representing the protein structure after the reaction.
+            If parent_dictionary is a UbiquitinNode the product is a UbiquitinNode that
+            shares every subtree the reaction did not modify with the input.
     """
 
     # Validate reaction type
@@ -495,11 +516,27 @@ def ubiquitin_simulation(
     if type_of_reaction not in valid_reactions:
         raise ValueError(f"Invalid type_of_reaction: {type_of_reaction}. Must be one of {valid_reactions}")
 
+    # Structurally shared mode: UbiquitinNode in, UbiquitinNode out
+    if isinstance(parent_dictionary, UbiquitinNode):
+        if ubi_molecule_to_add not in ('SMAC', 'ABOC', ''):
+            ubi_molecule_to_add = as_ubiquitin_node(ubi_molecule_to_add)
+        output_node = persistent_simulation(parent_dictionary, ubi_molecule_to_add, type_of_reaction)
+        return output_node, node_context(output_node)
+
     # Normalize input to dicts
     parent_dictionary = convert_json_to_dict(parent_dictionary)
     if ubi_molecule_to_add not in ('SMAC', 'ABOC', ''):
         ubi_molecule_to_add = convert_json_to_dict(ubi_molecule_to_add)
 
+    # Fast path: apply the reaction, relabel and build the context in a single traversal
+    if use_fast_path is None:
+        use_fast_path = USE_COMPACT_FAST_PATH
+    if use_fast_path:
+        try:
+            return simulation_single_pass(parent_dictionary, ubi_molecule_to_add, type_of_reaction)
+        except CompactConversionError:
+            pass
+
     # Initialize context for chain numbering and length tracking
     context = {
         "chain_number_list": [1],
@@ -510,10 +547,8 @@ def ubiquitin_simulation(
         parent_dictionary, ubi_molecule_to_add, type_of_reaction, context
     )
 
-    output_dictionary, output_context = iterate_through_ubiquitin(adapted_dictionary)
-
-    # Repeat to get the numbers right
-    output_dictionary, output_context = iterate_through_ubiquitin(output_dictionary)
+    # iterate_through_ubiquitin() relabels in pre-order, so one pass gets the numbers right
+    output_dictionary, output_context = iterate_through_ubiquitin(adapted_dictionary, use_fast_path)
 
     return output_dictionary, output_context
 
@@ -639,7 +674,8 @@ def ubiquitin_building(
     parent_dictionary: dict | str,
     ubi_molecule_to_add: dict | str,
     ubiquitin_number: int,
-    lysine_residue: str
+    lysine_residue: str,
+    use_fast_path: bool | None = None
 ) -> dict:
     """
     Entry point for building a ubiquitin chain by attaching a molecule or protecting group.
@@ -649,10 +685,20 @@ def ubiquitin_building(
         ubi_molecule_to_add (dict or str): Ubiquitin or protecting group (SMAC/ABOC).
         ubiquitin_number (int): The chain number to which the molecule is added.
         lysine_residue (str): The specific lysine site for conjugation.
+        use_fast_path (bool, optional): Use the single-pass engine; defaults to USE_COMPACT_FAST_PATH.
 
     Returns:
         dict: The updated protein dictionary with changes applied.
+            If parent_dictionary is a UbiquitinNode the product is a UbiquitinNode that
+            only copies the nodes between the root and the modified lysine.
     """
+    # Structurally shared mode: UbiquitinNode in, UbiquitinNode out
+    if isinstance(parent_dictionary, UbiquitinNode):
+        output_node = persistent_building(
+            parent_dictionary, as_ubiquitin_molecule(ubi_molecule_to_add), ubiquitin_number, lysine_residue
+        )
+        return output_node, node_context(output_node)
+
     # Initialize context for chain numbering and length tracking
     context = {
         "chain_number_list": [1],
@@ -671,6 +717,15 @@ def ubiquitin_building(
     if ubi_molecule_to_add not in ('SMAC', 'ABOC'):
         if not isinstance(ubi_molecule_to_add, dict):
             raise TypeError("ubi_molecule_to_add must be a dictionary or 'SMAC'/'ABOC' string")
+
+    # Fast path: attach the molecule, relabel and build the context in a single traversal
+    if use_fast_path is None:
+        use_fast_path = USE_COMPACT_FAST_PATH
+    if use_fast_path:
+        try:
+            return building_single_pass(parent_dictionary, ubi_molecule_to_add, ubiquitin_number, lysine_residue)
+        except CompactConversionError:
+            pass
         
     def inner_wrapper_ubiquitin_building(
         input_dictionary: dict | str,
@@ -741,7 +796,7 @@ def ubiquitin_building(
         parent_dictionary, ubi_molecule_to_add, ubiquitin_number, lysine_residue, context
     )
     
-    output_dictionary, output_context = iterate_through_ubiquitin(output_dictionary)
+    output_dictionary, output_context = iterate_through_ubiquitin(output_dictionary, use_fast_path)
 
     return output_dictionary, output_context
 
@@ -786,9 +841,20 @@ def handle_lysine_modification(
         )
     return bra, working_dictionary
 
-def initialize_multimer_dicts(initial_acceptor):
+def as_ubiquitin_molecule(ubi_molecule_to_add):
+    """
+    Converts a donor for the structurally shared mode; protecting groups are passed through.
+    """
+    if ubi_molecule_to_add in ('SMAC', 'ABOC'):
+        return ubi_molecule_to_add
+    if not isinstance(ubi_molecule_to_add, (dict, str, UbiquitinNode)):
+        raise TypeError("ubi_molecule_to_add must be a dictionary or 'SMAC'/'ABOC' string")
+    return as_ubiquitin_node(ubi_molecule_to_add)
+
+def initialize_multimer_dicts(initial_acceptor, structural_sharing=False):
     """
     Set up the initial multimer and context dictionaries.
+    With structural_sharing the multimers are stored as UbiquitinNode trees.
     """
     multimer_dicts = {
         'multimers': [],
@@ -797,6 +863,8 @@ def initialize_multimer_dicts(initial_acceptor):
 
     # Initialize acceptor and context
     acceptor, context = iterate_through_ubiquitin(initial_acceptor)
+    if structural_sharing:
+        acceptor = as_ubiquitin_node(acceptor)
 
     # Add to the dictionary
     multimer_dicts['multimers'].append(acceptor)
@@ -805,44 +873,75 @@ def initialize_multimer_dicts(initial_acceptor):
     return multimer_dicts
 
 
-def defining_json_multimers(multimer_dicts, unprotected_ubi):
+def defining_json_multimers(multimer_dicts, unprotected_ubi, structural_sharing=False, deduplicate=False):
     """
     Expands a list of multimers by conjugating new ubiquitins
     at all free lysines.
+
+    ubiquitin_building() never mutates its inputs, so the multimers and the donor are
+    not copied. With structural_sharing the new multimers are UbiquitinNode trees that
+    share all unmodified subtrees (including the donor) with their parents; use
+    materialize_multimer_dicts() to turn them back into dictionaries.
+
+    With deduplicate a multimer (and its context) is only kept the first time its
+    topology_key() is seen, giving the same result as delete_duplicate_multimers()
+    without holding the duplicates in memory.
     """
     multimers = multimer_dicts['multimers']
     contexts = multimer_dicts['contexts']
 
+    if structural_sharing:
+        multimers = [as_ubiquitin_node(multimer) for multimer in multimers]
+        unprotected_ubi = as_ubiquitin_node(unprotected_ubi)
+
     new_multimer_dicts = {
         'multimers': [],
         'contexts': []
     }
+    seen = set()
 
     # Iterate through each multimer and its context
     for multimer, context in zip(multimers, contexts):
         free_lysines = context['free_lysines']
 
         for free_lysine in free_lysines:
-            # Deep copy the multimer for safe modification
-            working_multimer = copy.deepcopy(multimer)
-
             # Build new ubiquitin at the given site
             working_multimer, working_context = ubiquitin_building(
-                working_multimer,
-                copy.deepcopy(unprotected_ubi),
+                multimer,
+                unprotected_ubi,
                 free_lysine[0],
                 free_lysine[1]
             )
 
+            # Discard duplicates as they are generated
+            if deduplicate:
+                marker = duplicate_marker(working_multimer)
+                if marker in seen:
+                    continue
+                seen.add(marker)
+
             new_multimer_dicts['multimers'].append(working_multimer)
             new_multimer_dicts['contexts'].append(working_context)
 
     return new_multimer_dicts
 
 
+def materialize_multimer_dicts(multimer_dicts):
+    """
+    Converts UbiquitinNode multimers (structural_sharing mode) back into ubiquitin dictionaries.
+    """
+    multimer_dicts['multimers'] = [
+        node_to_dict(multimer) if isinstance(multimer, UbiquitinNode) else multimer
+        for multimer in multimer_dicts['multimers']
+    ]
+    return multimer_dicts
+
+
 def delete_duplicate_multimers(my_dict):
     """
     Removes duplicate dictionaries in each list of a given dictionary.
+    Ubiquitin structures are compared by their canonical topology_key(), everything
+    else by its sorted JSON serialisation (see duplicate_marker()).
     """
     for key in my_dict:
         my_list = my_dict[key]
@@ -850,7 +949,7 @@ def delete_duplicate_multimers(my_dict):
         seen = set()
 
         for d in my_list:
-            marker = json.dumps(d, sort_keys=True)
+            marker = duplicate_marker(d)
             if marker not in seen:
                 seen.add(marker)
                 unique.append(d)
@@ -860,3 +959,54 @@ def delete_duplicate_multimers(my_dict):
     return my_dict
 
 
+def compare_fast_path_with_reference(acceptor_list, donor_list, largest_multimer_size=4):
+    """
+    Regression check for the single-pass engine: every reaction reachable from the
+    acceptors is run with use_fast_path=True and use_fast_path=False and the outputs compared.
+
+    Args:
+        acceptor_list (list): Starting acceptors (dictionaries or JSON strings).
+        donor_list (list): Donors used for K48 and K63 reactions.
+        largest_multimer_size (int): Stop expanding once products reach this size.
+
+    Returns:
+        list: One message per mismatching call; empty if the engines agree.
+    """
+    def run_both(function, *args):
+        outputs = []
+        for use_fast_path in (True, False):
+            try:
+                outputs.append(function(*copy.deepcopy(args), use_fast_path=use_fast_path))
+            except Exception as e:
+                outputs.append((type(e).__name__, str(e)))
+        return outputs
+
+    mismatches = []
+    species = [iterate_through_ubiquitin(acceptor)[0] for acceptor in acceptor_list]
+    seen = {json.dumps(ubiquitin, sort_keys=True) for ubiquitin in species}
+    while species:
+        next_species = []
+        for ubiquitin in species:
+            reactions = [(donor, reaction) for donor in donor_list for reaction in ('K48', 'K63')]
+            reactions += [('', reaction) for reaction in ('SMAC_deprot', 'ABOC_deprot', 'GLOBAL_deprot', 'FAKE_deprot')]
+            for donor, reaction in reactions:
+                fast_output, reference_output = run_both(ubiquitin_simulation, ubiquitin, donor, reaction)
+                if str(fast_output) != str(reference_output):
+                    mismatches.append(f"ubiquitin_simulation({reaction}) differs for {ubiquitin}")
+                    continue
+                product, context = fast_output if isinstance(fast_output[1], dict) else (None, None)
+                if product is None or context['max_chain_number'] >= largest_multimer_size:
+                    continue
+                marker = json.dumps(product, sort_keys=True)
+                if marker not in seen:
+                    seen.add(marker)
+                    next_species.append(product)
+
+            for free_lysine in iterate_through_ubiquitin(ubiquitin)[1]['free_lysines']:
+                for molecule in ('SMAC', 'ABOC', donor_list[0]):
+                    fast_output, reference_output = run_both(ubiquitin_building, ubiquitin, molecule, *free_lysine)
+                    if str(fast_output) != str(reference_output):
+                        mismatches.append(f"ubiquitin_building({free_lysine}) differs for {ubiquitin}")
+        species = next_species
+
+    return mismatches
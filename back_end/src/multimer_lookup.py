@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+from src.compact_ubiquitin import SITE_NAMES
+
+"""
+MULTIMER LOOKUP INDEXES
+=======================
+
+Hash indexes replacing the linear scans of the API endpoints:
+
+    canonical edge key -> multimer id       (nomenclature such as A63B-B48C -> Ub4_3)
+    multimer id        -> simulation indexes
+    final_multimer     -> simulation indexes
+
+The canonical edge key is the edge list relabelled the way iterate_through_ubiquitin()
+numbers chains (pre-order, sites in K63, K48, K33, K29, K27, K11, K6, M1 order),
+so a structure is found from its edges without building and formatting its JSON.
+The indexes are built once per file and cached by data_registry.DataRegistry.
+"""
+
+_SITE_ORDER = {site: position for position, site in enumerate(SITE_NAMES)}
+
+
+def canonical_edge_key(edges: list) -> tuple:
+    """
+    Canonical key of a tree given as [[parent, 'Kxx', child], ...].
+
+    Args:
+        edges (list): Conjugations with any chain numbering.
+
+    Returns:
+        tuple: ((parent, site, child), ...) in pre-order chain numbering.
+
+    Raises:
+        ValueError: If the edges do not form a single tree or use an unknown site.
+    """
+    children = {}
+    child_nodes = set()
+    nodes = set()
+    for edge in edges:
+        parent, site, child = edge
+        parent, child = int(parent), int(child)
+        if site not in _SITE_ORDER:
+            raise ValueError(f"Unknown lysine site: {site!r}")
+        if child in child_nodes:
+            raise ValueError(f"Ubiquitin {child} is conjugated more than once")
+        sites = children.setdefault(parent, {})
+        if site in sites:
+            raise ValueError(f"Site {site} of ubiquitin {parent} is conjugated more than once")
+        sites[site] = child
+        child_nodes.add(child)
+        nodes.update((parent, child))
+
+    if not nodes:
+        return ()
+    roots = nodes - child_nodes
+    if len(roots) != 1:
+        raise ValueError(f"Edges do not form a single tree (roots: {sorted(roots)})")
+
+    # Pre-order relabelling with the sites visited in SITE_NAMES order
+    labels = {}
+    key = []
+    stack = [roots.pop()]
+    while stack:
+        node = stack.pop()
+        labels[node] = len(labels) + 1
+        ordered = sorted(children.get(node, {}).items(), key=lambda item: _SITE_ORDER[item[0]])
+        for site, child in ordered:
+            key.append((node, site, child))
+        stack.extend(child for _, child in reversed(ordered))
+    if len(labels) != len(nodes):
+        raise ValueError("Edges contain a cycle")
+    return tuple(sorted((labels[parent], site, labels[child]) for parent, site, child in key))
+
+
+def build_edge_key_index(edge_lists: dict) -> dict:
+    """
+    Map canonical edge keys to ids.
+
+    Args:
+        edge_lists (dict): id -> conjugated_lysines edge list.
+
+    Returns:
+        dict: canonical_edge_key -> id (the first id wins for duplicates).
+    """
+    index = {}
+    for key, edges in edge_lists.items():
+        index.setdefault(canonical_edge_key(edges), key)
+    return index
+
+
+def build_value_index(table, key_column: str, value_column: str = 'index') -> dict:
+    """
+    Map every value of key_column to the unique values of value_column, in row order.
+
+    Equivalent to table.loc[table[key_column] == key, value_column].dropna().unique()
+    for every key at once.
+
+    Args:
+        table (pd.DataFrame): Table to index.
+        key_column (str): Column to look up by.
+        value_column (str): Column to return.
+
+    Returns:
+        dict: key -> list of int values.
+    """
+    subset = table[[key_column, value_column]].dropna()
+    index = {}
+    for key, value in zip(subset[key_column].tolist(), subset[value_column].tolist()):
+        # Dictionaries keep insertion order, so the keys are the unique values in row order
+        index.setdefault(key, {})[int(value)] = None
+    return {key: list(values) for key, values in index.items()}
@@ -116,6 +116,12 @@ SCIENTIFIC APPLICATIONS:
 
 import re
 
+# Nomenclature patterns, compiled once at import
+_COMPACT_EDGE_PATTERN = re.compile(r'^([A-Z])(\d+)([A-Z])$')
+_COMPACT_PAIR_PATTERN = re.compile(r'([A-Z])\d+([A-Z])')
+_TRAILING_NUMBER_PATTERN = re.compile(r"(\d+)$")
+_LEVEL_NOTATION_PATTERN = re.compile(r"^([a-zA-Z])('?)(\d+)$")
+
 # Fixed, canonical mapping
 LETTER_TO_LYS = {
     'A': 'K63',
@@ -172,9 +178,8 @@ def parse_compact_edges(compact):
         return ord(letter.upper()) - ord('A') + 1
 
     edges = []
-    pat = re.compile(r'^([A-Z])(\d+)([A-Z])$')
     for tok in tokens:
-        m = pat.match(tok)
+        m = _COMPACT_EDGE_PATTERN.match(tok)
         if not m:
             raise ValueError(f"Invalid compact edge token: {tok!r} (expected like 'A63B')")
         src_letter, lysine_num, dst_letter = m.groups()
@@ -315,7 +320,7 @@ def multimer_length_from_nomenclature(compact: str) -> int:
     Accepts the A63B format (Letter-LysineNumber-Letter), ignores whitespace.
     """
     # Find all "Letter LysineNumber Letter" patterns, e.g. A63B, B48C, etc.
-    pairs = re.findall(r'([A-Z])\d+([A-Z])', compact)
+    pairs = _COMPACT_PAIR_PATTERN.findall(compact)
     nodes = set()
     
     def letter_to_number(letter):
@@ -536,8 +541,7 @@ def conjugated_lysines_to_chemical_all_node_nomenclature(conjugated_lysines):
                 parent_notation = nomenclature_map.get(parent, "")
                 
                 # Extract parent_number from notation
-                import re
-                match = re.search(r"(\d+)$", parent_notation)
+                match = _TRAILING_NUMBER_PATTERN.search(parent_notation)
                 parent_number = int(match.group(1)) if match else 1
                 
                 # Determine parent_letter_size based on parent's notation type
@@ -580,8 +584,7 @@ def conjugated_lysines_to_chemical_all_node_nomenclature(conjugated_lysines):
             notation = nomenclature_map[node]
             
             # Parse notation to extract level letter and position number for sorting
-            import re
-            match = re.match(r"^([a-zA-Z])('?)(\d+)$", notation)
+            match = _LEVEL_NOTATION_PATTERN.match(notation)
             if match:
                 level_letter, prime, position_str = match.groups()
                 level_num = ord(level_letter.upper()) - ord('A')
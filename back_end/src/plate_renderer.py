@@ -0,0 +1,299 @@
+import io
+import string
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from matplotlib import font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+"""
+PLATE RENDERER
+==============
+
+Server-side rendering of the 96-well plate maps of /api/submit-selection with the
+object-oriented Figure / Agg API (no pyplot figure numbers, nothing to close):
+
+    PlateTemplate               plate map (plot_96wells layout)
+    DeprotectionPlateTemplate   deprotection cycles (plot_deprotection_cycles layout)
+
+A template builds its figure once - axes, 96 wells, row/column labels and the
+well-text artists - and render() only updates the well colours, texts and title
+before writing PNG or SVG bytes. Templates are not thread-safe; plate_template()
+keeps one per thread and kind, so process workers and io threads can render
+concurrently.
+"""
+
+PLATE_ROWS = 8
+PLATE_COLUMNS = 12
+IMAGE_FORMATS = ('png', 'svg')
+
+_WELL_SIZE = 2000
+_TICK_FONT_SIZE = 15
+_WELL_FONT_SIZE = 23
+
+
+def _interpolate_hex(start_hex: str, end_hex: str, ratio: float) -> str:
+    start_rgb = tuple(int(start_hex[j:j+2], 16) for j in (1, 3, 5))
+    end_rgb = tuple(int(end_hex[j:j+2], 16) for j in (1, 3, 5))
+    return '#{:02x}{:02x}{:02x}'.format(*(int(start_rgb[k] + ratio * (end_rgb[k] - start_rgb[k])) for k in range(3)))
+
+
+def plate_colormap(colorbar_type: str):
+    """
+    Fixed colour mapping of a plate type, so a value always gets the same colour
+    regardless of the data range.
+
+    Args:
+        colorbar_type (str): 'enzymes_donors' (0-12), 'deprots' (0-2) or 'acceptors' (0-20).
+
+    Returns:
+        tuple: (cmap, vmin, vmax), or None for any other colorbar_type.
+    """
+    if colorbar_type == 'enzymes_donors':
+        # 0 = white, 1 = #EBE7F1, 2-11 interpolated, 12 = #CD3878
+        color_array = ['white', '#EBE7F1']
+        color_array += [_interpolate_hex('#EBE7F1', '#CD3878', (i - 1) / 11) for i in range(2, 12)]
+        color_array.append('#CD3878')
+        return ListedColormap(color_array), 0, 12
+    if colorbar_type == 'deprots':
+        # 0 = white, 1 = mustard yellow, 2 = light beige
+        return ListedColormap(['white', '#DAA520', '#F5F5DC']), 0, 2
+    if colorbar_type == 'acceptors':
+        # 0-8 = white, 9 = #BED4E8, 10-19 interpolated, 20 = #447BB6
+        color_array = ['white'] * 9 + ['#BED4E8']
+        color_array += [_interpolate_hex('#BED4E8', '#447BB6', (i - 9) / 11) for i in range(10, 20)]
+        color_array.append('#447BB6')
+        return ListedColormap(color_array), 0, 20
+    return None
+
+
+def _check_plate_data(cdata):
+    if not isinstance(cdata, pd.DataFrame):
+        raise ValueError('Wrong data type')
+    if cdata.shape != (PLATE_ROWS, PLATE_COLUMNS):
+        raise ValueError('Wrong data shape')
+
+
+def _text_x(x, value) -> float:
+    # Two-digit values are shifted left so they stay centred in the well
+    return x - 0.175 if value < 10 else x - 0.275
+
+
+class PlateTemplate:
+    """
+    Reusable 96-well plate figure; only the well colours, texts and title change per render.
+
+    Args:
+        colorbar_type (str): Colour mapping of the wells (see plate_colormap).
+    """
+
+    def __init__(self, colorbar_type: str = 'PuRd'):
+        self.colorbar_type = colorbar_type
+        # Wells in row-major order, like cdata.values.flatten()
+        self.x = np.array(list(range(1, PLATE_COLUMNS + 1)) * PLATE_ROWS)
+        self.y = np.array(sorted(list(range(1, PLATE_ROWS + 1)) * PLATE_COLUMNS))
+        self.ticks_font = font_manager.FontProperties(style='normal', size=_TICK_FONT_SIZE, weight='normal')
+        self.figure = Figure(figsize=(15, 7))
+        FigureCanvasAgg(self.figure)
+        self.title = self.figure.suptitle('', fontsize=16)
+        self.ax = self.figure.add_subplot(1, 1, 1)
+
+        colormap = plate_colormap(colorbar_type)
+        if colormap is not None:
+            cmap, vmin, vmax = colormap
+            self.mesh = self.ax.scatter(
+                self.x, self.y, s=[_WELL_SIZE] * len(self.x), c=np.zeros(len(self.x)),
+                cmap=cmap, vmin=vmin, vmax=vmax, edgecolor=['black'] * len(self.x), linewidths=1.5
+            )
+        else:
+            self.mesh = self.ax.scatter(
+                self.x, self.y, s=[_WELL_SIZE] * len(self.x), c=np.zeros(len(self.x)),
+                cmap=colorbar_type, edgecolor=['black'] * len(self.x), linewidths=1.5
+            )
+
+        self.ax.grid(False)
+        self.ax.set_xticks(range(1, PLATE_COLUMNS + 1))
+        self.ax.xaxis.tick_top()
+        self.ax.set_yticks(range(1, PLATE_ROWS + 1))
+        self.ax.set_yticklabels(string.ascii_uppercase[0:PLATE_ROWS])
+        self.ax.set_ylim((8.5, 0.48))
+        self.ax.set_aspect(1)
+        self.ax.tick_params(axis='both', which='both', length=0)
+        for spine in self.ax.spines.values():
+            spine.set_visible(False)
+        self._apply_tick_font()
+
+        self.well_texts = [self.ax.text(x - 0.175, y + 0.15, '', fontsize=_WELL_FONT_SIZE) for x, y in zip(self.x, self.y)]
+
+    def __repr__(self):
+        return f"{type(self).__name__}(colorbar_type={self.colorbar_type!r})"
+
+    def _apply_tick_font(self):
+        for label in self.ax.get_xticklabels():
+            label.set_fontproperties(self.ticks_font)
+        for label in self.ax.get_yticklabels():
+            label.set_fontproperties(self.ticks_font)
+
+    def update(self, cdata: pd.DataFrame, figure_name: str):
+        """Set the title, well colours and well texts from an 8x12 DataFrame."""
+        _check_plate_data(cdata)
+        values = cdata.values.flatten()
+        self.title.set_text(figure_name)
+        self.mesh.set_array(np.asarray(values, dtype=float))
+        if plate_colormap(self.colorbar_type) is None:
+            self.mesh.set_clim(values.min(), values.max())
+        for text, x, value in zip(self.well_texts, self.x, values):
+            text.set_text('' if value == 0 else str(value))
+            text.set_x(_text_x(x, value))
+
+    def render(self, cdata: pd.DataFrame, figure_name: str, image_format: str = 'png') -> bytes:
+        """
+        Render the plate for cdata.
+
+        Args:
+            cdata (pd.DataFrame): 8x12 well values.
+            figure_name (str): Title of the figure.
+            image_format (str): 'png' or 'svg'.
+
+        Returns:
+            bytes: The encoded image.
+        """
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format: {image_format!r} (expected one of {IMAGE_FORMATS})")
+        self.update(cdata, figure_name)
+        buf = io.BytesIO()
+        self.figure.savefig(buf, format=image_format, bbox_inches='tight')
+        return buf.getvalue()
+
+
+class DeprotectionPlateTemplate(PlateTemplate):
+    """
+    Deprotection-cycle plate: cycles of two columns separated by an empty column,
+    with row labels in front of every active cycle after the first.
+    """
+
+    # Start columns of the cycles on the drawn plate (columns 3, 6, 9, 12 separate them)
+    CYCLE_POSITIONS = (1, 4, 7, 10)
+
+    def __init__(self, colorbar_type: str = 'deprots'):
+        super().__init__(colorbar_type)
+        # Wells in column-major order, like plot_deprotection_cycles
+        self.x = np.array([col for col in range(1, PLATE_COLUMNS + 1) for _ in range(PLATE_ROWS)])
+        self.y = np.array([row for _ in range(1, PLATE_COLUMNS + 1) for row in range(1, PLATE_ROWS + 1)])
+        self.mesh.set_offsets(np.column_stack([self.x, self.y]))
+        for text, x, y in zip(self.well_texts, self.x, self.y):
+            text.set_position((x - 0.175, y + 0.15))
+        self.row_labels = {
+            cycle_pos: [
+                self.ax.text(cycle_pos - 0.71, row + 0.055, string.ascii_uppercase[row - 1], fontsize=15,
+                             fontweight='normal', ha='center', va='center', color='black', visible=False)
+                for row in range(1, PLATE_ROWS + 1)
+            ]
+            for cycle_pos in self.CYCLE_POSITIONS[1:]
+        }
+
+    @staticmethod
+    def active_cycles(cdata: pd.DataFrame) -> list:
+        """1-indexed cycles (pairs of data columns) holding non-zero values."""
+        values = cdata.values
+        return [cycle + 1 for cycle in range(PLATE_COLUMNS // 2) if values[:, cycle * 2:cycle * 2 + 2].sum() > 0]
+
+    @staticmethod
+    def figure_name(active_cycles: list, default: str = 'Deprotection Cycles') -> str:
+        if len(active_cycles) == 1:
+            return f"Deprotection Cycles ({active_cycles[0]})"
+        if len(active_cycles) > 1:
+            return f"Deprotection Cycles ({active_cycles[0]}-{active_cycles[-1]})"
+        return default
+
+    def update(self, cdata: pd.DataFrame, figure_name: str):
+        if cdata is None:
+            raise ValueError("cdata is required for deprotection cycle plotting")
+        _check_plate_data(cdata)
+        values = cdata.values
+        active = set(self.active_cycles(cdata))
+
+        colors, edge_colors, text_colors = [], [], []
+        for col, row in zip(self.x, self.y):
+            cycle_group = (col - 1) // 3
+            shown = col % 3 != 0 and (cycle_group + 1) in active
+            if shown:
+                colors.append(values[row - 1, cycle_group * 2 + (col - 1) % 3])
+            else:
+                colors.append(0)
+            edge_colors.append('black' if shown else 'white')  # Separators and empty cycles are invisible
+            text_colors.append('black' if shown else 'white')
+
+        x_labels = []
+        for col in range(1, PLATE_COLUMNS + 1):
+            shown = col % 3 != 0 and ((col - 1) // 3 + 1) in active
+            x_labels.append(str((col - 1) % 3 + 1) if shown else '')
+
+        self.title.set_text(self.figure_name(sorted(active), figure_name))
+        self.mesh.set_array(np.asarray(colors, dtype=float))
+        self.mesh.set_edgecolors(edge_colors)
+        self.ax.set_xticklabels(x_labels)
+        self._apply_tick_font()
+        for text, x, value, color in zip(self.well_texts, self.x, colors, text_colors):
+            text.set_text('' if value == 0 else str(value))
+            text.set_x(_text_x(x, value))
+            text.set_color(color)
+        for i, cycle_pos in enumerate(self.CYCLE_POSITIONS[1:], start=1):
+            for label in self.row_labels[cycle_pos]:
+                label.set_visible((i + 1) in active)
+
+
+# Template kind -> (class, colorbar_type)
+PLATE_TEMPLATES = {
+    'enzymes_donors': (PlateTemplate, 'enzymes_donors'),
+    'deprots': (DeprotectionPlateTemplate, 'deprots'),
+    'acceptors': (PlateTemplate, 'acceptors')
+}
+
+_templates = threading.local()
+
+
+def plate_template(kind: str) -> PlateTemplate:
+    """
+    Template of a plate kind for the calling thread, built on first use.
+
+    Args:
+        kind (str): A key of PLATE_TEMPLATES.
+    """
+    templates = getattr(_templates, 'templates', None)
+    if templates is None:
+        templates = _templates.templates = {}
+    template = templates.get(kind)
+    if template is None:
+        if kind not in PLATE_TEMPLATES:
+            raise ValueError(f"Unknown plate template: {kind!r}")
+        template_class, colorbar_type = PLATE_TEMPLATES[kind]
+        template = templates[kind] = template_class(colorbar_type)
+    return template
+
+
+def build_plate_templates() -> list:
+    """Build every template for the calling thread (run when a worker starts)."""
+    return [plate_template(kind) for kind in PLATE_TEMPLATES]
+
+
+def render_plate(kind: str, cdata: pd.DataFrame, figure_name: str, image_format: str = 'png') -> bytes:
+    """
+    Render a plate map with the template of kind.
+
+    Returns:
+        bytes: PNG or SVG bytes.
+    """
+    return plate_template(kind).render(cdata, figure_name, image_format)
@@ -8,6 +8,7 @@ import numpy as np
 from pathlib import Path
 import pandas as pd
 import ast 
+import re
 #import openpyxl
 
 import matplotlib.pyplot as plt
@@ -21,6 +22,10 @@ sys.path.insert(0, str(project_root))
 local_path = project_root / 'back_end'
 sys.path.insert(0, str(local_path))
 
+from src.plate_renderer import plate_colormap
+from src.containment_matrices import ContainmentResult
+from src.reaction_database import CONTEXT_NAMES_TABLE, context_names_table
+
 def plot_96wells(figure=1, figure_name = 'Test',colorbar_type= 'PuRd', cdata=None, sdata=None, bdata=None, bcolors=None, bmeans=None, **kwargs):
     # from https://github.com/jaumebonet/RosettaSilentToolbox/blob/master/rstoolbox/plot/experimental.py
     """Plot data of a 96 well plate into an equivalent-shaped plot.
@@ -100,72 +105,10 @@ def plot_96wells(figure=1, figure_name = 'Test',colorbar_type= 'PuRd', cdata=Non
     kwargs.setdefault('edgecolor', ['black', ] * len(kwargs['y']))
     kwargs.setdefault('linewidths', 1.5)
     
-    # Create custom colormap for PuRd with fixed color mapping
-    if colorbar_type == 'enzymes_donors':
-        # Define colors: 0 = white, 1 = #EBE7F1, 12 = #CD3878 or #9B214A
-        colors = ['white', '#EBE7F1', '#CD3878']
-        n_bins = 13  # 0 to 12
-        # Create color array with interpolation between the defined colors
-        color_array = []
-        for i in range(n_bins):
-            if i == 0:
-                color_array.append(colors[0])  # white for 0
-            elif i == 1:
-                color_array.append(colors[1])  # #EBE7F1 for 1
-            elif i == 12:
-                color_array.append(colors[2])  # #9B214A for 12
-            else:
-                # Interpolate between #EBE7F1 and #9B214A for values 2-11
-                ratio = (i - 1) / 11  # normalize to 0-1 for interpolation
-                # Convert hex to RGB for interpolation
-                color1_rgb = tuple(int(colors[1][j:j+2], 16) for j in (1, 3, 5))
-                color2_rgb = tuple(int(colors[2][j:j+2], 16) for j in (1, 3, 5))
-                # Interpolate
-                interp_rgb = tuple(int(color1_rgb[k] + ratio * (color2_rgb[k] - color1_rgb[k])) for k in range(3))
-                # Convert back to hex
-                interp_hex = '#{:02x}{:02x}{:02x}'.format(*interp_rgb)
-                color_array.append(interp_hex)
-        
-        custom_cmap = ListedColormap(color_array)
-        # CRITICAL: Always set vmin=0 and vmax=12 to ensure consistent color mapping
-        # This means value 2 will always map to the same color regardless of data range
-        kwargs['cmap'] = custom_cmap
-        kwargs['vmin'] = 0
-        kwargs['vmax'] = 12
-    elif colorbar_type == 'deprots':
-        # Define colors: 0 = white, 1 = mustard yellow, 2 = light beige
-        colors = ['white', '#DAA520', '#F5F5DC']  # white, mustard yellow, light beige
-        custom_cmap = ListedColormap(colors)
-        kwargs['cmap'] = custom_cmap
-        kwargs['vmin'] = 0
-        kwargs['vmax'] = 2
-    elif colorbar_type == 'acceptors':
-        # Define colors: 0 = white, 9 = #BED4E8, 20 = #447BB6
-        # Create color array with interpolation between the defined colors
-        color_array = ['white']  # Start with white for 0
-        # Add intermediate colors from 1-8 (all white since we want 0 to be white)
-        for i in range(1, 9):
-            color_array.append('white')
-        # Add color 9
-        color_array.append('#BED4E8')
-        # Interpolate colors 10-19 between #BED4E8 and #447BB6
-        for i in range(10, 20):
-            ratio = (i - 9) / 11  # normalize to 0-1 for interpolation from 9 to 20
-            # Convert hex to RGB for interpolation
-            color1_rgb = tuple(int('#BED4E8'[j:j+2], 16) for j in (1, 3, 5))
-            color2_rgb = tuple(int('#447BB6'[j:j+2], 16) for j in (1, 3, 5))
-            # Interpolate
-            interp_rgb = tuple(int(color1_rgb[k] + ratio * (color2_rgb[k] - color1_rgb[k])) for k in range(3))
-            # Convert back to hex
-            interp_hex = '#{:02x}{:02x}{:02x}'.format(*interp_rgb)
-            color_array.append(interp_hex)
-        # Add color 20
-        color_array.append('#447BB6')
-        
-        custom_cmap = ListedColormap(color_array)
-        kwargs['cmap'] = custom_cmap
-        kwargs['vmin'] = 0
-        kwargs['vmax'] = 20
+    # Fixed colour mapping per plate type (shared with plate_renderer templates)
+    colormap = plate_colormap(colorbar_type)
+    if colormap is not None:
+        kwargs['cmap'], kwargs['vmin'], kwargs['vmax'] = colormap
     else:
         kwargs.setdefault('cmap', colorbar_type)
 
@@ -235,9 +178,9 @@ def plot_96wells(figure=1, figure_name = 'Test',colorbar_type= 'PuRd', cdata=Non
         else:
             new_text = text 
         if text < 10:
-            plt.text(x-0.175, y+0.15, str(new_text), fontsize = 23)
+            ax.text(x-0.175, y+0.15, str(new_text), fontsize = 23)
         else:
-            plt.text(x-0.275, y+0.15, str(new_text), fontsize = 23)
+            ax.text(x-0.275, y+0.15, str(new_text), fontsize = 23)
 
     return fig, ax
 
@@ -345,12 +288,9 @@ def plot_deprotection_cycles(figure=2, figure_name='Deprotection Cycles', cdata=
     kwargs.setdefault('linewidths', 1.5)
     
     # Apply custom colormap based on colorbar_type (same as plot_96wells)
-    if colorbar_type == 'deprots':
-        colors_map = ['white', '#DAA520', '#F5F5DC']  # white, mustard yellow, light beige
-        custom_cmap = ListedColormap(colors_map)
-        kwargs['cmap'] = custom_cmap
-        kwargs['vmin'] = 0
-        kwargs['vmax'] = 2
+    colormap = plate_colormap(colorbar_type)
+    if colormap is not None:
+        kwargs['cmap'], kwargs['vmin'], kwargs['vmax'] = colormap
     else:
         kwargs.setdefault('cmap', colorbar_type)
 
@@ -431,9 +371,9 @@ def plot_deprotection_cycles(figure=2, figure_name='Deprotection Cycles', cdata=
                 text_color = 'white'  # Hide text for cycles beyond data bounds
         
         if text < 10:
-            plt.text(x-0.175, y+0.15, str(new_text), fontsize=23, color=text_color)
+            ax.text(x-0.175, y+0.15, str(new_text), fontsize=23, color=text_color)
         else:
-            plt.text(x-0.275, y+0.15, str(new_text), fontsize=23, color=text_color)
+            ax.text(x-0.275, y+0.15, str(new_text), fontsize=23, color=text_color)
 
     # Add A-H row labels at the start of each active column set
     cycle_positions = [1, 4, 7, 10]  # Start positions of each cycle (columns 1, 4, 7, 10)
@@ -454,7 +394,7 @@ def plot_deprotection_cycles(figure=2, figure_name='Deprotection Cycles', cdata=
                     for row in range(1, 9):
                         row_label = string.ascii_uppercase[row - 1]  # A, B, C, D, E, F, G, H
                         # Position labels to the left of the cycle start
-                        plt.text(cycle_pos - 0.71, row + 0.055, row_label, fontsize=15, fontweight='normal', 
+                        ax.text(cycle_pos - 0.71, row + 0.055, row_label, fontsize=15, fontweight='normal', 
                                 ha='center', va='center', color='black')
 
     return fig, ax
@@ -623,7 +563,8 @@ def inner_create_plate_dfs(data_dict, indexed_values, multimer_size=4):
     # Extract the necessary data from the data_dict
     # ================================
     combined_database = data_dict['combined_database']
-    context_history = data_dict['context_history']
+    # multimer_string_name of every context (typed columns, nothing is parsed)
+    context_names = context_names_table(data_dict)
 
     # ================================
     # Determine the levels of formation based on multimer size
@@ -736,7 +677,7 @@ def inner_create_plate_dfs(data_dict, indexed_values, multimer_size=4):
     # ================================
     # Functions for Acceptors
     # ================================
-    # Inputs:
+    # context_names: The context history with the multimer string name of each acceptor.
     # context_history: The context history DataFrame containing acceptor information.   
     # indexed_values: List of index values for tetramers.
     # ================================
@@ -758,22 +699,19 @@ def inner_create_plate_dfs(data_dict, indexed_values, multimer_size=4):
     }
 
     # Filter the combined database for reactions and donors based on indexed values
-    # gonna have to be pulled from context_history
-    filtered_acceptors = context_history[(context_history['index'].isin(indexed_values))]
+    filtered_acceptors = context_names[(context_names['index'].isin(indexed_values))]
 
     # Preserve order of index_list
     filtered_acceptors_sorted = filtered_acceptors.set_index('index').loc[indexed_values].reset_index()
 
     # Select columns that contain 'formation' in the name
-    dimer_acceptor_columns = select_columns_by_keyword(context_history, 'dimer_formation')
+    dimer_acceptor_columns = select_columns_by_keyword(context_names, 'dimer_formation')
     
     # Get the dimer acceptor formation data
     dimer_acceptors_96 = filtered_acceptors_sorted[dimer_acceptor_columns]
 
     # Get the multimer string name 
-    dimer_acceptors_96['dimer_names'] = dimer_acceptors_96['dimer_formation'].apply(
-        lambda x: ast.literal_eval(x).get('multimer_string_name') if isinstance(x, str) else None
-        )
+    dimer_acceptors_96['dimer_names'] = dimer_acceptors_96['dimer_formation']
 
     # Create acceptor encoded plate maps
     dimer_acceptors_96['dimers_encoded'] = dimer_acceptors_96['dimer_names'].map(dimer_encoded_dictionary)
@@ -2314,66 +2252,46 @@ def run(ctx):
     opentrons_bytes.name = 'opentrons.py'
     return opentrons_bytes
 
-def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
+# Reaction-scheme text formatting tables, built and compiled once
+_SUBSCRIPT_TRANSLATION = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+_SUPERSCRIPT_MAP = {
+    '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
+    '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
+    'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
+    'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
+    'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
+    'p': 'ᵖ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ', 'u': 'ᵘ',
+    'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ', 'z': 'ᶻ',
+    'A': 'ᴬ', 'B': 'ᴮ', 'D': 'ᴰ', 'E': 'ᴱ', 'G': 'ᴳ',
+    'H': 'ᴴ', 'I': 'ᴵ', 'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ',
+    'M': 'ᴹ', 'N': 'ᴺ', 'O': 'ᴼ', 'P': 'ᴾ', 'R': 'ᴿ',
+    'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ'
+}
+_SUBSCRIPT_DIGIT_PATTERN = re.compile(r'_(\d)')
+_SUPERSCRIPT_CHAR_PATTERN = re.compile(r'\^([A-Za-z0-9])')
+_SUPERSCRIPT_NUMBER_PATTERN = re.compile(r'([' + re.escape(''.join(_SUPERSCRIPT_MAP.values())) + r']) (\d+)')
+_MULTIMER_ID_PATTERN = re.compile(r'^Ub(\d+)_(\d+)$')
 
-    import re
+def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
 
     def format_text_with_bold(text):
-        # Unicode superscript/subscript mapping
-        subscript_map = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
-        superscript_map = {
-            '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-            '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
-            'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
-            'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
-            'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
-            'p': 'ᵖ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ', 'u': 'ᵘ',
-            'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ', 'z': 'ᶻ',
-            'A': 'ᴬ', 'B': 'ᴮ', 'D': 'ᴰ', 'E': 'ᴱ', 'G': 'ᴳ',
-            'H': 'ᴴ', 'I': 'ᴵ', 'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ',
-            'M': 'ᴹ', 'N': 'ᴺ', 'O': 'ᴼ', 'P': 'ᴾ', 'R': 'ᴿ',
-            'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ'
-        }
-
         # Convert _<digit> to subscript
-        text = re.sub(r'_(\d)', lambda m: m.group(1).translate(subscript_map), text)
+        text = _SUBSCRIPT_DIGIT_PATTERN.sub(lambda m: m.group(1).translate(_SUBSCRIPT_TRANSLATION), text)
         # Convert ^<char> to superscript
-        text = re.sub(r'\^([A-Za-z0-9])', lambda m: superscript_map.get(m.group(1), m.group(1)), text)
-        # Wrap any number immediately following a superscript with {BOLD} marker
-        superscript_chars = ''.join(superscript_map.values())
-        # Matches a superscript character from your superscript_chars.
-        # Ensures it’s followed by a space and digits.
-        # Only wraps the digits (\2) in {BOLD}, not the superscript or the space.    
-        text = re.sub(r'([' + re.escape(superscript_chars) + r']) (\d+)', r'\1 {BOLD}\2{BOLD}', text)    
+        text = _SUPERSCRIPT_CHAR_PATTERN.sub(lambda m: _SUPERSCRIPT_MAP.get(m.group(1), m.group(1)), text)
+        # Matches a superscript character followed by a space and digits.
+        # Only the digits (\2) are wrapped in {BOLD}, not the superscript or the space.    
+        text = _SUPERSCRIPT_NUMBER_PATTERN.sub(r'\1 {BOLD}\2{BOLD}', text)    
         return text
 
     def format_text(text):
-        # Unicode superscript/subscript mapping
-        subscript_map = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
-        superscript_map = {
-            '0': '⁰', '1': '¹', '2': '²', '3': '³', '4': '⁴',
-            '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹',
-            'a': 'ᵃ', 'b': 'ᵇ', 'c': 'ᶜ', 'd': 'ᵈ', 'e': 'ᵉ',
-            'f': 'ᶠ', 'g': 'ᵍ', 'h': 'ʰ', 'i': 'ⁱ', 'j': 'ʲ',
-            'k': 'ᵏ', 'l': 'ˡ', 'm': 'ᵐ', 'n': 'ⁿ', 'o': 'ᵒ',
-            'p': 'ᵖ', 'r': 'ʳ', 's': 'ˢ', 't': 'ᵗ', 'u': 'ᵘ',
-            'v': 'ᵛ', 'w': 'ʷ', 'x': 'ˣ', 'y': 'ʸ', 'z': 'ᶻ',
-            'A': 'ᴬ', 'B': 'ᴮ', 'D': 'ᴰ', 'E': 'ᴱ', 'G': 'ᴳ',
-            'H': 'ᴴ', 'I': 'ᴵ', 'J': 'ᴶ', 'K': 'ᴷ', 'L': 'ᴸ',
-            'M': 'ᴹ', 'N': 'ᴺ', 'O': 'ᴼ', 'P': 'ᴾ', 'R': 'ᴿ',
-            'T': 'ᵀ', 'U': 'ᵁ', 'V': 'ⱽ', 'W': 'ᵂ'
-        }
-
         # Convert _<digit> to subscript
-        text = re.sub(r'_(\d)', lambda m: m.group(1).translate(subscript_map), text)
+        text = _SUBSCRIPT_DIGIT_PATTERN.sub(lambda m: m.group(1).translate(_SUBSCRIPT_TRANSLATION), text)
         # Convert ^<char> to superscript
-        text = re.sub(r'\^([A-Za-z0-9])', lambda m: superscript_map.get(m.group(1), m.group(1)), text)
-        # Wrap any number immediately following a superscript with {BOLD} marker
-        superscript_chars = ''.join(superscript_map.values())
-        # Matches a superscript character from your superscript_chars.
-        # Ensures it’s followed by a space and digits.
-        # Only wraps the digits (\2) in {BOLD}, not the superscript or the space.    
-        text = re.sub(r'([' + re.escape(superscript_chars) + r']) (\d+)', r'\1 \2', text)    
+        text = _SUPERSCRIPT_CHAR_PATTERN.sub(lambda m: _SUPERSCRIPT_MAP.get(m.group(1), m.group(1)), text)
+        # Matches a superscript character followed by a space and digits.
+        # Only the digits (\2) are wrapped in {BOLD}, not the superscript or the space.    
+        text = _SUPERSCRIPT_NUMBER_PATTERN.sub(r'\1 \2', text)    
         return text
 
     def single_dict_for_reaction_schemes(data_dict, idx, multimer_size):
@@ -2403,11 +2321,11 @@ def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
         """
 
         combined_database = data_dict['combined_database']
-        context_history = data_dict['context_history']
+        context_names = data_dict[CONTEXT_NAMES_TABLE]
 
-        # Get the acceptor dimer name from the context history
+        # Get the acceptor dimer name from the context names
 
-        def get_acceptor_dimer_name(context_history, idx):
+        def get_acceptor_dimer_name(context_names, idx):
             """ Get the acceptor dimer code from the working DataFrame. """
             
             # Create a dimer encoded dictionary
@@ -2427,19 +2345,11 @@ def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
                 'his-GG-1ubq-1-(<K63_1ubq-2-(<K63_SMAC><K48_ABOC>)><K48_ABOC>)' : "Ub₂ᴬ 20",
             }
 
-            working_context_df = context_history[context_history['index'] == idx]
+            working_context_df = context_names[context_names['index'] == idx]
 
-            # Get the value of 'context' in 'dimer_formation' column for the selected index
+            # Get the multimer string name in the 'dimer_formation' column for the selected index
             if not working_context_df.empty:
-                context_dict = working_context_df.iloc[0]['dimer_formation']
-                # If the value is a string, try to parse it as a dictionary
-                if isinstance(context_dict, str):
-                    import ast
-                    try:
-                        context_dict = ast.literal_eval(context_dict)
-                    except Exception:
-                        context_dict = {}
-                multimer_name = context_dict.get('multimer_string_name', None)
+                multimer_name = working_context_df.iloc[0]['dimer_formation']
                 # Map the multimer name to the dimer code using the dictionary
                 dimer_code = dimer_encoded_str_dictionary.get(multimer_name, None)
                 return dimer_code
@@ -2448,7 +2358,7 @@ def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
                 return None
 
         # Get the acceptor dimer name for the given index
-        multimer_code = get_acceptor_dimer_name(context_history, idx)
+        multimer_code = get_acceptor_dimer_name(context_names, idx)
 
         # ============================================================
 
@@ -2550,7 +2460,7 @@ def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
             Reformat multimer_id string from 'UbX_Y' to 'Ub_X Y', with suffixes for certain sizes.
             For size 4: add ^T as superscript. For size 5: add ^P as superscript.
             """
-            match = re.match(r'^Ub(\d+)_(\d+)$', multimer_id)
+            match = _MULTIMER_ID_PATTERN.match(multimer_id)
             if match:
                 size, number = match.group(1), match.group(2)
                 suffix = '^T' if size == '4' else '^P' if size == '5' else ''
@@ -2657,6 +2567,8 @@ def build_reaction_dictionaries_for_UI(data_dict, indexes, multimer_size):
         return compressed_dicts
 
     # Create the full dictionary and DataFrame for reaction schemes
+    # Context names once for all indexes (read from the columnar file when it was loaded)
+    data_dict = {**data_dict, CONTEXT_NAMES_TABLE: context_names_table(data_dict)}
     steps_df, steps_full_dict = full_dict_df_for_reaction_schemes(data_dict, indexes, multimer_size)
 
     # Call the function
@@ -2787,12 +2699,14 @@ def ubiquitin_building_wo_iterate(
     
     return output_dictionary, output_context
 
-def get_indexes_for_final_multimer(json_output, ubiquitin_history):
+def get_indexes_for_final_multimer(json_output, ubiquitin_history, final_multimer_index=None):
     """
     Match the final multimer from JSON output to the ubiquitin history and return unique indices.
     Args:
         json_output (list): List of dictionaries containing 'from', 'to', and 'linkage'.
         ubiquitin_history (DataFrame): DataFrame containing the history of ubiquitin structures.    
+        final_multimer_index (dict, optional): final_multimer -> indexes, e.g. from
+            DataRegistry.indexes_by_final_multimer(); replaces the scan of ubiquitin_history.
     Returns:
         list: Unique indices corresponding to the final multimer.
     """
@@ -2852,11 +2766,22 @@ def get_indexes_for_final_multimer(json_output, ubiquitin_history):
             )
 
     final_ubiquitin, final_context = main.iterate_through_ubiquitin(growing_ubiquitin)
+    if final_multimer_index is not None:
+        return list(final_multimer_index.get(str(final_ubiquitin), []))
     indexes = ubiquitin_history.loc[ubiquitin_history["final_multimer"] == str(final_ubiquitin), "index"].dropna().unique()
     return [int(i) for i in indexes]
 
 
-def reaction_path_statistics(_ubiquitin_history_, _context_history_, multimers, project_root, multimer_size):
+def reaction_path_statistics(_ubiquitin_history_, _context_history_, multimers, project_root, multimer_size, path_counts=None, containment_results=None):
+    """
+    Count the synthesis paths and linkage patterns of every multimer.
+
+    path_counts (dict), e.g. ReactionNetwork.final_multimer_path_counts(), gives the
+    number of paths per final multimer directly; the history DataFrames are then not used.
+    containment_results (ContainmentResult or dict), e.g. from the precomputed
+    containment matrix, replaces the K48/K63 trimer analyze_subgraph_containment()
+    of the multimers; a ContainmentResult is summed by column without building rows.
+    """
     
     import src.main as main
     import src.data_cleaning as data_cleaning
@@ -2871,34 +2796,46 @@ def reaction_path_statistics(_ubiquitin_history_, _context_history_, multimers,
         return edges
 
 
-    # Reset index if needed
-    _ubiquitin_history_ = _ubiquitin_history_.reset_index()
-    _context_history_ = _context_history_.reset_index()
+    if path_counts is None:
+        # Reset index if needed
+        _ubiquitin_history_ = _ubiquitin_history_.reset_index()
+        _context_history_ = _context_history_.reset_index()
 
-    # This should be a separate function in run_file.pyxs
-    multimered_ubiquitin_history, multimered_context_history = data_cleaning.global_deprotection_dual(_ubiquitin_history_, _context_history_)
+        # This should be a separate function in run_file.pyxs
+        multimered_ubiquitin_history, multimered_context_history = data_cleaning.global_deprotection_dual(_ubiquitin_history_, _context_history_)
+        path_counts = multimered_ubiquitin_history['final_multimer'].value_counts().to_dict()
 
     json_counting = {}
 
     for i in range(len(multimers.keys())):
-        num_of_reactions = len(multimered_ubiquitin_history[multimered_ubiquitin_history['final_multimer'] == multimers[f'Ub{multimer_size}_{i+1}']])
+        num_of_reactions = int(path_counts.get(multimers[f'Ub{multimer_size}_{i+1}'], 0))
         ubi_DAG, ubi_context = main.iterate_through_ubiquitin(multimers[f'Ub{multimer_size}_{i+1}'])
         json_counting[f'Ub{multimer_size}_{i+1}'] = {
             num_of_reactions: 'num_of_reactions', 
             'ubiDAG_edges': str(reveal_edges(ubi_context))
             }
 
-    # Load the data
-    higher_level_data = linkages.load_multimer_contexts(project_root, multimer_size)
-    n_level_data = linkages.load_multimer_contexts(project_root, 3)
+    if containment_results is None:
+        # Load the data
+        higher_level_data = linkages.load_multimer_contexts(project_root, multimer_size)
+        n_level_data = linkages.load_multimer_contexts(project_root, 3)
+
+        # Filter by lysine types
+        higher_level_dict = linkages.get_multimer_edges_by_lysines(higher_level_data, {"K48", "K63"})
+        n_level_dict = linkages.get_multimer_edges_by_lysines(n_level_data, {"K48", "K63"})
 
-    # Filter by lysine types
-    higher_level_dict = linkages.get_multimer_edges_by_lysines(higher_level_data, {"K48", "K63"})
-    n_level_dict = linkages.get_multimer_edges_by_lysines(n_level_data, {"K48", "K63"})
+        # Analyze subgraph containment, with K48 and K63 linkages
+        results = linkages.analyze_subgraph_containment(higher_level_dict, n_level_dict)
+    else:
+        results = containment_results
 
-    # Analyze subgraph containment, with K48 and K63 linkages
-    results = linkages.analyze_subgraph_containment(higher_level_dict, n_level_dict)
 
+    # Trimer keys to count for heterotypic and branching
+    heterotypic_keys = [
+        "[[1, 'K63', 2], [2, 'K48', 3]]",
+        "[[1, 'K48', 2], [2, 'K63', 3]]"
+    ]
+    branching_key = "[[1, 'K63', 2], [1, 'K48', 3]]"
 
     def simplify_linkage_dict(nested_dict):
         """
@@ -2919,13 +2856,6 @@ def reaction_path_statistics(_ubiquitin_history_, _context_history_, multimers,
             "[[1, 'K48', 2], [2, 'K48', 3]]"
         ]
 
-        # Keys to count for heterotypic and branching
-        heterotypic_keys = [
-            "[[1, 'K63', 2], [2, 'K48', 3]]",
-            "[[1, 'K48', 2], [2, 'K63', 3]]"
-        ]
-        branching_key = "[[1, 'K63', 2], [1, 'K48', 3]]"
-
         for outer_key, inner_dict in nested_dict.items():
             heterotypic_total = 0
             branching_total = 0
@@ -2950,7 +2880,14 @@ def reaction_path_statistics(_ubiquitin_history_, _context_history_, multimers,
         return result
 
     # Simplify the linkage dictionary
-    simplified_example = simplify_linkage_dict(results)
+    if isinstance(results, ContainmentResult):
+        totals = results.column_totals({'heterotypic_linkage': heterotypic_keys, 'branching_linkage': [branching_key]})
+        simplified_example = {
+            label: {name: int(total[row]) for name, total in totals.items()}
+            for row, label in enumerate(results.row_labels)
+        }
+    else:
+        simplified_example = simplify_linkage_dict(results)
 
     # Convert the nested dictionary into a flat structure suitable for a DataFrame
     json_with_reaction_information = {}
@@ -0,0 +1,638 @@
+import ast
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+from src.compact_ubiquitin import SITE_NAMES
+
+"""
+COLUMNAR REACTION DATABASE
+==========================
+
+Binary companion of the reaction database CSVs. The CSVs store every cell as the
+repr of a dictionary, so each consumer re-parses megabytes of text. The columnar
+file stores each unique (ubiquitin, context) pair once in a species table and
+the history tables as integer species ids:
+
+    species                 int32 (paths, columns)  ubiquitin_history / context_history cells
+    reaction, donor         int16 (paths, columns)  codes into small vocabularies
+    meta_<column>           per path columns (index, multimer_id, used_in_synthesis)
+    species_<column>        typed species columns (ABOC/SMAC counts, edges, names)
+
+Consumers that only need a count or a name of each context read the typed
+columns (context_features(), the 'context_names' table of load_reaction_database())
+instead of parsing the history cells.
+
+Strings are packed as one utf-8 buffer plus offsets. Missing cells (empty strings
+and NaN) are stored as code -1 and read back as NaN, like pd.read_csv(). When the
+CSVs were written with their index, the index is stored as saved_index so that
+readers reproduce pd.read_csv() for any index_col.
+Everything is written to one reaction_database.npz per multimer size; members are
+only decompressed when a loader asks for them.
+"""
+
+COLUMNAR_DATABASE_FILENAME = 'reaction_database.npz'
+HISTORY_TABLES = ('ubiquitin_history', 'reaction_history', 'donor_history', 'context_history')
+SPECIES_TABLES = ('ubiquitin_history', 'context_history')
+CODED_TABLES = {'reaction_history': 'reaction', 'donor_history': 'donor'}
+META_COLUMNS = ('index', 'multimer_id', 'used_in_synthesis')
+SPECIES_NAME_COLUMNS = ('multimer_string_name', 'nomenclature_w_preorder', 'nomenclature_wo_preorder')
+CONTEXT_FEATURES = ('ABOC_count', 'SMAC_count', 'conjugated_count', 'max_chain_number')
+CONTEXT_NAMES_TABLE = 'context_names'
+
+# =========================================
+# Packed strings
+# =========================================
+
+def pack_strings(values: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pack a list of strings into one utf-8 buffer and an offsets array.
+
+    Args:
+        values (list): Strings to pack.
+
+    Returns:
+        tuple: (uint8 buffer, int64 offsets of length len(values) + 1).
+    """
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(data: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Inverse of pack_strings().
+
+    Returns:
+        np.ndarray: Object array of the strings.
+    """
+    buffer = data.tobytes()
+    bounds = offsets.tolist()
+    values = np.empty(len(bounds) - 1, dtype=object)
+    for i in range(len(values)):
+        values[i] = buffer[bounds[i]:bounds[i + 1]].decode('utf-8')
+    return values
+
+# =========================================
+# Writing
+# =========================================
+
+def _is_missing(value) -> bool:
+    if value is None or (isinstance(value, str) and value == ''):
+        return True
+    return isinstance(value, float) and np.isnan(value)
+
+
+class _Vocabulary:
+    """Assigns consecutive codes to strings; dicts are stored by their repr."""
+
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        self._repr_by_id = {}
+
+    def as_string(self, value) -> str:
+        if isinstance(value, str):
+            return value
+        # Histories share the same dictionary objects between paths, format each once
+        key = id(value)
+        if key not in self._repr_by_id:
+            self._repr_by_id[key] = (value, str(value))
+        return self._repr_by_id[key][1]
+
+    def code(self, value) -> int:
+        if _is_missing(value):
+            return -1
+        value = self.as_string(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _history_columns(table: pd.DataFrame) -> list:
+    return [column for column in table.columns if column not in META_COLUMNS]
+
+
+def _meta_arrays(tables: dict) -> dict:
+    """
+    Per-path columns shared by all history tables; they must agree across tables.
+    """
+    reference_name = None
+    arrays = {}
+    for table_name, table in tables.items():
+        for column in META_COLUMNS:
+            if column not in table.columns:
+                continue
+            values = table[column].to_numpy()
+            if column not in arrays:
+                arrays[column] = values
+                reference_name = table_name
+            elif not pd.Series(values).equals(pd.Series(arrays[column])):
+                raise ValueError(
+                    f"Column '{column}' of {table_name} does not match {reference_name}"
+                )
+    return arrays
+
+
+def _parse_context(context):
+    return ast.literal_eval(context) if isinstance(context, str) else context
+
+
+def _species_columns(species_context: list) -> dict:
+    """
+    Pre-extract the typed species columns from the context dictionaries.
+    """
+    site_codes = {name: code for code, name in enumerate(SITE_NAMES)}
+    aboc_count = np.zeros(len(species_context), dtype=np.int16)
+    smac_count = np.zeros(len(species_context), dtype=np.int16)
+    max_chain_number = np.zeros(len(species_context), dtype=np.int16)
+    edge_offsets = np.zeros(len(species_context) + 1, dtype=np.int64)
+    edges = []
+    names = {column: [] for column in SPECIES_NAME_COLUMNS}
+
+    for i, context in enumerate(species_context):
+        if not context:
+            edge_offsets[i + 1] = len(edges)
+            for column in SPECIES_NAME_COLUMNS:
+                names[column].append('')
+            continue
+        context = _parse_context(context)
+        aboc_count[i] = len(context['ABOC_lysines'])
+        smac_count[i] = len(context['SMAC_lysines'])
+        max_chain_number[i] = int(context['max_chain_number'])
+        for parent, site, child in context['conjugated_lysines']:
+            edges.append((parent, site_codes[site], child))
+        edge_offsets[i + 1] = len(edges)
+        for column in SPECIES_NAME_COLUMNS:
+            names[column].append(str(context.get(column, '')))
+
+    arrays = {
+        'species_ABOC_count': aboc_count,
+        'species_SMAC_count': smac_count,
+        'species_max_chain_number': max_chain_number,
+        'species_edge_offsets': edge_offsets,
+        'species_edges': np.array(edges, dtype=np.int16).reshape(-1, 3),
+    }
+    for column, values in names.items():
+        arrays[f'species_{column}.data'], arrays[f'species_{column}.offsets'] = pack_strings(values)
+    return arrays
+
+
+def save_columnar_reaction_database(
+        output_dir: Path,
+        ubiquitin_history: pd.DataFrame,
+        reaction_history: pd.DataFrame,
+        donor_history: pd.DataFrame,
+        context_history: pd.DataFrame,
+        index: bool = False
+    ) -> Path:
+    """
+    Write the four history tables as one columnar reaction_database.npz.
+
+    Cells may be dictionaries or their string repr (as read from the CSVs); the
+    ubiquitin and context tables must have the same rows and history columns.
+
+    Args:
+        output_dir (Path): Folder of the reaction database for one multimer size.
+        ubiquitin_history (pd.DataFrame): Ubiquitin per step.
+        reaction_history (pd.DataFrame): Enzyme or deprotection per step.
+        donor_history (pd.DataFrame): Donor per step.
+        context_history (pd.DataFrame): Context per step.
+        index (bool): Whether the CSVs were written with their (integer) index, as
+            to_csv(index=...); the tables must then share it.
+
+    Returns:
+        Path: The written file.
+    """
+    tables = {
+        'ubiquitin_history': ubiquitin_history,
+        'reaction_history': reaction_history,
+        'donor_history': donor_history,
+        'context_history': context_history
+    }
+    lengths = {len(table) for table in tables.values()}
+    if len(lengths) != 1:
+        raise ValueError(f"History tables have different lengths: {sorted(lengths)}")
+
+    species_columns = _history_columns(ubiquitin_history)
+    if species_columns != _history_columns(context_history):
+        raise ValueError("ubiquitin_history and context_history have different history columns")
+
+    arrays = {}
+    if index:
+        saved_index = ubiquitin_history.index
+        if saved_index.dtype.kind not in 'iu':
+            raise ValueError("Only integer indexes can be stored")
+        for table_name, table in tables.items():
+            if not table.index.equals(saved_index):
+                raise ValueError(f"Index of {table_name} does not match ubiquitin_history")
+        arrays['saved_index'] = saved_index.to_numpy(dtype=np.int64)
+        arrays['saved_index_name.data'], arrays['saved_index_name.offsets'] = pack_strings([str(saved_index.name or '')])
+
+    for table_name, table in tables.items():
+        arrays[f'columns/{table_name}.data'], arrays[f'columns/{table_name}.offsets'] = pack_strings(
+            [str(column) for column in table.columns]
+        )
+
+    # Per-path columns
+    meta_arrays = _meta_arrays(tables)
+    for column, values in meta_arrays.items():
+        if values.dtype.kind in 'iub':
+            arrays[f'meta_{column}'] = values.astype(np.int64)
+        else:
+            vocabulary = _Vocabulary()
+            arrays[f'meta_{column}'] = np.array([vocabulary.code(value) for value in values], dtype=np.int32)
+            arrays[f'meta_{column}_names.data'], arrays[f'meta_{column}_names.offsets'] = pack_strings(vocabulary.values)
+
+    # Species ids for the ubiquitin and context tables
+    ubiquitin_vocabulary = _Vocabulary()
+    context_vocabulary = _Vocabulary()
+    species_ids = {}
+    species_ubiquitin = []
+    species_context = []
+    species = np.full((len(ubiquitin_history), len(species_columns)), -1, dtype=np.int32)
+    ubiquitin_values = ubiquitin_history[species_columns].to_numpy()
+    context_values = context_history[species_columns].to_numpy()
+    for row in range(species.shape[0]):
+        for column in range(species.shape[1]):
+            ubiquitin_code = ubiquitin_vocabulary.code(ubiquitin_values[row, column])
+            context_code = context_vocabulary.code(context_values[row, column])
+            if ubiquitin_code == -1 and context_code == -1:
+                continue
+            key = (ubiquitin_code, context_code)
+            species_id = species_ids.get(key)
+            if species_id is None:
+                species_id = species_ids[key] = len(species_ubiquitin)
+                species_ubiquitin.append(ubiquitin_vocabulary.values[ubiquitin_code] if ubiquitin_code != -1 else '')
+                species_context.append(context_vocabulary.values[context_code] if context_code != -1 else '')
+            species[row, column] = species_id
+    arrays['species'] = species
+    arrays['species_ubiquitin.data'], arrays['species_ubiquitin.offsets'] = pack_strings(species_ubiquitin)
+    arrays['species_context.data'], arrays['species_context.offsets'] = pack_strings(species_context)
+    arrays.update(_species_columns(species_context))
+
+    # Small vocabularies for reactions and donors
+    for table_name, prefix in CODED_TABLES.items():
+        table = tables[table_name]
+        vocabulary = _Vocabulary()
+        values = table[_history_columns(table)].to_numpy()
+        codes = np.full(values.shape, -1, dtype=np.int16)
+        for row in range(values.shape[0]):
+            for column in range(values.shape[1]):
+                codes[row, column] = vocabulary.code(values[row, column])
+        arrays[prefix] = codes
+        arrays[f'{prefix}_names.data'], arrays[f'{prefix}_names.offsets'] = pack_strings(vocabulary.values)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / COLUMNAR_DATABASE_FILENAME
+    np.savez_compressed(output_path, **arrays)
+    return output_path
+
+# =========================================
+# Reading
+# =========================================
+
+class ColumnarReactionDatabase:
+    """
+    Lazy reader of a reaction_database.npz file.
+
+    Members are decompressed on first access and cached, so a caller only pays
+    for the tables and columns it asks for.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._npz = np.load(self.path, allow_pickle=False)
+        self._cache = {}
+
+    def __repr__(self):
+        return f"ColumnarReactionDatabase({str(self.path)!r})"
+
+    def __contains__(self, name):
+        return name in self._npz.files or f'{name}.data' in self._npz.files
+
+    def array(self, name: str) -> np.ndarray:
+        """Return one stored array."""
+        if name not in self._cache:
+            self._cache[name] = self._npz[name]
+        return self._cache[name]
+
+    def strings(self, name: str) -> np.ndarray:
+        """Return one packed string column as an object array."""
+        if name not in self._cache:
+            self._cache[name] = unpack_strings(self.array(f'{name}.data'), self.array(f'{name}.offsets'))
+        return self._cache[name]
+
+    def columns(self, table: str) -> list:
+        """Column names of a history table, in CSV order."""
+        return list(self.strings(f'columns/{table}'))
+
+    def _saved_index_label(self) -> str | None:
+        """Column name pd.read_csv() gives the saved index, or None without one."""
+        if 'saved_index' not in self._npz.files:
+            return None
+        return self.strings('saved_index_name')[0] or 'Unnamed: 0'
+
+    def _csv_frame(self, table: str, columns: list | None, index_col: int | None, column_values, index_values=None) -> pd.DataFrame:
+        """
+        Assemble a table as pd.read_csv(path, index_col=index_col)[columns] returns it.
+
+        Args:
+            table (str): The history table whose CSV is reproduced.
+            columns (list): Columns to load (defaults to all but the index column).
+            index_col (int): As in pd.read_csv().
+            column_values (callable): Column name -> values of a stored column.
+            index_values (callable): Same for the index column (defaults to column_values).
+        """
+        index_label = self._saved_index_label()
+        csv_columns = ([index_label] if index_label is not None else []) + self.columns(table)
+        index_name = csv_columns[index_col] if index_col is not None else None
+        if columns is None:
+            columns = [column for column in csv_columns if column != index_name]
+        missing = [column for column in columns if column not in csv_columns]
+        if missing:
+            raise KeyError(f"Columns {missing} not found in {table}")
+
+        data = {}
+        if index_name is not None:
+            data[index_name] = self.array('saved_index') if index_name == index_label else (index_values or column_values)(index_name)
+        for column in columns:
+            data[column] = self.array('saved_index') if column == index_label else column_values(column)
+        frame = pd.DataFrame(data)
+        if index_name is not None:
+            frame = frame.set_index(index_name)
+            if index_name.startswith('Unnamed: '):
+                frame.index.name = None
+        return frame[list(columns)]
+
+    def species_table(self, columns: list | None = None) -> pd.DataFrame:
+        """
+        Typed species columns without parsing any dictionary.
+
+        Args:
+            columns (list): Any of 'ubiquitin', 'context', 'ABOC_count', 'SMAC_count',
+                'max_chain_number', 'conjugated_count', 'edges', 'multimer_string_name',
+                'nomenclature_w_preorder' and 'nomenclature_wo_preorder'.
+
+        Returns:
+            pd.DataFrame: One row per species id. 'edges' holds (parent, site, child)
+                tuples with the site as a name from SITE_NAMES.
+        """
+        if columns is None:
+            columns = ['ubiquitin', 'context', 'ABOC_count', 'SMAC_count', 'max_chain_number', 'edges', *SPECIES_NAME_COLUMNS]
+        data = {}
+        for column in columns:
+            if column == 'edges':
+                offsets = self.array('species_edge_offsets')
+                edges = self.array('species_edges').tolist()
+                data[column] = [
+                    [(parent, SITE_NAMES[site], child) for parent, site, child in edges[offsets[i]:offsets[i + 1]]]
+                    for i in range(len(offsets) - 1)
+                ]
+            elif column == 'conjugated_count':
+                data[column] = np.diff(self.array('species_edge_offsets'))
+            elif f'species_{column}.data' in self._npz.files:
+                data[column] = self.strings(f'species_{column}')
+            else:
+                data[column] = self.array(f'species_{column}')
+        return pd.DataFrame(data)
+
+    def context_features(self, columns: list | None = None) -> dict:
+        """
+        CONTEXT_FEATURES of the context_history cells, read from the typed species columns.
+
+        Args:
+            columns (list): History columns of context_history to include (defaults to all).
+
+        Returns:
+            dict: Feature name -> int DataFrame (one row per path, one column per history
+                column); -1 marks missing cells.
+        """
+        history_columns = _history_columns(pd.DataFrame(columns=self.columns('context_history')))
+        if columns is None:
+            columns = history_columns
+        species = self.array('species')[:, [history_columns.index(column) for column in columns]]
+        table = self.species_table(list(CONTEXT_FEATURES))
+
+        # Species without a context (empty packed string) count as missing
+        missing = np.diff(self.array('species_context.offsets')) == 0
+        missing_cells = (species == -1) | missing[species]
+
+        features = {}
+        for feature in CONTEXT_FEATURES:
+            values = table[feature].to_numpy(dtype=np.int64)[species]
+            values[missing_cells] = -1
+            features[feature] = pd.DataFrame(values, columns=columns)
+        return features
+
+    def context_names(self, columns: list | None = None, index_col: int | None = None) -> pd.DataFrame:
+        """
+        context_history with every context replaced by its multimer_string_name, without parsing.
+
+        Args:
+            columns (list): Columns to load (defaults to all).
+            index_col (int): As in pd.read_csv().
+
+        Returns:
+            pd.DataFrame: The table as history_table('context_history', columns, index_col)
+                returns it, with name strings in the history cells and NaN for empty cells.
+        """
+        history_columns = _history_columns(pd.DataFrame(columns=self.columns('context_history')))
+        species = self.array('species')
+        names = self.strings('species_multimer_string_name')
+        no_context = np.diff(self.array('species_context.offsets')) == 0
+
+        def column_values(column):
+            if column in META_COLUMNS:
+                return self._meta_column(column)
+            codes = species[:, history_columns.index(column)]
+            codes = np.where((codes == -1) | no_context[np.maximum(codes, 0)], -1, codes)
+            return _decode(codes, names)
+
+        # The index keeps the context strings, as when the names are derived from the CSV
+        return self._csv_frame(
+            'context_history', columns, index_col, column_values, self._history_column_values('context_history')
+        )
+
+    def _meta_column(self, column: str) -> np.ndarray:
+        values = self.array(f'meta_{column}')
+        if f'meta_{column}_names.data' not in self._npz.files:
+            return values
+        return _decode(values, self.strings(f'meta_{column}_names'))
+
+    def history_table(self, table: str, columns: list | None = None, index_col: int | None = None) -> pd.DataFrame:
+        """
+        Rebuild one history table as pd.read_csv() returns it, for the selected columns only.
+
+        Args:
+            table (str): One of HISTORY_TABLES.
+            columns (list): Columns to load (defaults to all).
+            index_col (int): As in pd.read_csv(); column 0 is the saved index when the
+                CSVs were written with one.
+
+        Returns:
+            pd.DataFrame: The table with string cells and NaN for empty cells.
+        """
+        if table not in HISTORY_TABLES:
+            raise ValueError(f"Invalid table: {table}. Must be one of {HISTORY_TABLES}")
+        return self._csv_frame(table, columns, index_col, self._history_column_values(table))
+
+    def _history_column_values(self, table: str):
+        """Column name -> decoded values of a history table (meta columns included)."""
+        history_columns = _history_columns(pd.DataFrame(columns=self.columns(table)))
+        if table in SPECIES_TABLES:
+            codes = self.array('species')
+            vocabulary = self.strings('species_ubiquitin' if table == 'ubiquitin_history' else 'species_context')
+        else:
+            prefix = CODED_TABLES[table]
+            codes = self.array(prefix)
+            vocabulary = self.strings(f'{prefix}_names')
+
+        def column_values(column):
+            if column in META_COLUMNS:
+                return self._meta_column(column)
+            return _decode(codes[:, history_columns.index(column)], vocabulary)
+
+        return column_values
+
+
+def _decode(codes: np.ndarray, vocabulary: np.ndarray) -> np.ndarray:
+    """
+    Map codes to their strings; -1 becomes NaN, and an all-missing column is float
+    like in pd.read_csv().
+    """
+    if (codes == -1).all():
+        return np.full(len(codes), np.nan)
+    values = np.empty(len(codes), dtype=object)
+    present = codes != -1
+    values[present] = vocabulary[codes[present]]
+    values[~present] = np.nan
+    return values
+
+
+def context_names_from_history(context_history: pd.DataFrame) -> pd.DataFrame:
+    """
+    CSV fallback of ColumnarReactionDatabase.context_names(): parses each distinct context once.
+    """
+    context_names = context_history.copy()
+    for column in _history_columns(context_history):
+        # Only string cells are contexts (a saved index or an all-empty column is kept)
+        if context_history[column].dtype != object:
+            continue
+        codes, unique_contexts = pd.factorize(context_history[column], use_na_sentinel=True)
+        unique_names = np.array(
+            [_parse_context(context).get('multimer_string_name') for context in unique_contexts] + [np.nan],
+            dtype=object
+        )
+        context_names[column] = unique_names[codes]
+    return context_names
+
+
+def context_names_table(data_dict: dict) -> pd.DataFrame:
+    """
+    The CONTEXT_NAMES_TABLE of a loaded reaction database, derived from its
+    context_history when it was not loaded.
+    """
+    if CONTEXT_NAMES_TABLE in data_dict:
+        return data_dict[CONTEXT_NAMES_TABLE]
+    return context_names_from_history(data_dict['context_history'])
+
+
+def compare_columnar_with_csv(input_dir: Path, index_cols: tuple = (None, 0)) -> list:
+    """
+    Check that load_reaction_database() returns the same frames from the columnar
+    file as from the CSVs of a reaction database folder.
+
+    Args:
+        input_dir (Path): Folder with both the CSVs and reaction_database.npz.
+        index_cols (tuple): index_col values to compare.
+
+    Returns:
+        list: Descriptions of the tables that differ (empty when all match).
+    """
+    input_dir = Path(input_dir)
+    database = ColumnarReactionDatabase(input_dir / COLUMNAR_DATABASE_FILENAME)
+    mismatches = []
+    for index_col in index_cols:
+        for table in HISTORY_TABLES:
+            expected = pd.read_csv(input_dir / f'{table}.csv', index_col=index_col)
+            try:
+                pd.testing.assert_frame_equal(database.history_table(table, index_col=index_col), expected)
+            except AssertionError as e:
+                mismatches.append(f"{input_dir.name}/{table} (index_col={index_col}): {e}")
+        expected = context_names_from_history(pd.read_csv(input_dir / 'context_history.csv', index_col=index_col))
+        try:
+            pd.testing.assert_frame_equal(database.context_names(index_col=index_col), expected)
+        except AssertionError as e:
+            mismatches.append(f"{input_dir.name}/{CONTEXT_NAMES_TABLE} (index_col={index_col}): {e}")
+    return mismatches
+
+
+def load_context_features(input_dir: Path) -> dict | None:
+    """
+    ColumnarReactionDatabase.context_features() of a reaction database folder.
+
+    Returns:
+        dict: Feature name -> int DataFrame, or None when the folder has no columnar file.
+    """
+    columnar_path = Path(input_dir) / COLUMNAR_DATABASE_FILENAME
+    if not columnar_path.exists():
+        return None
+    return ColumnarReactionDatabase(columnar_path).context_features()
+
+
+def load_reaction_database(
+        input_dir: Path,
+        tables: tuple = HISTORY_TABLES,
+        columns: dict | None = None,
+        index_col: int | None = None
+    ) -> dict:
+    """
+    Load reaction database tables from the columnar file, falling back to the CSVs.
+
+    Args:
+        input_dir (Path): Folder of the (filtered) reaction database for one multimer size.
+        tables (tuple): Tables to load; 'combined_database' is always read from its CSV and
+            CONTEXT_NAMES_TABLE is context_history with multimer_string_name cells.
+        columns (dict): Optional table name -> columns to load.
+        index_col (int): As in pd.read_csv(); the columnar tables are returned with the
+            same index and columns as the CSVs.
+
+    Returns:
+        dict: Table name -> pd.DataFrame.
+    """
+    input_dir = Path(input_dir)
+    columns = columns or {}
+    columnar_path = input_dir / COLUMNAR_DATABASE_FILENAME
+    database = ColumnarReactionDatabase(columnar_path) if columnar_path.exists() else None
+
+    data_dict = {}
+    for table in tables:
+        table_columns = columns.get(table)
+        if database is not None and table in HISTORY_TABLES:
+            data_dict[table] = database.history_table(table, table_columns, index_col)
+            continue
+        if table == CONTEXT_NAMES_TABLE:
+            if database is not None:
+                data_dict[table] = database.context_names(table_columns, index_col)
+            else:
+                context_history = pd.read_csv(input_dir / 'context_history.csv', index_col=index_col)
+                context_names = context_names_from_history(context_history)
+                data_dict[table] = context_names if table_columns is None else context_names[list(table_columns)]
+            continue
+        table_data = pd.read_csv(input_dir / f'{table}.csv', index_col=index_col)
+        data_dict[table] = table_data if table_columns is None else table_data[list(table_columns)]
+    return data_dict
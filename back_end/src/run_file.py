@@ -1,6 +1,7 @@
 from pathlib import Path
 import pandas as pd
 import sys
+import os
 
 # Dynamically get the backend path relative to this file
 current_file = Path(__file__).resolve()
@@ -15,12 +16,45 @@ from src.utils.utils import *
 from src.data_cleaning import *
 from src.all_linkages import *
 from src.building_blocks import *
+from src.reaction_database import *
+from src.containment_matrices import build_containment_matrices
 
 # =========================================================
 # Run tests to ensure the code is working correctly
 # This section runs tests to validate the functionality of the code.
 # =========================================================
 
+# Compare the single-pass engine against the recursive dictionary traversal
+# for every reaction reachable from the reaction database acceptors
+fast_path_mismatches = compare_fast_path_with_reference(
+    acceptor_list=[histag_ubi_ubq_1, histag_ubi_ubq_1_K48_aboc, histag_ubi_ubq_1_K63_aboc],
+    donor_list=[ubi_ubq_1_K48_SMAC, ubi_ubq_1_K63_SMAC, ubi_ubq_1_K48_SMAC_K63_ABOC, ubi_ubq_1_K48_ABOC_K63_SMAC, ubi_ubq_1_K48_ABOC_K63_ABOC],
+    largest_multimer_size=4
+)
+if fast_path_mismatches:
+    raise ValueError(
+        "Single-pass engine does not match the reference traversal:\n" + "\n".join(fast_path_mismatches)
+    )
+
+# Compare the species-graph path enumeration and path counts with the reaction histories
+# (run on the size-4 histories that save_reaction_database() expands below)
+def compare_reaction_network(
+        reaction_history_leaves: list,
+        acceptor_list: list,
+        donor_list: list,
+        multimer_size: int,
+        transition_cache: TransitionCache | None = None
+    ):
+    reaction_network = build_reaction_network(acceptor_list, donor_list, multimer_size, transition_cache=transition_cache)
+    if reaction_network.count_paths() != len(reaction_history_leaves):
+        raise ValueError(
+            f"Reaction network path count {reaction_network.count_paths()} does not match "
+            f"the {len(reaction_history_leaves)} reaction histories"
+        )
+    for leaf, network_history in zip(reaction_history_leaves, reaction_network.iter_histories()):
+        if str(network_history) != str(leaf.to_history_dict()):
+            raise ValueError("Reaction network paths do not match the reaction histories")
+
 # =========================================================
 # Build reactionm database for polyubiquitins
 # This section creates a reaction database for polyubiquitin reactions.
@@ -30,19 +64,27 @@ from src.building_blocks import *
 def save_reaction_database(
         acceptor_list: list, 
         donor_list: list,
-        multimer_size: int = 2
+        multimer_size: int = 2,
+        transition_cache: TransitionCache | None = None,
+        check_reaction_network: bool = False
     ):
     
     column_names = get_multimer_column_names(multimer_size)
 
-    reaction_histories = create_reaction_histories(acceptor_list, donor_list, multimer_size)
+    # Expand histories across worker processes when more than one CPU is available
+    reaction_history_leaves = create_reaction_history_trie(
+        acceptor_list, donor_list, multimer_size, parallel=(os.cpu_count() or 1) > 1,
+        transition_cache=transition_cache
+    )
+
+    if check_reaction_network:
+        compare_reaction_network(reaction_history_leaves, acceptor_list, donor_list, multimer_size, transition_cache)
 
-    df = pd.DataFrame(reaction_histories)
-    # Expand each list in column 'A' into its own columns
-    ubiquitin_history = pd.DataFrame(df['ubiquitin_history'].to_list(), columns=column_names)
-    reaction_history = pd.DataFrame(df['reaction_history'].to_list(), columns=column_names)
-    donor_history = pd.DataFrame(df['donor_history'].to_list(), columns=column_names)
-    context_history = pd.DataFrame(df['context_history'].to_list(), columns=column_names)
+    # Export the flat per-path tables from the history trie
+    ubiquitin_history = pd.DataFrame(iter_history_table(reaction_history_leaves, 'ubiquitin_history'), columns=column_names)
+    reaction_history = pd.DataFrame(iter_history_table(reaction_history_leaves, 'reaction_history'), columns=column_names)
+    donor_history = pd.DataFrame(iter_history_table(reaction_history_leaves, 'donor_history'), columns=column_names)
+    context_history = pd.DataFrame(iter_history_table(reaction_history_leaves, 'context_history'), columns=column_names)
 
     # Save each expanded DataFrame as a CSV file to a relative folder
     output_dir = project_root / 'back_end' / 'data' / 'reaction_database' / f'multimer_size_{multimer_size}'
@@ -54,27 +96,25 @@ def save_reaction_database(
     donor_history.to_csv(output_dir / "donor_history.csv", index=False)
     context_history.to_csv(output_dir / "context_history.csv", index=False)
 
+    # Save the columnar copy read by load_reaction_database()
+    save_columnar_reaction_database(output_dir, ubiquitin_history, reaction_history, donor_history, context_history)
+
 
 # Define the acceptor and donor lists
-acceptor_list = [
-        histag_ubi_ubq_1,
-        histag_ubi_ubq_1_K48_aboc,
-        histag_ubi_ubq_1_K63_aboc
-        ]
-donor_list = [
-        ubi_ubq_1_K48_SMAC,
-        ubi_ubq_1_K63_SMAC,
-        ubi_ubq_1_K48_SMAC_K63_ABOC,
-        ubi_ubq_1_K48_ABOC_K63_SMAC,
-        ubi_ubq_1_K48_ABOC_K63_ABOC
-        ]
+acceptor_list = list(REACTION_DATABASE_ACCEPTORS)
+donor_list = list(REACTION_DATABASE_DONORS)
+
+# Share reaction outcomes between sizes; each size replays the shorter paths
+reaction_transition_cache = TransitionCache()
 
 # Save reaction database for multimer sizes 2 to 6
 for i in range(2,6): 
     save_reaction_database(
         acceptor_list=acceptor_list, 
         donor_list=donor_list, 
-        multimer_size=i
+        multimer_size=i,
+        transition_cache=reaction_transition_cache,
+        check_reaction_network=(i == 4)
     )
 
 # =========================================================
@@ -88,10 +128,8 @@ multimers = initialize_multimer_dicts(histag_ubi_ubq_1)
 # Build multimers of increasing size
 for multimer_size in range(2, 6):
     # Expand the multimer list by adding new ubiquitins
-    multimers = defining_json_multimers(multimers, ubi_ubq_1)
-
-    # Remove duplicate entries from the multimer dictionary
-    delete_duplicate_multimers(multimers)
+    # (duplicates are discarded while building)
+    multimers = defining_json_multimers(multimers, ubi_ubq_1, deduplicate=True)
 
     # Convert the dictionary to a DataFrame
     multimers_df = pd.DataFrame(multimers)
@@ -118,6 +156,15 @@ for multimer_size in range(2, 6):
 indexed_values_tetramers, tetarmer_validation_errors = run_script_pulling_indexes_validataing(4, ubiquitin_library)
 indexed_values_pentamers, pentamer_validation_errors = run_script_pulling_indexes_validataing(5, ubiquitin_library)
 
+# The columnar files must load exactly like the CSVs they accompany (with and without index_col)
+for database_name in ('reaction_database', 'filtered_reaction_database'):
+    for multimer_size in (4, 5):
+        columnar_mismatches = compare_columnar_with_csv(
+            project_root / 'back_end' / 'data' / database_name / f'multimer_size_{multimer_size}'
+        )
+        if columnar_mismatches:
+            raise ValueError("Columnar reaction database does not match the CSVs:\n" + "\n".join(columnar_mismatches))
+
 # =========================================================
 # Ensure the the building of multimers and reaction database is correct by looking at tetremers
 # and pentamers
@@ -239,6 +286,14 @@ build_all_linkages_multimers(
     project_root_=project_root
 )
 
+# =========================================================
+# Precompute the subgraph containment matrices
+# This section counts every n-level multimer in every higher-level multimer once,
+# for the analyze-subgraphs and reaction-path-statistics endpoints.
+# =========================================================
+
+build_containment_matrices(project_root)
+
 # =========================================================
 
 print("All tests passed successfully. Reaction database and multimers built correctly.")
@@ -6,6 +6,9 @@ import sys
 import logging
 from typing import Dict, List, Any, Union
 import sys
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 from pathlib import Path
 
@@ -20,27 +23,24 @@ from src.main import *
 from src.utils.utils import *
 from src.building_blocks import *
 
-def simulate_E2_steps(
-    history_dict: dict,
-    donor_list: list
-) -> list[dict]:
+def transition_requests(step_type: str, donor_list: list = None) -> list[tuple]:
     """
-    Simulate reactions for a donor list at K48 or K63 sites.
+    List the (donor, reaction) pairs tried for one deprotection or E2 step, in order.
 
     Args:
-        history_dict (dict): Dictionary containing:
-            - 'ubiquitin_history' (list): List of previously accepted protein states.
-            - 'reaction_history' (list): List of past reactions applied.
-            - 'donor_history' (list): List of ubiquitin monomers used.
-            - 'context_history' (list): List of contexts.
-        donor_list (list): Available monomers to test in reactions.
+        step_type (str): 'deprot' or 'E2'.
+        donor_list (list): Available monomers for E2 steps.
 
     Returns:
-        list[dict]: List of new history dictionaries generated from the reactions.
+        list[tuple]: (donor, reaction) pairs.
     """
-    reaction_types = ['K48', 'K63']
-    results = []
+    if step_type == 'deprot':
+        return [('', 'SMAC_deprot'), ('', 'FAKE_deprot')]
+    if step_type != 'E2':
+        raise ValueError(f"Invalid step_type: {step_type}. Must be 'deprot' or 'E2'")
 
+    reaction_types = ['K48', 'K63']
+    requests = []
     for reaction in reaction_types:
         for monomer in donor_list:
             # Skip incompatible donor-reaction pairs; the self-reaction is not allowed.
@@ -52,31 +52,194 @@ def simulate_E2_steps(
                 ((monomer == ubi_ubq_1_K63_SMAC) and (reaction == "K48"))
             ):
                 continue
-            reactant_acceptor = history_dict['ubiquitin_history'][-1]
-            product_multimer, product_context = ubiquitin_simulation(reactant_acceptor, monomer, reaction)
+            requests.append((monomer, reaction))
+    return requests
 
-            # If one the chain number does not increase by 1, then no ubiquitin was added or more than 1 ubiquitin was added 
-            reactant_context = history_dict['context_history'][-1]
-            if int(product_context['max_chain_number']) != (int(reactant_context['max_chain_number']) + 1):
-                continue
 
-            # LAST TODO 
-            # Apply the enzyme choice using new context and old context
-            enzyme = assign_correct_E2_enzyme(reactant_context, product_context)
+def compute_transition(
+    reactant_acceptor: dict,
+    reactant_context: dict,
+    donor: dict | str,
+    reaction: str
+) -> tuple:
+    """
+    Run one reaction on one acceptor and decide whether it is a valid synthesis step.
 
-            results.append({
-                'ubiquitin_history': history_dict['ubiquitin_history'] + [product_multimer],
-                'reaction_history': history_dict['reaction_history'] + [enzyme],
-                'donor_history': history_dict['donor_history'] + [monomer],
-                'context_history': history_dict['context_history'] + [product_context]
-            })
+    Args:
+        reactant_acceptor (dict): The current protein state.
+        reactant_context (dict): Context of the current protein state.
+        donor (dict | str): Donor for K48/K63 reactions, '' for deprotections.
+        reaction (str): 'K48', 'K63', 'SMAC_deprot' or 'FAKE_deprot'.
 
-    return results
+    Returns:
+        tuple: (product_multimer, product_context, label, valid), where label is the
+            assigned enzyme for E2 reactions and the reaction name for deprotections.
+    """
+    product_multimer, product_context = ubiquitin_simulation(reactant_acceptor, donor, reaction)
 
+    if reaction in ('K48', 'K63'):
+        # If one the chain number does not increase by 1, then no ubiquitin was added or more than 1 ubiquitin was added 
+        if int(product_context['max_chain_number']) != (int(reactant_context['max_chain_number']) + 1):
+            return product_multimer, product_context, None, False
 
-def simulate_deprot_steps(history_dict: dict) -> list[dict]:
+        # LAST TODO 
+        # Apply the enzyme choice using new context and old context
+        enzyme = assign_correct_E2_enzyme(reactant_context, product_context)
+        return product_multimer, product_context, enzyme, True
+
+    # Check if the reaction is SMAC and if there is no change in the reaction
+    # If so, skip this reaction
+    if reaction == 'SMAC_deprot' and str(product_multimer) == str(reactant_acceptor):
+        return product_multimer, product_context, reaction, False
+    return product_multimer, product_context, reaction, True
+
+
+def E2_steps(
+    reactant_acceptor: dict,
+    reactant_context: dict,
+    donor_list: list
+) -> list[tuple]:
     """
-    Simulate SMAC deprotection and buffer wash reactions.
+    Compute the valid K48/K63 reaction steps of one acceptor for a donor list.
+
+    Args:
+        reactant_acceptor (dict): The current protein state.
+        reactant_context (dict): Context of the current protein state.
+        donor_list (list): Available monomers to test in reactions.
+
+    Returns:
+        list[tuple]: (product_multimer, enzyme, donor, product_context) per valid step,
+            in reaction then donor order.
+    """
+    steps = []
+    for monomer, reaction in transition_requests('E2', donor_list):
+        product_multimer, product_context, enzyme, valid = compute_transition(
+            reactant_acceptor, reactant_context, monomer, reaction
+        )
+        if valid:
+            steps.append((product_multimer, enzyme, monomer, product_context))
+    return steps
+
+
+def deprot_steps(reactant_acceptor: dict) -> list[tuple]:
+    """
+    Compute the SMAC deprotection and buffer wash steps of one acceptor.
+
+    Args:
+        reactant_acceptor (dict): The current protein state.
+
+    Returns:
+        list[tuple]: (product_multimer, reaction, donor, product_context) per step.
+    """
+    steps = []
+    for donor, reaction in transition_requests('deprot'):
+        product_multimer, product_context, label, valid = compute_transition(
+            reactant_acceptor, None, donor, reaction
+        )
+        if valid:
+            steps.append((product_multimer, label, donor, product_context))
+    return steps
+
+
+# =========================================
+# Transition cache
+# Many synthesis paths reach the same intermediate species, so the outcome of a
+# reaction is stored once per (species, donor, reaction) and reused.
+# =========================================
+
+class TransitionCache:
+    """
+    Bounded LRU table of reaction outcomes keyed by (species key, donor key, reaction).
+
+    Values are (product key, product, product context, label, valid), so every path
+    taking the same transition shares one product dictionary and context.
+
+    Attributes:
+        maxsize (int): Maximum number of transitions kept.
+        hits (int): Transitions served from the table.
+        misses (int): Transitions that had to be simulated.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._transitions = OrderedDict()
+
+    def __len__(self):
+        return len(self._transitions)
+
+    def __contains__(self, key):
+        return key in self._transitions
+
+    @staticmethod
+    def species_key(ubiquitin):
+        """Canonical species id: topology key for canonical structures, sorted JSON otherwise."""
+        return duplicate_marker(ubiquitin)
+
+    @staticmethod
+    def donor_key(donor):
+        return donor if isinstance(donor, str) else duplicate_marker(donor)
+
+    def get(self, key):
+        """Return the cached transition or None, updating the counters."""
+        value = self._transitions.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._transitions.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, product_multimer, product_context, label, valid):
+        """Store a transition; the least recently used one is dropped beyond maxsize."""
+        value = (self.species_key(product_multimer), product_multimer, product_context, label, valid)
+        self._transitions[key] = value
+        self._transitions.move_to_end(key)
+        while len(self._transitions) > self.maxsize:
+            self._transitions.popitem(last=False)
+        return value
+
+    def resolve(self, key, reactant_acceptor, reactant_context, donor, reaction):
+        """Return the transition for key, simulating and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, *compute_transition(reactant_acceptor, reactant_context, donor, reaction))
+        return value
+
+    def clear(self):
+        self._transitions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'transitions': len(self._transitions),
+            'maxsize': self.maxsize
+        }
+
+
+def extend_history(history_dict: dict, step: tuple) -> dict:
+    """
+    Return a new history dictionary with one (product, reaction, donor, context) step appended.
+    """
+    product_multimer, reaction, donor, product_context = step
+    return {
+        'ubiquitin_history': history_dict['ubiquitin_history'] + [product_multimer],
+        'reaction_history': history_dict['reaction_history'] + [reaction],
+        'donor_history': history_dict['donor_history'] + [donor],
+        'context_history': history_dict['context_history'] + [product_context]
+    }
+
+
+def simulate_E2_steps(
+    history_dict: dict,
+    donor_list: list
+) -> list[dict]:
+    """
+    Simulate reactions for a donor list at K48 or K63 sites.
 
     Args:
         history_dict (dict): Dictionary containing:
@@ -84,32 +247,31 @@ def simulate_deprot_steps(history_dict: dict) -> list[dict]:
             - 'reaction_history' (list): List of past reactions applied.
             - 'donor_history' (list): List of ubiquitin monomers used.
             - 'context_history' (list): List of contexts.
+        donor_list (list): Available monomers to test in reactions.
 
     Returns:
         list[dict]: List of new history dictionaries generated from the reactions.
     """
-    reaction_list = ['SMAC_deprot', 'FAKE_deprot']
-    results = []
+    steps = E2_steps(history_dict['ubiquitin_history'][-1], history_dict['context_history'][-1], donor_list)
+    return [extend_history(history_dict, step) for step in steps]
 
-    for reaction in reaction_list:
-        reactant_acceptor = history_dict['ubiquitin_history'][-1]
-        product_multimer, product_context = ubiquitin_simulation(reactant_acceptor, '', reaction)
 
-        # Check if the reaction is SMAC and if there is no change in the reaction
-        if reaction == 'SMAC_deprot':
-            # Check if the reaction is SMAC and if there is no change in the reaction
-            # If so, skip this reaction
-            if str(product_multimer) == str(reactant_acceptor):
-                continue
-        
-        results.append({
-            'ubiquitin_history': history_dict['ubiquitin_history'] + [product_multimer],
-            'reaction_history': history_dict['reaction_history'] + [reaction],
-            'donor_history': history_dict['donor_history'] + [''],
-            'context_history': history_dict['context_history'] + [product_context]
-        })
+def simulate_deprot_steps(history_dict: dict) -> list[dict]:
+    """
+    Simulate SMAC deprotection and buffer wash reactions.
 
-    return results
+    Args:
+        history_dict (dict): Dictionary containing:
+            - 'ubiquitin_history' (list): List of previously accepted protein states.
+            - 'reaction_history' (list): List of past reactions applied.
+            - 'donor_history' (list): List of ubiquitin monomers used.
+            - 'context_history' (list): List of contexts.
+
+    Returns:
+        list[dict]: List of new history dictionaries generated from the reactions.
+    """
+    steps = deprot_steps(history_dict['ubiquitin_history'][-1])
+    return [extend_history(history_dict, step) for step in steps]
 
 
 def assign_enzyme(reaction, elongation_or_branching):
@@ -348,10 +510,266 @@ def assign_correct_E2_enzyme(
 
     return enzyme
 
+# =========================================
+# Reaction history trie
+# Each HistoryNode holds one step (product, reaction, donor, context) and a
+# pointer to the step before it, so paths share their common prefixes. The flat
+# per-path lists are only built when exported.
+# =========================================
+
+class HistoryNode:
+    """
+    One step of a synthesis path in the reaction history trie.
+    """
+    __slots__ = ('ubiquitin', 'reaction', 'donor', 'context', 'parent', 'depth')
+
+    def __init__(self, ubiquitin, reaction, donor, context, parent=None):
+        self.ubiquitin = ubiquitin
+        self.reaction = reaction
+        self.donor = donor
+        self.context = context
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    def __repr__(self):
+        return f"HistoryNode(depth={self.depth}, reaction={self.reaction!r})"
+
+    def path(self) -> list:
+        """Return the nodes from the acceptor to this step."""
+        nodes = [None] * (self.depth + 1)
+        node = self
+        while node is not None:
+            nodes[node.depth] = node
+            node = node.parent
+        return nodes
+
+    def column(self, field: str) -> list:
+        """Return one field ('ubiquitin', 'reaction', 'donor' or 'context') along the path."""
+        return [getattr(node, field) for node in self.path()]
+
+    def to_history_dict(self) -> dict:
+        """Export the path in the flat history dictionary format."""
+        path = self.path()
+        return {
+            'ubiquitin_history': [node.ubiquitin for node in path],
+            'reaction_history': [node.reaction for node in path],
+            'donor_history': [node.donor for node in path],
+            'context_history': [node.context for node in path]
+        }
+
+
+HISTORY_COLUMNS = {
+    'ubiquitin_history': 'ubiquitin',
+    'reaction_history': 'reaction',
+    'donor_history': 'donor',
+    'context_history': 'context'
+}
+
+
+def iter_history_table(leaves: list, history_column: str):
+    """
+    Lazily yield one flat row per path for a history column.
+
+    Args:
+        leaves (list): Final HistoryNodes of the paths.
+        history_column (str): 'ubiquitin_history', 'reaction_history', 'donor_history' or 'context_history'.
+
+    Yields:
+        list: The column values along each path, in leaf order.
+    """
+    field = HISTORY_COLUMNS[history_column]
+    for leaf in leaves:
+        yield leaf.column(field)
+
+
+# =========================================
+# Parallel expansion of reaction histories
+# Workers only receive the last (ubiquitin, context) of each history and return
+# the steps; the trie is extended in the parent process in input order, so the
+# output is identical to the serial loop.
+# =========================================
+
+def _E2_steps_chunk(chunk, donor_list):
+    return [E2_steps(acceptor, context, donor_list) for acceptor, context in chunk]
+
+
+def _deprot_steps_chunk(chunk):
+    return [deprot_steps(acceptor) for acceptor, _ in chunk]
+
+
+def _transitions_chunk(chunk):
+    return [compute_transition(*request) for request in chunk]
+
+
+def process_pool_context():
+    """
+    Multiprocessing context of the batch process pools (simulation and subgraph
+    containment). Prefers fork so workers inherit the loaded modules; run_file.py
+    has no __main__ guard and would be re-executed by spawned workers.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def _expand_history_nodes_cached(frontier, step_type, donors, executor, chunk_size, cache):
+    """
+    Cached form of expand_history_nodes(): only transitions missing from the cache
+    are simulated (in the pool if one is given), each once per level.
+    """
+    requests = [
+        (donor, reaction, cache.donor_key(donor))
+        for donor, reaction in transition_requests(step_type, donors)
+    ]
+    species_keys = [cache.species_key(node.ubiquitin) for node in frontier]
+
+    # Look up every distinct transition of this level once
+    resolved = {}
+    missing = {}
+    for node, species_key in zip(frontier, species_keys):
+        for donor, reaction, donor_key in requests:
+            key = (species_key, donor_key, reaction)
+            if key in resolved or key in missing:
+                continue
+            value = cache.get(key)
+            if value is None:
+                missing[key] = (node.ubiquitin, node.context, donor, reaction)
+            else:
+                resolved[key] = value
+
+    missing_keys = list(missing)
+    missing_requests = [missing[key] for key in missing_keys]
+    if executor is None or len(missing_requests) <= chunk_size:
+        outcomes = _transitions_chunk(missing_requests)
+    else:
+        chunks = [missing_requests[i:i + chunk_size] for i in range(0, len(missing_requests), chunk_size)]
+        outcomes = [outcome for chunk_outcomes in executor.map(_transitions_chunk, chunks) for outcome in chunk_outcomes]
+    for key, outcome in zip(missing_keys, outcomes):
+        resolved[key] = cache.put(key, *outcome)
+
+    new_frontier = []
+    for node, species_key in zip(frontier, species_keys):
+        for donor, reaction, donor_key in requests:
+            _, product_multimer, product_context, label, valid = resolved[(species_key, donor_key, reaction)]
+            if valid:
+                new_frontier.append(HistoryNode(product_multimer, label, donor, product_context, parent=node))
+    return new_frontier
+
+
+def expand_history_nodes(
+        frontier: list,
+        step_type: str,
+        donors: list = None,
+        executor: ProcessPoolExecutor | None = None,
+        chunk_size: int = 64,
+        cache: TransitionCache | None = None
+    ) -> list:
+    """
+    Expand every path of the frontier by one deprotection or E2 step.
+
+    Args:
+        frontier (list): Current HistoryNode leaves.
+        step_type (str): 'deprot' or 'E2'.
+        donors (list): Donors for E2 steps.
+        executor (ProcessPoolExecutor): Optional pool; the frontier is sent in chunks of chunk_size.
+        chunk_size (int): Number of paths per worker task.
+        cache (TransitionCache): Optional transition cache consulted before simulating.
+
+    Returns:
+        list: The new HistoryNode leaves, in the same order as the serial loop.
+    """
+    if step_type not in ('deprot', 'E2'):
+        raise ValueError(f"Invalid step_type: {step_type}. Must be 'deprot' or 'E2'")
+
+    if cache is not None:
+        return _expand_history_nodes_cached(frontier, step_type, donors, executor, chunk_size, cache)
+
+    reactants = [(node.ubiquitin, node.context) for node in frontier]
+
+    if executor is None or len(reactants) <= chunk_size:
+        if step_type == 'E2':
+            steps_per_node = _E2_steps_chunk(reactants, donors)
+        else:
+            steps_per_node = _deprot_steps_chunk(reactants)
+    else:
+        chunks = [reactants[i:i + chunk_size] for i in range(0, len(reactants), chunk_size)]
+        if step_type == 'E2':
+            chunk_results = executor.map(_E2_steps_chunk, chunks, [donors] * len(chunks))
+        else:
+            chunk_results = executor.map(_deprot_steps_chunk, chunks)
+        # executor.map yields in submission order, which keeps the merge deterministic
+        steps_per_node = [steps for chunk_steps in chunk_results for steps in chunk_steps]
+
+    return [
+        HistoryNode(*step, parent=node)
+        for node, steps in zip(frontier, steps_per_node)
+        for step in steps
+    ]
+
+
+def create_reaction_history_trie(
+        acceptors: list,
+        donors: list,
+        multimer_size: int = 2,
+        parallel: bool = False,
+        max_workers: int | None = None,
+        chunk_size: int = 64,
+        transition_cache: TransitionCache | None = None
+    ) -> list:
+    """
+    Create synthesis paths for acceptors and donors as a reaction history trie.
+
+    Args:
+        acceptors (list): List of acceptor proteins.
+        donors (list): List of donor proteins.
+        multimer_size (int): Maximum size of the ubiquitin chain to be synthesized.
+        parallel (bool): Expand each level across a ProcessPoolExecutor. The output order
+                         is the same as the serial loop.
+        max_workers (int): Number of worker processes (defaults to the CPU count).
+        chunk_size (int): Number of paths sent to a worker per task.
+        transition_cache (TransitionCache): Optional cache of reaction outcomes; pass the
+                         same instance to several calls to reuse the shorter multimers.
+
+    Returns:
+        list: The final HistoryNode of every path, in the order of create_reaction_histories().
+    """
+    # Initialize the trie roots from acceptors
+    frontier = []
+    for input_acceptor in acceptors:
+        acceptor, context = iterate_through_ubiquitin(input_acceptor)
+        frontier.append(HistoryNode(acceptor, '', '', context))
+
+    executor = None
+    if parallel and multimer_size > 2:
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context())
+
+    try:
+        # Initial E2 reactions
+        frontier = expand_history_nodes(frontier, 'E2', donors, executor, chunk_size, transition_cache)
+
+        # Alternate deprotection and E2 steps until desired multimer size
+        for step in range(2, multimer_size):
+
+            # Apply deprotection reactions
+            frontier = expand_history_nodes(frontier, 'deprot', None, executor, chunk_size, transition_cache)
+
+            # Apply E2 reactions
+            frontier = expand_history_nodes(frontier, 'E2', donors, executor, chunk_size, transition_cache)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return frontier
+
+
 def create_reaction_histories(
         acceptors: list,
         donors: list,
-        multimer_size: int = 2
+        multimer_size: int = 2,
+        parallel: bool = False,
+        max_workers: int | None = None,
+        chunk_size: int = 64,
+        transition_cache: TransitionCache | None = None
     ) -> list[dict]:
     """
     Create synthesis histories for acceptors and donors.
@@ -362,54 +780,204 @@ def create_reaction_histories(
         multimer_size (int): Maximum size of the ubiquitin chain to be synthesized.
                              The synthesis process iterates through E2 and deprotection reactions
                              until the specified multimer size is reached.
+        parallel (bool): Expand each level across a ProcessPoolExecutor. The output order
+                         is the same as the serial loop.
+        max_workers (int): Number of worker processes (defaults to the CPU count).
+        chunk_size (int): Number of histories sent to a worker per task.
+        transition_cache (TransitionCache): Optional cache of reaction outcomes.
 
     Returns:
-        list[dict]: Final list of synthesis history dictionaries.
+        list[dict]: Final list of synthesis history dictionaries, exported from
+            create_reaction_history_trie().
     """
-    # Initialize history dictionaries from acceptors
-    history_dicts = []
-    for input_acceptor in acceptors:
-        acceptor, context = iterate_through_ubiquitin(input_acceptor)
-        history_dicts.append({
-            'ubiquitin_history': [acceptor],
-            'reaction_history': [''],
-            'donor_history': [''],
-            'context_history': [context]
-        })
-
-    # Initial E2 reactions
-    expanded_histories = []
-    for history in history_dicts:
-        expanded_histories.extend(simulate_E2_steps(history, donors))
-    history_dicts = expanded_histories
+    leaves = create_reaction_history_trie(
+        acceptors, donors, multimer_size, parallel, max_workers, chunk_size, transition_cache
+    )
+    return [leaf.to_history_dict() for leaf in leaves]
 
-    # Alternate deprotection and E2 steps until desired multimer size
-    for step in range(2, multimer_size):
 
-        # Apply deprotection reactions
-        deprotection_results = []
-        for history in history_dicts:
-            deprotection_results.extend(simulate_deprot_steps(history))
-        history_dicts = deprotection_results
+# =========================================
+# Reaction network
+# The synthesis paths only differ in which species they pass through, so the
+# network is stored as a layered DAG of unique species per step. Path counts come
+# from dynamic programming over the layers and paths are only enumerated on demand.
+# =========================================
 
-        # Apply E2 reactions
-        elongation_results = []
-        for history in history_dicts:
-            elongation_results.extend(simulate_E2_steps(history, donors))
-        history_dicts = elongation_results
+REACTION_DATABASE_ACCEPTORS = [
+    histag_ubi_ubq_1,
+    histag_ubi_ubq_1_K48_aboc,
+    histag_ubi_ubq_1_K63_aboc
+]
+REACTION_DATABASE_DONORS = [
+    ubi_ubq_1_K48_SMAC,
+    ubi_ubq_1_K63_SMAC,
+    ubi_ubq_1_K48_SMAC_K63_ABOC,
+    ubi_ubq_1_K48_ABOC_K63_SMAC,
+    ubi_ubq_1_K48_ABOC_K63_ABOC
+]
 
-    return history_dicts
 
+def reaction_step_types(multimer_size: int) -> list[str]:
+    """Step types of a synthesis path: one E2 step, then deprotection and E2 pairs."""
+    return ['E2'] + ['deprot', 'E2'] * (multimer_size - 2)
 
 
-    
+class ReactionNetwork:
+    """
+    Layered DAG of the species reachable from the acceptors.
+
+    Attributes:
+        step_types (list): 'E2' or 'deprot' for each step.
+        roots (list): Species keys of the acceptors, in input order.
+        species (list): Per level, species key -> (ubiquitin, context).
+        edges (list): Per step, species key -> [(product key, label, donor), ...] in
+            the order create_reaction_histories() tries the reactions.
+    """
 
-    
+    def __init__(self, step_types: list):
+        self.step_types = list(step_types)
+        self.roots = []
+        self.species = [{}]
+        self.edges = []
+
+    def __repr__(self):
+        sizes = [len(level) for level in self.species]
+        return f"ReactionNetwork(steps={len(self.step_types)}, species_per_level={sizes})"
+
+    def completion_counts(self) -> list[dict]:
+        """
+        Number of paths from each species to the last level, per level.
+        """
+        counts = [None] * len(self.species)
+        counts[-1] = {key: 1 for key in self.species[-1]}
+        for level in range(len(self.edges) - 1, -1, -1):
+            next_counts = counts[level + 1]
+            counts[level] = {
+                key: sum(next_counts[product_key] for product_key, _, _ in edges)
+                for key, edges in self.edges[level].items()
+            }
+        return counts
+
+    def arrival_counts(self) -> list[dict]:
+        """
+        Number of paths from the acceptors to each species, per level.
+        """
+        counts = [dict.fromkeys(level, 0) for level in self.species]
+        for key in self.roots:
+            counts[0][key] += 1
+        for level, level_edges in enumerate(self.edges):
+            next_counts = counts[level + 1]
+            for key, edges in level_edges.items():
+                for product_key, _, _ in edges:
+                    next_counts[product_key] += counts[level][key]
+        return counts
+
+    def count_paths(self) -> int:
+        """Total number of synthesis paths, i.e. len(create_reaction_histories(...))."""
+        completion = self.completion_counts()[0]
+        return sum(completion[key] for key in self.roots)
+
+    def final_multimer_path_counts(self) -> dict:
+        """
+        Number of paths per final multimer, keyed like the 'final_multimer' column
+        of global_deprotection_dual(): str() of the globally deprotected product.
+        """
+        path_counts = {}
+        for key, count in self.arrival_counts()[-1].items():
+            if count == 0:
+                continue
+            ubiquitin, _ = self.species[-1][key]
+            final_multimer, _ = ubiquitin_simulation(ubiquitin, '', 'GLOBAL_deprot')
+            final_key = str(final_multimer)
+            path_counts[final_key] = path_counts.get(final_key, 0) + count
+        return path_counts
+
+    def iter_paths(self):
+        """
+        Yield every path as a list of (species key, label, donor) steps, depth first,
+        in the order of create_reaction_histories().
+        """
+        depth = len(self.edges)
+        for root in self.roots:
+            path = [(root, '', '')]
+            iterators = [iter(self.edges[0][root])] if depth else []
+            if not depth:
+                yield list(path)
+                continue
+            while iterators:
+                step = next(iterators[-1], None)
+                if step is None:
+                    iterators.pop()
+                    path.pop()
+                    continue
+                path.append(step)
+                if len(path) > depth:
+                    yield list(path)
+                    path.pop()
+                else:
+                    iterators.append(iter(self.edges[len(path) - 1][step[0]]))
 
+    def iter_histories(self):
+        """Yield the synthesis history dictionaries of create_reaction_histories()."""
+        for path in self.iter_paths():
+            steps = [self.species[level][key] for level, (key, _, _) in enumerate(path)]
+            yield {
+                'ubiquitin_history': [ubiquitin for ubiquitin, _ in steps],
+                'reaction_history': [label for _, label, _ in path],
+                'donor_history': [donor for _, _, donor in path],
+                'context_history': [context for _, context in steps]
+            }
 
 
+def build_reaction_network(
+        acceptors: list,
+        donors: list,
+        multimer_size: int = 2,
+        transition_cache: TransitionCache | None = None
+    ) -> ReactionNetwork:
+    """
+    Build the species graph of create_reaction_histories() without materialising paths.
 
+    Each unique species is expanded once per level, so the work grows with the
+    number of species instead of the number of paths.
 
+    Args:
+        acceptors (list): List of acceptor proteins.
+        donors (list): List of donor proteins.
+        multimer_size (int): Maximum size of the ubiquitin chain to be synthesized.
+        transition_cache (TransitionCache): Optional cache of reaction outcomes.
 
-            
+    Returns:
+        ReactionNetwork: The layered species DAG.
+    """
+    if transition_cache is None:
+        transition_cache = TransitionCache()
+    network = ReactionNetwork(reaction_step_types(multimer_size))
 
+    for input_acceptor in acceptors:
+        acceptor, context = iterate_through_ubiquitin(input_acceptor)
+        key = transition_cache.species_key(acceptor)
+        network.roots.append(key)
+        network.species[0].setdefault(key, (acceptor, context))
+
+    for level, step_type in enumerate(network.step_types):
+        requests = [
+            (donor, reaction, transition_cache.donor_key(donor))
+            for donor, reaction in transition_requests(step_type, donors)
+        ]
+        next_species = {}
+        level_edges = {}
+        for key, (ubiquitin, context) in network.species[level].items():
+            edges = []
+            for donor, reaction, donor_key in requests:
+                product_key, product_multimer, product_context, label, valid = transition_cache.resolve(
+                    (key, donor_key, reaction), ubiquitin, context, donor, reaction
+                )
+                if valid:
+                    next_species.setdefault(product_key, (product_multimer, product_context))
+                    edges.append((product_key, label, donor))
+            level_edges[key] = edges
+        network.edges.append(level_edges)
+        network.species.append(next_species)
+
+    return network
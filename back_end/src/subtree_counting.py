@@ -0,0 +1,283 @@
+import sys
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+"""
+SUBTREE COUNTING
+================
+
+Counting engine for subgraph containment of polyubiquitins. A multimer is a
+rooted out-tree whose edges (parent, lysine, child) are labelled by the lysine,
+so "how often does topology P occur in multimer T" is the number of node sets of
+T whose induced subgraph is isomorphic to P as a labelled directed graph. That
+set is a connected subtree of T, rooted at its topmost node.
+
+Instead of testing every node subset for isomorphism, the count is built by tree
+dynamic programming:
+
+    embeddings(p, v)    ways to map the subtree of pattern node p onto host
+                        subtrees rooted at v, edges and labels preserved; the
+                        children of p are assigned to distinct children of v
+                        with the same label (a bitmask DP over p's children)
+    occurrences         sum over v of embeddings(root(P), v), divided by the
+                        automorphisms of P (its embeddings into itself)
+
+Every occurring node set is the image of exactly |Aut(P)| embeddings, so the
+result equals the node-set count of all_linkages.n_in_higher_level_isomorphism().
+
+For a whole row of patterns (analyze_subgraph_containment) the host is walked
+once instead: canonical_form() gives every tree an AHU-style string with the
+lysine labels, subtree_canonical_counts() enumerates the connected subtrees of a
+host by size and canonical string, and PatternIndex turns each pattern of the
+row into a dictionary lookup.
+"""
+
+
+class NotAnOutTreeError(ValueError):
+    """Raised when an edge list is not a single rooted out-tree."""
+
+
+class RootedTree:
+    """
+    Rooted out-tree with labelled edges.
+
+    Args:
+        edges (list): (parent, label, child) edges, e.g. a context's conjugated_lysines.
+
+    Raises:
+        NotAnOutTreeError: If a node has two parents, the edges form a cycle or the
+            graph has more than one root.
+    """
+
+    def __init__(self, edges):
+        self.children = {}
+        parents = {}
+        for parent, label, child in edges:
+            if child in parents:
+                raise NotAnOutTreeError(f"Node {child!r} has more than one parent")
+            parents[child] = parent
+            self.children.setdefault(parent, []).append((label, child))
+            self.children.setdefault(child, [])
+
+        roots = [node for node in self.children if node not in parents]
+        if len(roots) != 1:
+            raise NotAnOutTreeError(f"Expected one root, found {len(roots)}")
+        self.root = roots[0]
+
+        # Children before parents, so DP tables can be filled bottom-up
+        order = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(child for _, child in self.children[node])
+        if len(order) != len(self.children):
+            raise NotAnOutTreeError("Edges do not form a single connected tree")
+        self.postorder = order[::-1]
+
+    def __repr__(self):
+        return f"RootedTree(root={self.root!r}, nodes={len(self)})"
+
+    def __len__(self):
+        return len(self.children)
+
+
+def _assignments(pattern_children, host_children, embeddings) -> int:
+    """
+    Ways to map every pattern child to a distinct host child with the same label,
+    weighted by the embeddings of the child subtrees.
+
+    Args:
+        pattern_children (list): (label, pattern node) of a pattern node.
+        host_children (list): (label, host node) of a host node.
+        embeddings (dict): (pattern node, host node) -> embeddings of the child subtrees.
+    """
+    if not pattern_children:
+        return 1
+    if len(pattern_children) > len(host_children):
+        return 0
+
+    # ways[mask]: assignments of the pattern children in mask to host children seen so far
+    full = (1 << len(pattern_children)) - 1
+    ways = {0: 1}
+    for host_label, host_child in host_children:
+        updated = dict(ways)
+        for mask, count in ways.items():
+            for position, (pattern_label, pattern_child) in enumerate(pattern_children):
+                bit = 1 << position
+                if mask & bit or pattern_label != host_label:
+                    continue
+                child_embeddings = embeddings.get((pattern_child, host_child), 0)
+                if child_embeddings:
+                    updated[mask | bit] = updated.get(mask | bit, 0) + count * child_embeddings
+        ways = updated
+    return ways.get(full, 0)
+
+
+def count_embeddings(pattern: RootedTree, host: RootedTree) -> dict:
+    """
+    Embeddings of the pattern's root subtree per host node.
+
+    Returns:
+        dict: Host node -> number of label-preserving embeddings of pattern that map
+            the pattern root to that node (nodes without any are left out).
+    """
+    embeddings = {}
+    for host_node in host.postorder:
+        host_children = host.children[host_node]
+        for pattern_node in pattern.postorder:
+            count = _assignments(pattern.children[pattern_node], host_children, embeddings)
+            if count:
+                embeddings[(pattern_node, host_node)] = count
+    return {host_node: count for (pattern_node, host_node), count in embeddings.items() if pattern_node == pattern.root}
+
+
+def count_automorphisms(tree: RootedTree) -> int:
+    """Label-preserving automorphisms of a rooted tree."""
+    return count_embeddings(tree, tree).get(tree.root, 0)
+
+
+def count_subtree_occurrences(host_edges, pattern_edges) -> int:
+    """
+    Number of node sets of the host tree whose induced subgraph is isomorphic to the
+    pattern tree (edge labels compared).
+
+    Args:
+        host_edges (list): (parent, label, child) edges of the higher-level multimer.
+        pattern_edges (list): (parent, label, child) edges of the n-level multimer.
+
+    Returns:
+        int: The occurrence count; 0 for an empty pattern.
+
+    Raises:
+        NotAnOutTreeError: If either edge list is not a rooted out-tree.
+    """
+    if not pattern_edges or not host_edges:
+        return 0
+    pattern = RootedTree(pattern_edges)
+    host = RootedTree(host_edges)
+    if len(pattern) > len(host):
+        return 0
+    embeddings = sum(count_embeddings(pattern, host).values())
+    return embeddings // count_automorphisms(pattern)
+
+
+# =========================================
+# Canonical forms
+# =========================================
+
+def canonical_form(tree: RootedTree, node=None) -> str:
+    """
+    AHU-style canonical string of a rooted labelled tree: '(' + the sorted
+    label + canonical string of every child + ')'. Two trees have the same string
+    exactly when they are isomorphic as rooted trees with edge labels.
+
+    Args:
+        tree (RootedTree): The tree.
+        node: Root of the subtree to encode (defaults to the tree root).
+    """
+    forms = {}
+    for current in tree.postorder:
+        forms[current] = '(' + ''.join(sorted(f'{label}{forms[child]}' for label, child in tree.children[current])) + ')'
+    return forms[tree.root if node is None else node]
+
+
+def subtree_canonical_counts(tree: RootedTree, max_size: int) -> dict:
+    """
+    Count the connected node sets of a tree with at most max_size nodes by their
+    canonical form.
+
+    Every connected set of a rooted tree has one topmost node; the sets topped at
+    a node are built from those of its children, so each set is produced once.
+
+    Returns:
+        dict: (size, canonical string) -> number of node sets.
+    """
+    # node -> {(size, sorted child parts): count} of the sets topped at node
+    topped = {}
+    counts = {}
+    for node in tree.postorder:
+        partial = {(1, ()): 1}
+        for label, child in tree.children[node]:
+            combined = dict(partial)
+            for (size, parts), count in partial.items():
+                for (child_size, child_form), child_count in topped[child].items():
+                    if size + child_size > max_size:
+                        continue
+                    key = (size + child_size, parts + (f'{label}{child_form}',))
+                    combined[key] = combined.get(key, 0) + count * child_count
+            partial = combined
+
+        topped[node] = {}
+        for (size, parts), count in partial.items():
+            form = '(' + ''.join(sorted(parts)) + ')'
+            topped[node][(size, form)] = topped[node].get((size, form), 0) + count
+            counts[(size, form)] = counts.get((size, form), 0) + count
+    return counts
+
+
+class PatternIndex:
+    """
+    Canonical forms of a set of n-level patterns, for counting all of them in a
+    higher-level multimer with one subtree enumeration.
+
+    Args:
+        patterns (list): (name, edges) pairs; rows are returned in this order.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = []
+        self.max_size = 0
+        for name, edges in patterns:
+            if not edges:
+                # An empty pattern never matches (like the isomorphism search)
+                self.patterns.append((name, edges, None))
+                continue
+            try:
+                tree = RootedTree(edges)
+            except NotAnOutTreeError:
+                self.patterns.append((name, edges, None))
+                continue
+            self.patterns.append((name, edges, (len(tree), canonical_form(tree))))
+            self.max_size = max(self.max_size, len(tree))
+
+    def __repr__(self):
+        return f"PatternIndex(patterns={len(self.patterns)}, max_size={self.max_size})"
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def count_row(self, host_edges, fallback=None) -> dict:
+        """
+        Occurrences of every pattern in one host.
+
+        Args:
+            host_edges (list): (parent, label, child) edges of the higher-level multimer.
+            fallback (callable): fallback(host_edges, pattern_edges) for a host or
+                pattern that is not an out-tree; such pairs count 0 without it.
+
+        Returns:
+            dict: Pattern name -> occurrence count, in pattern order.
+        """
+        counts = None
+        if host_edges:
+            try:
+                counts = subtree_canonical_counts(RootedTree(host_edges), self.max_size)
+            except NotAnOutTreeError:
+                counts = None
+
+        row = {}
+        for name, edges, key in self.patterns:
+            if host_edges and edges and (counts is None or key is None):
+                row[name] = fallback(host_edges, edges) if fallback is not None else 0
+            elif counts is None or key is None:
+                row[name] = 0
+            else:
+                row[name] = counts.get(key, 0)
+        return row
@@ -0,0 +1,171 @@
+import importlib
+import io
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+logger = logging.getLogger(__name__)
+
+"""
+STARTUP WARM-UP
+===============
+
+Pays the one-off costs of the API once per process instead of on the first request:
+
+    imports       pandas, numpy, matplotlib, networkx and the src modules, timed
+                  one by one (each time excludes modules imported before it)
+    matplotlib    non-interactive Agg backend, font cache and a first PNG render;
+                  process workers also build their plate_renderer templates
+    data          DataRegistry.preload() of the files the endpoints read
+
+fast_api.py imports through import_modules() at module load and calls
+warm_matplotlib() and the data preload in its lifespan handler; process workers of
+worker_pools.py run initialize_worker() when they start. The breakdowns are kept
+in the report returned by startup_report().
+"""
+
+WARMUP_MODULES = (
+    'numpy',
+    'pandas',
+    'matplotlib.pyplot',
+    'networkx',
+    'src.compact_ubiquitin',
+    'src.main',
+    'src.simulation',
+    'src.data_cleaning',
+    'src.all_linkages',
+    'src.nomenclature',
+    'src.plotting',
+    'src.plate_renderer',
+    'src.reaction_database',
+    'src.data_registry'
+)
+
+_report = {"imports": {}, "matplotlib": None, "plate_templates": None, "data": None}
+
+
+def _use_agg_backend():
+    # The API only renders to buffers; select Agg before pyplot is first imported
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+
+
+def import_modules(modules: tuple = WARMUP_MODULES) -> dict:
+    """
+    Import modules in order and record the seconds each one took.
+
+    Returns:
+        dict: Module name -> import seconds (0.0 when it was already imported).
+    """
+    _use_agg_backend()
+    timings = {}
+    for module in modules:
+        start_time = time.perf_counter()
+        importlib.import_module(module)
+        timings[module] = round(time.perf_counter() - start_time, 4)
+    _report["imports"].update(timings)
+    return timings
+
+
+def warm_matplotlib() -> float:
+    """
+    Load the font cache and render one PNG so the first plate figure starts warm.
+
+    Returns:
+        float: Seconds taken.
+    """
+    _use_agg_backend()
+    start_time = time.perf_counter()
+    from matplotlib import font_manager
+    from matplotlib.figure import Figure
+
+    font_manager.fontManager.findfont(font_manager.FontProperties())
+    figure = Figure(figsize=(1, 1))
+    axes = figure.add_subplot()
+    axes.scatter([0, 1], [0, 1], c=[0, 1])
+    axes.text(0.5, 0.5, 'Ub')
+    figure.savefig(io.BytesIO(), format='png', bbox_inches='tight')
+
+    seconds = round(time.perf_counter() - start_time, 4)
+    _report["matplotlib"] = seconds
+    return seconds
+
+
+def build_plate_templates() -> float:
+    """
+    Build the plate map templates of the calling thread.
+
+    Returns:
+        float: Seconds taken.
+    """
+    from src.plate_renderer import build_plate_templates as build_templates
+
+    start_time = time.perf_counter()
+    build_templates()
+    seconds = round(time.perf_counter() - start_time, 4)
+    _report["plate_templates"] = seconds
+    return seconds
+
+
+def preload_data(**preload_kwargs) -> float:
+    """
+    Preload the DataRegistry of this process.
+
+    Returns:
+        float: Seconds taken.
+    """
+    from src.data_registry import get_data_registry
+
+    start_time = time.perf_counter()
+    get_data_registry().preload(**preload_kwargs)
+    seconds = round(time.perf_counter() - start_time, 4)
+    _report["data"] = seconds
+    return seconds
+
+
+def warm_up(preload: bool = True) -> dict:
+    """
+    Run every warm-up step and return the report of this process.
+    """
+    import_modules()
+    warm_matplotlib()
+    build_plate_templates()
+    if preload:
+        preload_data()
+    return startup_report()
+
+
+def initialize_worker():
+    """
+    ProcessPoolExecutor initializer: warm up a worker before its first job.
+    """
+    try:
+        warm_up()
+    except Exception as e:
+        # A missing data file must not stop the worker; jobs report their own errors
+        logger.warning(f"Worker {os.getpid()} warm-up incomplete: {e}")
+
+
+def startup_report() -> dict:
+    """
+    Import, matplotlib and data warm-up seconds of this process.
+    """
+    imports = dict(_report["imports"])
+    return {
+        "pid": os.getpid(),
+        "imports": imports,
+        "import_seconds": round(sum(imports.values()), 4),
+        "matplotlib_seconds": _report["matplotlib"],
+        "plate_template_seconds": _report["plate_templates"],
+        "data_seconds": _report["data"]
+    }
@@ -0,0 +1,305 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+# Dynamically get the backend path relative to this file
+current_file = Path(__file__).resolve()
+project_root = current_file.parents[2]  # Go up to project root
+sys.path.insert(0, str(project_root))
+local_path = project_root / 'back_end'
+sys.path.insert(0, str(local_path))
+
+logger = logging.getLogger(__name__)
+
+"""
+WORKER POOLS
+============
+
+Execution layer of the API. Handlers await their synchronous work on a bounded
+pool instead of running it on the event loop:
+
+    cpu     ProcessPoolExecutor for pandas / matplotlib / networkx jobs
+            (subgraph analysis, plate generation, reaction-path statistics)
+    io      ThreadPoolExecutor for file loading and short lookups
+
+Each pool admits at most workers + max_queued jobs; further submissions raise
+PoolSaturatedError, which the API turns into 503 so an overloaded server answers
+quickly instead of queueing without bound. Pool sizes are read from the
+environment:
+
+    UBIQUITIN_CPU_WORKERS       default: CPU count - 1 (at least 1)
+    UBIQUITIN_CPU_MAX_QUEUED    default: 8
+    UBIQUITIN_IO_WORKERS        default: min(32, CPU count + 4)
+    UBIQUITIN_IO_MAX_QUEUED     default: 64
+    UBIQUITIN_MP_START_METHOD   default: spawn
+    UBIQUITIN_ANALYSIS_SHARDS   default: 1 (processes one subgraph analysis is
+                                sharded across; 1 runs it in the job's worker)
+
+Process workers are started lazily and hold their own DataRegistry, so jobs take
+small arguments (multimer sizes, ids) and load the tables in the worker. The
+process-wide pools warm their workers up with warmup.initialize_worker().
+"""
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a pool already holds its maximum number of jobs."""
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return max(0, int(value))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}; using {default}")
+        return default
+
+
+def analysis_shard_workers() -> int:
+    """Processes a single subgraph containment analysis is sharded across."""
+    return max(1, _env_int('UBIQUITIN_ANALYSIS_SHARDS', 1))
+
+
+class WorkerPool:
+    """
+    Executor with admission control and queue-depth counters.
+
+    Args:
+        name (str): Name used in messages and stats.
+        executor_factory (callable): Creates the executor; called lazily and again
+            after a process pool breaks.
+        workers (int): Number of workers of the executor.
+        max_queued (int): Jobs allowed to wait for a worker.
+    """
+
+    def __init__(self, name: str, executor_factory, workers: int, max_queued: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queued = max(0, max_queued)
+        self._executor_factory = executor_factory
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._peak_queue_depth = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def __repr__(self):
+        return f"WorkerPool(name={self.name!r}, workers={self.workers}, max_queued={self.max_queued})"
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queued
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker (submitted jobs beyond the number of workers)."""
+        return max(0, self._pending - self.workers)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._executor_factory(self.workers)
+            return self._executor
+
+    def _reset_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                raise PoolSaturatedError(
+                    f"The {self.name} worker pool is busy ({self._pending} jobs for {self.workers} workers); try again shortly"
+                )
+            self._pending += 1
+            self._submitted += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self.queue_depth)
+
+    def _release(self, failed: bool, seconds: float):
+        with self._lock:
+            self._pending -= 1
+            self._busy_seconds += seconds
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def submit(self, fn, *args, **kwargs) -> asyncio.Future:
+        """
+        Admit a job and schedule fn(*args, **kwargs) on the pool.
+
+        Admission happens immediately, so PoolSaturatedError is raised here rather
+        than when the returned future is awaited.
+
+        Returns:
+            asyncio.Future: Resolves to the result of fn.
+
+        Raises:
+            PoolSaturatedError: If the pool already holds workers + max_queued jobs.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        start_time = time.perf_counter()
+        try:
+            future = loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(True, 0.0)
+            raise
+
+        def done(completed_future):
+            failed = completed_future.cancelled() or completed_future.exception() is not None
+            self._release(failed, time.perf_counter() - start_time)
+            if not completed_future.cancelled() and isinstance(completed_future.exception(), BrokenProcessPool):
+                logger.error(f"The {self.name} worker pool broke; it is restarted on the next job")
+                self._reset_executor(executor)
+
+        future.add_done_callback(done)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and return its result."""
+        return await self.submit(fn, *args, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "in_flight": self._pending,
+                "queue_depth": self.queue_depth,
+                "peak_queue_depth": self._peak_queue_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "busy_seconds": round(self._busy_seconds, 3)
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class WorkerPools:
+    """
+    The CPU (process) and I/O (thread) pools shared by all endpoints.
+
+    Args:
+        cpu_workers (int): Process workers; default from UBIQUITIN_CPU_WORKERS.
+        cpu_max_queued (int): Jobs allowed to wait for a process worker.
+        io_workers (int): Thread workers; default from UBIQUITIN_IO_WORKERS.
+        io_max_queued (int): Jobs allowed to wait for a thread worker.
+        start_method (str): multiprocessing start method of the process workers.
+        cpu_initializer (callable): Run by every process worker when it starts.
+    """
+
+    def __init__(
+            self,
+            cpu_workers: int | None = None,
+            cpu_max_queued: int | None = None,
+            io_workers: int | None = None,
+            io_max_queued: int | None = None,
+            start_method: str | None = None,
+            cpu_initializer=None
+        ):
+        cpu_count = os.cpu_count() or 1
+        if cpu_workers is None:
+            cpu_workers = _env_int('UBIQUITIN_CPU_WORKERS', max(1, cpu_count - 1))
+        if cpu_max_queued is None:
+            cpu_max_queued = _env_int('UBIQUITIN_CPU_MAX_QUEUED', 8)
+        if io_workers is None:
+            io_workers = _env_int('UBIQUITIN_IO_WORKERS', min(32, cpu_count + 4))
+        if io_max_queued is None:
+            io_max_queued = _env_int('UBIQUITIN_IO_MAX_QUEUED', 64)
+        self.start_method = start_method or os.environ.get('UBIQUITIN_MP_START_METHOD') or 'spawn'
+
+        self._mp_context = multiprocessing.get_context(self.start_method)
+        self._manager = None
+        self._manager_lock = threading.Lock()
+        self.cpu = WorkerPool(
+            'cpu',
+            lambda workers: ProcessPoolExecutor(max_workers=workers, mp_context=self._mp_context, initializer=cpu_initializer),
+            cpu_workers,
+            cpu_max_queued
+        )
+        self.io = WorkerPool(
+            'io',
+            lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ubiquitin-io'),
+            io_workers,
+            io_max_queued
+        )
+
+    def __repr__(self):
+        return f"WorkerPools(cpu={self.cpu!r}, io={self.io!r}, start_method={self.start_method!r})"
+
+    def _get_manager(self):
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = self._mp_context.Manager()
+            return self._manager
+
+    def progress_queue(self):
+        """
+        Queue that process workers can put progress updates on (a multiprocessing
+        Manager queue; the manager is started on first use).
+        """
+        return self._get_manager().Queue()
+
+    def cancel_event(self):
+        """
+        Event that process workers can poll to stop a job early (a Manager event).
+        """
+        return self._get_manager().Event()
+
+    def stats(self) -> dict:
+        return {"cpu": self.cpu.stats(), "io": self.io.stats()}
+
+    def shutdown(self, wait: bool = True):
+        self.cpu.shutdown(wait=wait)
+        self.io.shutdown(wait=wait)
+        with self._manager_lock:
+            manager, self._manager = self._manager, None
+        if manager is not None:
+            manager.shutdown()
+
+
+_worker_pools = None
+_worker_pools_lock = threading.Lock()
+
+
+def get_worker_pools() -> WorkerPools:
+    """Return the process-wide WorkerPools."""
+    global _worker_pools
+    with _worker_pools_lock:
+        if _worker_pools is None:
+            from src.warmup import initialize_worker
+            _worker_pools = WorkerPools(cpu_initializer=initialize_worker)
+        return _worker_pools
+
+
+def shutdown_worker_pools(wait: bool = True):
+    """Shut the process-wide pools down; the next get_worker_pools() creates new ones."""
+    global _worker_pools
+    with _worker_pools_lock:
+        pools, _worker_pools = _worker_pools, None
+    if pools is not None:
+        pools.shutdown(wait=wait)